@@ -0,0 +1,34 @@
+"""Add sliding-window fields to network_metrics
+
+Revision ID: 3b7e2c91d4a0
+Revises: 6945748703b9
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3b7e2c91d4a0"
+down_revision = "6945748703b9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "network_metrics", sa.Column("scope", sa.String(length=100), nullable=True)
+    )
+    op.add_column(
+        "network_metrics", sa.Column("window_start", sa.DateTime(), nullable=True)
+    )
+    op.add_column(
+        "network_metrics", sa.Column("window_end", sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("network_metrics", "window_end")
+    op.drop_column("network_metrics", "window_start")
+    op.drop_column("network_metrics", "scope")
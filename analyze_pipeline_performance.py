@@ -3,23 +3,18 @@
 Analyze the performance of the complete ML pipeline
 """
 
-import json
 from datetime import datetime
-from src.data_persistence import DataPersistenceManager
-from src.database_models import RedditPost, RedditComment
+from src.corpus_report import CorpusReport
 
 def analyze_pipeline_performance():
     """Analyze current pipeline performance and data quality"""
     print("🔍 Analyzing ML Pipeline Performance")
     print("=" * 50)
 
-    # Initialize database connection
-    db = DataPersistenceManager()
-    session = db.get_session()
-
-    # Get basic statistics
-    total_posts = session.query(RedditPost).count()
-    total_comments = session.query(RedditComment).count()
+    corpus = CorpusReport()
+    stats = corpus.build()
+    total_posts = stats['total_posts']
+    total_comments = stats['total_comments']
 
     print(f"📊 Database Statistics:")
     print(f"  Total posts: {total_posts}")
@@ -27,51 +22,28 @@ def analyze_pipeline_performance():
 
     # Analyze by subreddit
     print(f"\n📋 Posts by Subreddit:")
-    subreddit_counts = session.query(
-        RedditPost.subreddit,
-        session.query(RedditPost).filter_by(subreddit=RedditPost.subreddit).count()
-    ).group_by(RedditPost.subreddit).all()
-
-    # Get subreddit distribution
-    subreddits = {}
-    for post in session.query(RedditPost).all():
-        subreddit = post.subreddit
-        if subreddit not in subreddits:
-            subreddits[subreddit] = 0
-        subreddits[subreddit] += 1
-
-    # Sort and display
+    subreddits = {
+        subreddit: data['posts'] for subreddit, data in stats['subreddits'].items()
+    }
     for subreddit, count in sorted(subreddits.items(), key=lambda x: x[1], reverse=True):
         print(f"  r/{subreddit}: {count} posts")
 
     # Analyze languages
     print(f"\n🌐 Language Distribution:")
-    languages = {}
-    for post in session.query(RedditPost).all():
-        lang = post.language or 'unknown'
-        if lang not in languages:
-            languages[lang] = 0
-        languages[lang] += 1
-
-    for language, count in sorted(languages.items(), key=lambda x: x[1], reverse=True):
+    languages = stats['languages']
+    for language, count in languages.items():
         print(f"  {language}: {count} posts")
 
     # Check for translations
     print(f"\n🔄 Translation Statistics:")
-    translated_posts = session.query(RedditPost).filter(
-        RedditPost.english_translation.isnot(None)
-    ).count()
+    translated_posts = stats['translated_posts']
     print(f"  Posts with translations: {translated_posts}")
 
     # Sample recent posts for manual review
     print(f"\n📝 Recent Posts Sample:")
-    recent_posts = session.query(RedditPost).order_by(
-        RedditPost.created_utc.desc()
-    ).limit(5).all()
-
-    for i, post in enumerate(recent_posts, 1):
-        print(f"  {i}. r/{post.subreddit} - {post.title[:60]}...")
-        print(f"     Language: {post.language}, Score: {post.score}")
+    for i, post in enumerate(stats['recent_posts'], 1):
+        print(f"  {i}. r/{post['subreddit']} - {post['title'][:60]}...")
+        print(f"     Language: {post['language']}, Score: {post['score']}")
 
     # Performance Summary
     print(f"\n" + "=" * 50)
@@ -91,20 +63,8 @@ def analyze_pipeline_performance():
     print(f"  Posts with translations: {translated_posts}")
 
     # Data quality assessment
-    avg_post_length = 0
-    posts_with_content = 0
-
-    for post in session.query(RedditPost).limit(100).all():
-        if post.title and len(post.title.strip()) > 0:
-            content_length = len(post.title)
-            if post.selftext:
-                content_length += len(post.selftext)
-            if content_length > 10:  # Meaningful content
-                avg_post_length += content_length
-                posts_with_content += 1
-
-    if posts_with_content > 0:
-        avg_post_length = avg_post_length / posts_with_content
+    avg_post_length = stats['content_quality']['avg_post_length']
+    posts_with_content = stats['content_quality']['posts_with_content']
 
     print(f"\n✅ Data Quality:")
     print(f"  Average post content length: {avg_post_length:.0f} characters")
@@ -154,12 +114,10 @@ def analyze_pipeline_performance():
     }
 
     report_file = f"data/pipeline_performance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(report_file, 'w') as f:
-        json.dump(report, f, indent=2)
+    corpus.save(report, report_file)
 
     print(f"\n💾 Full report saved to: {report_file}")
 
-    session.close()
     return report
 
 if __name__ == "__main__":
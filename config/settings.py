@@ -37,6 +37,50 @@ class Config:
     # Analysis Settings
     MIN_COMMENT_LENGTH = int(os.getenv("MIN_COMMENT_LENGTH", 10))
     MAX_NETWORK_NODES = int(os.getenv("MAX_NETWORK_NODES", 5000))
+    MAX_DISPLAY_NODES = int(os.getenv("MAX_DISPLAY_NODES", 500))
+    GRAPH_ENGINE = os.getenv("GRAPH_ENGINE", "auto")  # auto, networkx or sparse
+    NETWORK_WORKERS = int(os.getenv("NETWORK_WORKERS", 0))  # 0 = one per CPU
+    AUTO_UPDATE_INTERACTION_GRAPH = (
+        os.getenv("AUTO_UPDATE_INTERACTION_GRAPH", "True").lower() == "true"
+    )
+
+    # Analytics Rollup Settings
+    AUTO_UPDATE_ANALYTICS_ROLLUPS = (
+        os.getenv("AUTO_UPDATE_ANALYTICS_ROLLUPS", "True").lower() == "true"
+    )
+
+    # Keyword Index Settings
+    AUTO_UPDATE_KEYWORD_INDEX = (
+        os.getenv("AUTO_UPDATE_KEYWORD_INDEX", "True").lower() == "true"
+    )
+
+    # Full-Text Search Settings
+    AUTO_UPDATE_SEARCH_INDEX = (
+        os.getenv("AUTO_UPDATE_SEARCH_INDEX", "True").lower() == "true"
+    )
+    SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", 20))
+    SEARCH_RANK_LIMIT = int(os.getenv("SEARCH_RANK_LIMIT", 20000))  # Else newest first
+
+    # Word Cloud Settings
+    AUTO_UPDATE_WORD_FREQUENCIES = (
+        os.getenv("AUTO_UPDATE_WORD_FREQUENCIES", "True").lower() == "true"
+    )
+    WORD_CLOUD_DIR = os.getenv("WORD_CLOUD_DIR", "data/word_clouds")
+
+    # Analytics Snapshot Settings
+    SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "data/snapshots")
+
+    # Analytics Cache Settings
+    ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", 900))  # seconds
+    ANALYTICS_CACHE_DIR = os.getenv("ANALYTICS_CACHE_DIR", "")  # "" = in-memory only
+
+    # Misinformation Triage Settings
+    AUTO_TRIAGE = os.getenv("AUTO_TRIAGE", "True").lower() == "true"
+    TRIAGE_MODEL_PATH = os.getenv(
+        "TRIAGE_MODEL_PATH", "models/misinformation_classifier.pkl"
+    )
+    RETRAIN_MIN_NEW_ANNOTATIONS = int(os.getenv("RETRAIN_MIN_NEW_ANNOTATIONS", 50))
+    AUTO_RETRAIN = os.getenv("AUTO_RETRAIN", "True").lower() == "true"
 
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
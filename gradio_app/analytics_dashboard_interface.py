@@ -4,14 +4,42 @@ Gradio Dashboard Interface for Health Misinformation Research Analytics
 Provides interactive visualizations and insights for research teams
 """
 
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
 import gradio as gr
 import plotly.express as px
-from datetime import datetime
-from typing import Tuple
 
-from src.analytics_dashboard import HealthMisinformationAnalytics
+from src.analytics_dashboard import WORDCLOUD_AVAILABLE, HealthMisinformationAnalytics
 from config.settings import Config
 
+STATS_PAGE_SIZE = 20
+RECENT_POSTS_PAGE_SIZE = 10
+
+
+def turn_page(fetch: Callable, state: Optional[Tuple], direction: str) -> Tuple:
+    """
+    Keyset pagination over ``fetch(after) -> (rows, next_cursor)``
+
+    ``state`` holds the start cursor of every page up to the current one
+    plus the cursor of the next page, so "previous" needs no offsets.
+
+    Returns:
+        (rows, page number, new state)
+    """
+    starts, next_cursor = state or ([None], None)
+    if direction == "next" and next_cursor is not None:
+        starts = starts + [next_cursor]
+    elif direction == "previous" and len(starts) > 1:
+        starts = starts[:-1]
+    elif direction == "first":
+        starts = [None]
+
+    rows, next_cursor = fetch(starts[-1])
+    return rows, len(starts), (starts, next_cursor)
+
 
 class AnalyticsDashboardInterface:
     """Interactive dashboard for health misinformation research analytics"""
@@ -19,20 +47,40 @@ class AnalyticsDashboardInterface:
     def __init__(self):
         self.analytics = HealthMisinformationAnalytics()
         self.cached_data = {}
-        self.refresh_data()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._data_future: Optional[Future] = None
+
+        # Start loading in the background; tabs wait for it when first opened
+        self._load_data_async()
+
+    def _load_data_async(self) -> Future:
+        """Start computing the dashboard data unless it is already loading"""
+        with self._lock:
+            if self._data_future is None:
+                self._data_future = self._executor.submit(self.analytics.dashboard_data)
+            return self._data_future
+
+    def ensure_data(self, progress=None) -> dict:
+        """Wait for the background load, showing progress while it runs"""
+        future = self._load_data_async()
+        if not future.done() and progress is not None:
+            progress(0, desc="Loading dashboard data...")
+        try:
+            self.cached_data = future.result()
+        except Exception:
+            # Let the next tab or refresh retry
+            with self._lock:
+                if self._data_future is future:
+                    self._data_future = None
+            raise
+        return self.cached_data
 
     def refresh_data(self):
-        """Refresh analytics data"""
-        self.cached_data = {
-            "data_summary": self.analytics.load_data(),
-            "language_analysis": self.analytics.analyze_language_distribution(),
-            "keyword_analysis": self.analytics.analyze_health_keywords(),
-            "subreddit_analysis": self.analytics.analyze_subreddit_patterns(),
-            "temporal_analysis": self.analytics.analyze_temporal_patterns(),
-            "newcomer_analysis": self.analytics.analyze_newcomer_content(),
-            "ml_analysis": self.analytics.analyze_ml_health_classification(),
-            "insights": self.analytics.generate_insights(),
-        }
+        """Refresh analytics data from the daily rollups"""
+        with self._lock:
+            self._data_future = None
+        self.ensure_data()
 
     def create_overview_stats(self) -> str:
         """Create overview statistics display"""
@@ -276,12 +324,18 @@ class AnalyticsDashboardInterface:
 
         return fig
 
-    def create_detailed_stats_table(self) -> str:
-        """Create detailed statistics table"""
-        subreddit_data = self.cached_data["subreddit_analysis"]
+    def create_detailed_stats_table(
+        self, page_state: Optional[Tuple] = None, direction: str = "first"
+    ) -> Tuple[str, Tuple]:
+        """Create one page of the detailed statistics table"""
+        rows, page, page_state = turn_page(
+            lambda after: self.analytics.rollups.subreddit_page(STATS_PAGE_SIZE, after),
+            page_state,
+            direction,
+        )
 
-        if not subreddit_data:
-            return "No subreddit data available"
+        if not rows:
+            return "No subreddit data available", page_state
 
         table_md = """
 # 📈 Detailed Subreddit Statistics
@@ -290,16 +344,159 @@ class AnalyticsDashboardInterface:
 |-----------|--------|----------|-----------|-----------------|----------------|-----------|-------------------|
 """
 
-        for sub, data in sorted(
-            subreddit_data.items(), key=lambda x: x[1]["post_count"], reverse=True
-        ):
+        for data in rows:
+            sub = data["subreddit"]
             languages_str = ", ".join(data["languages"][:3])  # Show top 3 languages
             if len(data["languages"]) > 3:
                 languages_str += f" (+{len(data['languages'])-3} more)"
 
             table_md += f"| r/{sub} | {data['post_count']} | {data['comment_count']} | {languages_str} | {data['health_keywords']} | {data['newcomer_posts']} | {data['avg_score']:.1f} | {data['language_diversity']} |\n"
 
-        return table_md
+        table_md += f"\n*Page {page}{'' if page_state[1] else ' (last)'}*\n"
+        return table_md, page_state
+
+    def format_insights(self, category: str) -> str:
+        """Format one insight category as a bullet list"""
+        return "\n".join(
+            [f"- {insight}" for insight in self.cached_data["insights"][category]]
+        )
+
+    def create_ml_analysis_display(self) -> list:
+        """
+        ML tab contents: header, performance, post and comment pie charts,
+        top features and high-confidence examples
+        """
+        ml_data = self.cached_data["ml_analysis"]
+
+        if not ml_data.get("model_available", False):
+            return [
+                "⚠️ **ML Model Not Available**\n\n"
+                "Run `python -m src.health_content_classifier` to train the model first.",
+                "",
+                None,
+                None,
+                "",
+                "",
+            ]
+
+        perf = ml_data["model_performance"]
+        header = "# 🧠 Machine Learning Health Content Classification\n"
+        if perf["test_accuracy"] is not None:
+            header += f"*Real ML model trained on your data with {perf['test_accuracy']:.0%} test accuracy*\n"
+
+        # ML Performance metrics (from the model registry)
+        performance = "## 📊 Model Performance\n" + self.format_model_performance(perf)
+
+        # Classification results
+        figures = []
+        for label, data in (
+            ("Posts", ml_data["post_classification"]),
+            ("Comments", ml_data["comment_classification"]),
+        ):
+            figures.append(
+                px.pie(
+                    values=[data["general"], data["health_related"]],
+                    names=["General Discussion", "Health-Related"],
+                    title=f"{label}: {data['health_percentage']:.1f}% Health-Related",
+                    color_discrete_map={
+                        "General Discussion": "#95a5a6",
+                        "Health-Related": "#e74c3c",
+                    },
+                )
+            )
+
+        # Top ML features
+        features_text = []
+        for feature, importance in ml_data["top_health_features"]:
+            features_text.append(f"**{feature}**: {importance:.2f}")
+        features = "## 🔍 Top Health Indicators Learned by ML\n\n• " + "\n• ".join(
+            features_text
+        )
+
+        # High confidence examples
+        examples_text = ""
+        for i, example in enumerate(ml_data["high_confidence_examples"], 1):
+            confidence_pct = example["confidence"] * 100
+            examples_text += f"""
+**Example {i}** ({confidence_pct:.0f}% confidence)
+> {example['text']}
+
+---
+"""
+        examples = "## 💯 High-Confidence Health Classifications\n" + (
+            examples_text if examples_text else "*No high-confidence examples found*"
+        )
+
+        return [header, performance, *figures, features, examples]
+
+    # Tab loaders: each fills its tab when it is first opened
+
+    def load_overview_tab(self, progress=gr.Progress()) -> list:
+        self.ensure_data(progress)
+        return [self.create_overview_stats(), self.create_insights_display()]
+
+    def load_language_tab(self, progress=gr.Progress()) -> list:
+        self.ensure_data(progress)
+        return [
+            self.create_language_distribution_chart(),
+            self.create_multilingual_content_chart(),
+            self.format_insights("language_insights"),
+        ]
+
+    def load_health_tab(self, progress=gr.Progress()) -> list:
+        self.ensure_data(progress)
+        return [
+            self.create_health_keywords_chart(),
+            self.create_newcomer_content_chart(),
+            self.format_insights("content_insights"),
+        ]
+
+    def load_platform_tab(self, progress=gr.Progress()) -> list:
+        self.ensure_data(progress)
+        return [
+            self.create_subreddit_analysis_chart(),
+            *self.create_detailed_stats_table(),
+            self.format_insights("engagement_insights"),
+        ]
+
+    def load_recommendations_tab(self, progress=gr.Progress()) -> list:
+        self.ensure_data(progress)
+        return [
+            "\n".join(
+                [
+                    f"- {rec}"
+                    for rec in self.cached_data["insights"]["research_recommendations"]
+                ]
+            )
+        ]
+
+    def load_ml_tab(self, progress=gr.Progress()) -> list:
+        self.ensure_data(progress)
+        return self.create_ml_analysis_display()
+
+    def load_content_tab(self, progress=gr.Progress()) -> list:
+        progress(0, desc="Loading content examples...")
+        values = [self.format_keyword_examples("health"), *self.format_recent_posts()]
+        if WORDCLOUD_AVAILABLE:
+            progress(0.5, desc="Rendering word cloud...")
+            values.insert(0, self.analytics.word_cloud_path())
+        return values
+
+    @staticmethod
+    def lazy_tab(tab, loader: Callable, outputs: List) -> gr.State:
+        """
+        Fill ``outputs`` with ``loader`` the first time ``tab`` is opened in
+        a session; returns the session's loaded flag
+        """
+        loaded = gr.State(False)
+
+        def load(is_loaded, progress=gr.Progress()):
+            if is_loaded:
+                return [gr.update() for _ in outputs] + [True]
+            return list(loader(progress)) + [True]
+
+        tab.select(load, inputs=loaded, outputs=outputs + [loaded])
+        return loaded
 
     def export_report(self) -> Tuple[str, str]:
         """Export comprehensive analytics report"""
@@ -332,87 +529,51 @@ class AnalyticsDashboardInterface:
             with gr.Row():
                 export_status = gr.Textbox(label="Export Status", interactive=False)
 
+            # Tabs start empty and are filled when first opened, so the page
+            # paints before any analytics are computed
             # Overview tab
             with gr.Tab("📊 Overview"):
-                overview_stats = gr.Markdown(value=self.create_overview_stats())
-                insights_display = gr.Markdown(value=self.create_insights_display())
+                overview_stats = gr.Markdown()
+                insights_display = gr.Markdown()
 
             # Language Analysis tab
-            with gr.Tab("🌐 Language Analysis"):
+            with gr.Tab("🌐 Language Analysis") as language_tab:
                 with gr.Row():
                     with gr.Column():
-                        language_chart = gr.Plot(
-                            value=self.create_language_distribution_chart()
-                        )
+                        language_chart = gr.Plot()
                     with gr.Column():
-                        multilingual_chart = gr.Plot(
-                            value=self.create_multilingual_content_chart()
-                        )
+                        multilingual_chart = gr.Plot()
 
                 gr.Markdown("## 💡 Language Insights")
-                lang_insights = gr.Markdown(
-                    value="\\n".join(
-                        [
-                            f"- {insight}"
-                            for insight in self.cached_data["insights"][
-                                "language_insights"
-                            ]
-                        ]
-                    )
-                )
+                lang_insights = gr.Markdown()
 
             # Health Content Analysis tab
-            with gr.Tab("🏥 Health Content"):
-                health_keywords_chart = gr.Plot(
-                    value=self.create_health_keywords_chart()
-                )
+            with gr.Tab("🏥 Health Content") as health_tab:
+                health_keywords_chart = gr.Plot()
 
                 with gr.Row():
-                    newcomer_chart = gr.Plot(value=self.create_newcomer_content_chart())
+                    newcomer_chart = gr.Plot()
 
                 gr.Markdown("## 💡 Content Insights")
-                content_insights = gr.Markdown(
-                    value="\\n".join(
-                        [
-                            f"- {insight}"
-                            for insight in self.cached_data["insights"][
-                                "content_insights"
-                            ]
-                        ]
-                    )
-                )
+                content_insights = gr.Markdown()
 
             # Platform Analysis tab
-            with gr.Tab("📱 Platform Analysis"):
-                subreddit_chart = gr.Plot(value=self.create_subreddit_analysis_chart())
+            with gr.Tab("📱 Platform Analysis") as platform_tab:
+                subreddit_chart = gr.Plot()
 
-                detailed_table = gr.Markdown(value=self.create_detailed_stats_table())
+                detailed_table = gr.Markdown()
+                stats_page = gr.State(None)
+                with gr.Row():
+                    stats_prev_btn = gr.Button("⬅️ Previous")
+                    stats_next_btn = gr.Button("Next ➡️")
 
                 gr.Markdown("## 💡 Engagement Insights")
-                engagement_insights = gr.Markdown(
-                    value="\\n".join(
-                        [
-                            f"- {insight}"
-                            for insight in self.cached_data["insights"][
-                                "engagement_insights"
-                            ]
-                        ]
-                    )
-                )
+                engagement_insights = gr.Markdown()
 
             # Research Recommendations tab
-            with gr.Tab("🔬 Research Recommendations"):
+            with gr.Tab("🔬 Research Recommendations") as recommendations_tab:
                 gr.Markdown("## 🎯 Next Steps for Research Team")
-                research_recommendations = gr.Markdown(
-                    value="\\n".join(
-                        [
-                            f"- {rec}"
-                            for rec in self.cached_data["insights"][
-                                "research_recommendations"
-                            ]
-                        ]
-                    )
-                )
+                research_recommendations = gr.Markdown()
 
                 gr.Markdown(
                     """
@@ -436,93 +597,19 @@ class AnalyticsDashboardInterface:
                 )
 
             # ML Analysis tab
-            with gr.Tab("🤖 ML Analysis"):
-                ml_data = self.cached_data["ml_analysis"]
-
-                if ml_data.get("model_available", False):
-                    gr.Markdown("# 🧠 Machine Learning Health Content Classification")
-                    gr.Markdown(
-                        "*Real ML model trained on your data with 94% test accuracy*"
-                    )
-
-                    # ML Performance metrics
-                    gr.Markdown("## 📊 Model Performance")
-                    perf = ml_data["model_performance"]
-                    gr.Markdown(
-                        f"""
-**Training Accuracy:** {perf['training_accuracy']:.1%}  
-**Test Accuracy:** {perf['test_accuracy']:.1%}  
-**Features Used:** {perf['feature_count']:,}
-                    """
-                    )
-
-                    # Classification results
-                    with gr.Row():
-                        # Posts classification
-                        post_data = ml_data["post_classification"]
-                        with gr.Column():
-                            gr.Markdown("### 📝 Post Classification")
-                            post_fig = px.pie(
-                                values=[
-                                    post_data["general"],
-                                    post_data["health_related"],
-                                ],
-                                names=["General Discussion", "Health-Related"],
-                                title=f"Posts: {post_data['health_percentage']:.1f}% Health-Related",
-                                color_discrete_map={
-                                    "General Discussion": "#95a5a6",
-                                    "Health-Related": "#e74c3c",
-                                },
-                            )
-                            gr.Plot(value=post_fig)
-
-                        # Comments classification
-                        comment_data = ml_data["comment_classification"]
-                        with gr.Column():
-                            gr.Markdown("### 💬 Comment Classification")
-                            comment_fig = px.pie(
-                                values=[
-                                    comment_data["general"],
-                                    comment_data["health_related"],
-                                ],
-                                names=["General Discussion", "Health-Related"],
-                                title=f"Comments: {comment_data['health_percentage']:.1f}% Health-Related",
-                                color_discrete_map={
-                                    "General Discussion": "#95a5a6",
-                                    "Health-Related": "#e74c3c",
-                                },
-                            )
-                            gr.Plot(value=comment_fig)
-
-                    # Top ML features
-                    gr.Markdown("## 🔍 Top Health Indicators Learned by ML")
-                    features_text = []
-                    for feature, importance in ml_data["top_health_features"]:
-                        features_text.append(f"**{feature}**: {importance:.2f}")
-                    gr.Markdown("• " + "\n• ".join(features_text))
-
-                    # High confidence examples
-                    gr.Markdown("## 💯 High-Confidence Health Classifications")
-                    examples_text = ""
-                    for i, example in enumerate(ml_data["high_confidence_examples"], 1):
-                        confidence_pct = example["confidence"] * 100
-                        examples_text += f"""
-**Example {i}** ({confidence_pct:.0f}% confidence)
-> {example['text']}
+            with gr.Tab("🤖 ML Analysis") as ml_tab:
+                ml_header = gr.Markdown()
+                ml_performance = gr.Markdown()
 
----
-"""
-                    gr.Markdown(
-                        examples_text
-                        if examples_text
-                        else "*No high-confidence examples found*"
-                    )
+                # Classification results
+                with gr.Row():
+                    with gr.Column():
+                        ml_post_chart = gr.Plot(label="📝 Post Classification")
+                    with gr.Column():
+                        ml_comment_chart = gr.Plot(label="💬 Comment Classification")
 
-                else:
-                    gr.Markdown("⚠️ **ML Model Not Available**")
-                    gr.Markdown(
-                        "Run `python -m src.health_content_classifier` to train the model first."
-                    )
+                ml_features = gr.Markdown()
+                ml_examples = gr.Markdown()
 
             # Classification Methods tab
             with gr.Tab("📚 Classification Methods"):
@@ -575,16 +662,27 @@ def contains_health_keywords(text):
                 )
 
             # Content Explorer tab
-            with gr.Tab("🔍 Content Explorer"):
+            with gr.Tab("🔍 Content Explorer") as content_tab:
                 gr.Markdown("## 📊 Word Cloud Analysis")
                 gr.Markdown(
                     "*Visualization of most frequently mentioned terms across all posts and comments*"
                 )
 
-                wordcloud_display = gr.Markdown(
-                    value="**Word cloud temporarily disabled** - Check terminal for dashboard URL",
-                    label="Most Frequent Terms",
-                )
+                content_outputs = []
+                if WORDCLOUD_AVAILABLE:
+                    wordcloud_display = gr.Image(
+                        type="filepath", label="Most Frequent Terms"
+                    )
+                    refresh_wordcloud_btn = gr.Button("🔄 Refresh Word Cloud")
+                    refresh_wordcloud_btn.click(
+                        fn=self.analytics.word_cloud_path, outputs=wordcloud_display
+                    )
+                    content_outputs.append(wordcloud_display)
+                else:
+                    gr.Markdown(
+                        value="**Word cloud unavailable** - Install the `wordcloud` package to enable it",
+                        label="Most Frequent Terms",
+                    )
 
                 gr.Markdown("## 🔎 Keyword Context Examples")
                 gr.Markdown(
@@ -599,21 +697,21 @@ def contains_health_keywords(text):
                     )
                     search_btn = gr.Button("🔍 Search Examples")
 
-                keyword_examples = gr.Markdown(
-                    value=self.format_keyword_examples("health"),
-                    label="Examples in Context",
-                )
+                keyword_examples = gr.Markdown(label="Examples in Context")
 
                 gr.Markdown("## 📋 Recent Posts Preview")
                 gr.Markdown(
                     "*Transparency view: Recent posts being analyzed by the platform*"
                 )
 
-                recent_posts = gr.Markdown(
-                    value=self.format_recent_posts(), label="Recent Posts"
-                )
+                recent_posts = gr.Markdown(label="Recent Posts")
+                recent_page = gr.State(None)
+                with gr.Row():
+                    posts_prev_btn = gr.Button("⬅️ Previous")
+                    posts_next_btn = gr.Button("Next ➡️")
+                    refresh_posts_btn = gr.Button("🔄 Refresh Recent Posts")
 
-                refresh_posts_btn = gr.Button("🔄 Refresh Recent Posts")
+                content_outputs += [keyword_examples, recent_posts, recent_page]
 
                 # Event handlers for content explorer
                 search_btn.click(
@@ -622,78 +720,115 @@ def contains_health_keywords(text):
                     outputs=keyword_examples,
                 )
 
-                refresh_posts_btn.click(
-                    fn=self.format_recent_posts, outputs=recent_posts
-                )
+                for button, direction in (
+                    (posts_prev_btn, "previous"),
+                    (posts_next_btn, "next"),
+                    (refresh_posts_btn, "first"),
+                ):
+                    button.click(
+                        fn=lambda state, direction=direction: self.format_recent_posts(
+                            state, direction
+                        ),
+                        inputs=recent_page,
+                        outputs=[recent_posts, recent_page],
+                    )
 
             # Event handlers
-            def refresh_dashboard():
-                self.refresh_data()
-                return [
-                    self.create_overview_stats(),
-                    self.create_insights_display(),
-                    self.create_language_distribution_chart(),
-                    self.create_multilingual_content_chart(),
-                    self.create_health_keywords_chart(),
-                    self.create_newcomer_content_chart(),
-                    self.create_subreddit_analysis_chart(),
-                    self.create_detailed_stats_table(),
-                    "\\n".join(
-                        [
-                            f"- {insight}"
-                            for insight in self.cached_data["insights"][
-                                "language_insights"
-                            ]
-                        ]
-                    ),
-                    "\\n".join(
-                        [
-                            f"- {insight}"
-                            for insight in self.cached_data["insights"][
-                                "content_insights"
-                            ]
-                        ]
+            for button, direction in (
+                (stats_prev_btn, "previous"),
+                (stats_next_btn, "next"),
+            ):
+                button.click(
+                    fn=lambda state, direction=direction: self.create_detailed_stats_table(
+                        state, direction
                     ),
-                    "\\n".join(
-                        [
-                            f"- {insight}"
-                            for insight in self.cached_data["insights"][
-                                "engagement_insights"
-                            ]
-                        ]
-                    ),
-                    "\\n".join(
-                        [
-                            f"- {rec}"
-                            for rec in self.cached_data["insights"][
-                                "research_recommendations"
-                            ]
-                        ]
-                    ),
-                ]
+                    inputs=stats_page,
+                    outputs=[detailed_table, stats_page],
+                )
+
+            # Tabs backed by the dashboard data, refreshed together
+            overview_outputs = [overview_stats, insights_display]
+            data_tabs = [
+                (
+                    self.load_language_tab,
+                    [language_chart, multilingual_chart, lang_insights],
+                    language_tab,
+                ),
+                (
+                    self.load_health_tab,
+                    [health_keywords_chart, newcomer_chart, content_insights],
+                    health_tab,
+                ),
+                (
+                    self.load_platform_tab,
+                    [subreddit_chart, detailed_table, stats_page, engagement_insights],
+                    platform_tab,
+                ),
+                (
+                    self.load_recommendations_tab,
+                    [research_recommendations],
+                    recommendations_tab,
+                ),
+                (
+                    self.load_ml_tab,
+                    [
+                        ml_header,
+                        ml_performance,
+                        ml_post_chart,
+                        ml_comment_chart,
+                        ml_features,
+                        ml_examples,
+                    ],
+                    ml_tab,
+                ),
+            ]
+            loaded_flags = [
+                self.lazy_tab(tab, loader, outputs)
+                for loader, outputs, tab in data_tabs
+            ]
+            self.lazy_tab(content_tab, self.load_content_tab, content_outputs)
+
+            # The overview is open on page load
+            dashboard.load(fn=self.load_overview_tab, outputs=overview_outputs)
+
+            def refresh_dashboard(progress=gr.Progress()):
+                progress(0, desc="Refreshing dashboard data...")
+                self.refresh_data()
+                values = self.load_overview_tab(progress)
+                for loader, _, _ in data_tabs:
+                    values += loader(progress)
+                return values + [True] * len(loaded_flags)
 
             refresh_btn.click(
                 fn=refresh_dashboard,
-                outputs=[
-                    overview_stats,
-                    insights_display,
-                    language_chart,
-                    multilingual_chart,
-                    health_keywords_chart,
-                    newcomer_chart,
-                    subreddit_chart,
-                    detailed_table,
-                    lang_insights,
-                    content_insights,
-                    engagement_insights,
-                    research_recommendations,
-                ],
+                outputs=overview_outputs
+                + [output for _, outputs, _ in data_tabs for output in outputs]
+                + loaded_flags,
             )
 
             export_btn.click(fn=self.export_report, outputs=[export_status])
 
         return dashboard
 
+    def format_model_performance(self, perf: dict) -> str:
+        """Format registered model metrics, tolerating unregistered models"""
+        if perf["training_accuracy"] is None:
+            return (
+                "*No training metrics registered yet - retrain with "
+                "`python -m src.health_content_classifier` to record them.*"
+            )
+
+        performance = f"""
+**Training Accuracy:** {perf['training_accuracy']:.1%}  
+**Test Accuracy:** {perf['test_accuracy']:.1%}  
+**Features Used:** {perf['feature_count']:,}  
+**Trained:** {perf['trained_at'] or 'unknown'}
+"""
+        if perf.get("params"):
+            performance += f"**Tuned Parameters:** `{perf['params']}`\n"
+
+        return performance
+
     def format_keyword_examples(self, keyword: str) -> str:
         """Format keyword examples for display"""
         if not keyword.strip():
@@ -730,16 +865,25 @@ def contains_health_keywords(text):
 
         return formatted
 
-    def format_recent_posts(self) -> str:
-        """Format recent posts for transparency display"""
-        recent_posts = self.analytics.get_recent_posts_preview(limit=10)
+    def format_recent_posts(
+        self, page_state: Optional[Tuple] = None, direction: str = "first"
+    ) -> Tuple[str, Tuple]:
+        """Format one page of recent posts for transparency display"""
+        recent_posts, page, page_state = turn_page(
+            lambda after: self.analytics.recent_posts_page(
+                RECENT_POSTS_PAGE_SIZE, after
+            ),
+            page_state,
+            direction,
+        )
 
         if not recent_posts:
-            return "No recent posts available."
+            return "No recent posts available.", page_state
 
         formatted = "## Recent Posts Being Analyzed:\n\n"
 
-        for i, post in enumerate(recent_posts, 1):
+        first = (page - 1) * RECENT_POSTS_PAGE_SIZE + 1
+        for i, post in enumerate(recent_posts, first):
             formatted += f"### Post {i}\n"
             formatted += f"**Title:** {post.get('title', '')}\n"
             formatted += f"**Subreddit:** r/{post.get('subreddit', 'unknown')}\n"
@@ -764,12 +908,14 @@ def contains_health_keywords(text):
 
             formatted += "\n---\n\n"
 
-        return formatted
+        formatted += f"*Page {page}{'' if page_state[1] else ' (last)'}*\n"
+        return formatted, page_state
 
     def launch(self, share: bool = False):
         """Launch the analytics dashboard"""
         dashboard = self.create_dashboard()
-        dashboard.launch(
+        # Queued events report progress while tabs load
+        dashboard.queue().launch(
             share=share,
             server_port=Config.GRADIO_PORT + 2,  # Use different port
             server_name="0.0.0.0" if share else "127.0.0.1",
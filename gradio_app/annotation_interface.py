@@ -12,8 +12,9 @@ import gradio as gr
 from loguru import logger
 
 from config.settings import AnnotationConfig, Config
+from src.active_learning import AnnotationQueue, load_comments_for_posts
 from src.data_persistence import DataPersistenceManager
-from src.database_models import RedditComment, RedditPost
+from src.database_models import RedditPost
 
 
 class AnnotationInterface:
@@ -32,6 +33,9 @@ class AnnotationInterface:
         self.current_post_index = 0
         self.posts_data = []
         self.db_manager = DataPersistenceManager()
+        self.annotation_queue = AnnotationQueue(self.db_manager)
+        self.served_queue_ids = set()
+        self.has_more_pages = False
 
         # Load posts from database
         self.load_posts_from_database()
@@ -47,8 +51,18 @@ class AnnotationInterface:
         """Load posts from PostgreSQL database for annotation"""
         try:
             with self.db_manager.get_session() as session:
-                # Build query with filters
-                query = session.query(RedditPost)
+                # Page through the active-learning queue when it has been built
+                use_queue = self.annotation_queue.has_pending(session)
+                if use_queue:
+                    query = self.annotation_queue.page_query(
+                        session, served=self.served_queue_ids
+                    )
+                else:
+                    logger.warning(
+                        "Annotation queue is empty, loading newest posts instead. "
+                        "Run `python main.py annotation-queue` to build it."
+                    )
+                    query = self.annotation_queue.recency_query(session)
 
                 # Apply filters
                 if "subreddit" in self.filter_criteria:
@@ -67,14 +81,14 @@ class AnnotationInterface:
                         == self.filter_criteria["newcomer_related"]
                     )
 
-                # Order by creation date (newest first) and limit
-                query = query.order_by(RedditPost.created_utc.desc()).limit(self.limit)
-
-                posts = query.all()
+                rows = query.limit(self.limit).all()
+                comments = load_comments_for_posts(
+                    session, [post.post_id for post, _, _ in rows]
+                )
 
-                # Convert to dictionary format and load comments
+                # Convert to dictionary format
                 self.posts_data = []
-                for post in posts:
+                for post, _, _ in rows:
                     post_dict = {
                         "post_id": post.post_id,
                         "subreddit": post.subreddit,
@@ -97,33 +111,15 @@ class AnnotationInterface:
                         "translation_confidence": getattr(
                             post, "translation_confidence", None
                         ),
-                        "comments": [],
+                        "comments": comments.get(post.post_id, []),
                     }
-
-                    # Load associated comments
-                    comments_query = (
-                        session.query(RedditComment)
-                        .filter(RedditComment.post_id == post.post_id)
-                        .order_by(RedditComment.created_utc.asc())
-                        .limit(10)
-                    )  # Limit comments for performance
-
-                    for comment in comments_query:
-                        comment_dict = {
-                            "comment_id": comment.comment_id,
-                            "author": comment.author,
-                            "body": comment.body,
-                            "created_utc": (
-                                comment.created_utc.isoformat()
-                                if comment.created_utc
-                                else ""
-                            ),
-                            "score": comment.score,
-                        }
-                        post_dict["comments"].append(comment_dict)
-
                     self.posts_data.append(post_dict)
 
+                self.current_post_index = 0
+                self.has_more_pages = use_queue and len(rows) == self.limit
+                if use_queue:
+                    self.served_queue_ids.update(queue_id for _, _, queue_id in rows)
+
                 logger.info(
                     f"Loaded {len(self.posts_data)} posts from database for annotation"
                 )
@@ -172,6 +168,11 @@ class AnnotationInterface:
 
     def get_current_post(self) -> Dict:
         """Get the current post for annotation"""
+        if self.current_post_index >= len(self.posts_data) and getattr(
+            self, "has_more_pages", False
+        ):
+            self.load_posts_from_database()
+
         if self.current_post_index >= len(self.posts_data):
             return {"error": "No more posts to annotate!"}
 
@@ -299,6 +300,10 @@ class AnnotationInterface:
         conn.commit()
         conn.close()
 
+        # Take the post out of the active-learning queue
+        if getattr(self, "annotation_queue", None):
+            self.annotation_queue.mark_annotated(current_post["post_id"])
+
         # Update session stats
         self.session_stats["posts_reviewed"] += 1
 
@@ -11,11 +11,13 @@ from plotly.subplots import make_subplots
 
 import gradio as gr
 from loguru import logger
+from sqlalchemy import func
 
 from config.settings import Config
 from src.data_persistence import DataPersistenceManager
 from src.database_models import RedditPost, RedditComment, HumanAnnotation
 from src.analytics_dashboard import HealthMisinformationAnalytics
+from src.full_text_search import FullTextSearch
 from src.network_analysis import NetworkAnalyzer
 from src.translation_service import get_translation_service
 
@@ -30,9 +32,10 @@ class ResearchAnalyticsInterface:
         self.analytics = HealthMisinformationAnalytics()
         self.network_analyzer = NetworkAnalyzer()
         self.translation_service = get_translation_service()
+        self.search = FullTextSearch(db_manager=self.db_manager)
 
-        # Load data
-        self.analytics.load_data()
+        # Nothing is loaded up front: the overview is filled after the page
+        # loads and the other tabs compute their results on demand
 
     def get_data_overview(self) -> Tuple[str, dict]:
         """Get comprehensive data overview with statistics"""
@@ -45,7 +48,7 @@ class ResearchAnalyticsInterface:
             # Language distribution
             language_dist = (
                 session.query(
-                    RedditPost.language, session.func.count(RedditPost.language)
+                    RedditPost.language, func.count(RedditPost.language)
                 )
                 .group_by(RedditPost.language)
                 .all()
@@ -54,7 +57,7 @@ class ResearchAnalyticsInterface:
             # Subreddit distribution
             subreddit_dist = (
                 session.query(
-                    RedditPost.subreddit, session.func.count(RedditPost.subreddit)
+                    RedditPost.subreddit, func.count(RedditPost.subreddit)
                 )
                 .group_by(RedditPost.subreddit)
                 .all()
@@ -121,10 +124,10 @@ class ResearchAnalyticsInterface:
             # Query posts by day
             posts_by_date = (
                 session.query(
-                    session.func.date(RedditPost.created_utc).label("date"),
-                    session.func.count(RedditPost.id).label("count"),
+                    func.date(RedditPost.created_utc).label("date"),
+                    func.count(RedditPost.id).label("count"),
                 )
-                .group_by(session.func.date(RedditPost.created_utc))
+                .group_by(func.date(RedditPost.created_utc))
                 .order_by("date")
                 .all()
             )
@@ -194,81 +197,67 @@ class ResearchAnalyticsInterface:
         date_to: str = "",
         has_keywords: bool = False,
         min_score: int = 0,
+        include_comments: bool = True,
+        page: int = 1,
     ) -> str:
-        """Advanced post search with multiple filters"""
-
-        with self.db_manager.get_session() as session:
-            # Start with base query
-            posts_query = session.query(RedditPost)
-
-            # Apply filters
-            if query.strip():
-                posts_query = posts_query.filter(
-                    (RedditPost.title.ilike(f"%{query}%"))
-                    | (RedditPost.selftext.ilike(f"%{query}%"))
-                )
-
-            if subreddit.strip():
-                posts_query = posts_query.filter(
-                    RedditPost.subreddit == subreddit.strip()
-                )
-
-            if language.strip():
-                posts_query = posts_query.filter(
-                    RedditPost.language == language.strip()
-                )
-
-            if has_keywords:
-                posts_query = posts_query.filter(
-                    RedditPost.contains_health_keywords == True
-                )
-
-            if min_score > 0:
-                posts_query = posts_query.filter(RedditPost.score >= min_score)
-
-            # Date filtering
-            if date_from:
-                try:
-                    from_date = datetime.strptime(date_from, "%Y-%m-%d")
-                    posts_query = posts_query.filter(
-                        RedditPost.created_utc >= from_date
-                    )
-                except ValueError:
-                    pass
-
-            if date_to:
-                try:
-                    to_date = datetime.strptime(date_to, "%Y-%m-%d")
-                    posts_query = posts_query.filter(RedditPost.created_utc <= to_date)
-                except ValueError:
-                    pass
-
-            # Execute query
-            results = (
-                posts_query.order_by(RedditPost.created_utc.desc()).limit(50).all()
-            )
-
-            if not results:
-                return "No posts found matching your criteria."
-
-            # Format results
-            results_text = f"## 🔍 Search Results ({len(results)} posts found)\n\n"
-
-            for i, post in enumerate(results, 1):
-                language_info = f" [{post.language}]" if post.language else ""
-                keyword_info = " 🔑" if post.contains_health_keywords else ""
-                newcomer_info = " 👥" if post.is_newcomer_related else ""
-
-                results_text += f"""
-**{i}. r/{post.subreddit}** - {post.score} points{language_info}{keyword_info}{newcomer_info}
-*{post.title}*
-{post.selftext[:200]}{'...' if len(post.selftext or '') > 200 else ''}
-*Posted: {post.created_utc.strftime('%Y-%m-%d %H:%M')}*
+        """Advanced full-text search of posts and comments with filters"""
+
+        def parse_date(value: str) -> Optional[datetime]:
+            try:
+                return datetime.strptime(value, "%Y-%m-%d") if value else None
+            except ValueError:
+                return None
+
+        search = self.search.search(
+            query,
+            subreddit=subreddit.strip() or None,
+            language=language.strip() or None,
+            date_from=parse_date(date_from),
+            date_to=parse_date(date_to),
+            has_keywords=has_keywords,
+            min_score=min_score,
+            doc_types=("post", "comment") if include_comments else ("post",),
+            page=page or 1,
+            page_size=Config.SEARCH_PAGE_SIZE,
+        )
+        results = search["results"]
+
+        if not results:
+            if search["total"]:
+                return f"No results on page {search['page']} (last page is {search['pages']})."
+            return "No posts found matching your criteria."
+
+        # Format results
+        order = "best matches first" if search["ranked"] else "newest first"
+        results_text = (
+            f"## 🔍 Search Results ({search['total']:,} found, {order})\n"
+            f"*Page {search['page']} of {search['pages']}*\n\n"
+        )
+
+        first = (search["page"] - 1) * search["page_size"]
+        for i, doc in enumerate(results, first + 1):
+            language_info = f" [{doc['language']}]" if doc["language"] else ""
+            keyword_info = " 🔑" if doc["contains_health_keywords"] else ""
+            newcomer_info = " 👥" if doc["is_newcomer_related"] else ""
+            created = doc["created_utc"]
+            if isinstance(created, str):
+                created = datetime.fromisoformat(created)
+            posted = created.strftime("%Y-%m-%d %H:%M") if created else "unknown"
+
+            if doc["doc_type"] == "post":
+                heading = f"*{doc['title_highlight'] or doc['title']}*\n"
+            else:
+                heading = f"💬 *Comment on post {doc['post_id']}*\n"
+
+            results_text += f"""
+**{i}. r/{doc['subreddit']}** - {doc['score']} points{language_info}{keyword_info}{newcomer_info}
+{heading}{doc['snippet'] or ''}
+*Posted: {posted}*
 
 ---
 """
 
-            return results_text
+        return results_text
 
     def analyze_misinformation_patterns(self) -> Tuple[str, go.Figure]:
         """Analyze patterns in misinformation spread"""
@@ -512,7 +501,7 @@ class ResearchAnalyticsInterface:
                         with gr.Column():
                             search_query = gr.Textbox(
                                 label="Search Query",
-                                placeholder="Enter keywords to search in titles and content",
+                                placeholder='e.g. prep OR truvada, "viral load" -vaccine',
                             )
                             subreddit_filter = gr.Textbox(
                                 label="Subreddit Filter", placeholder="e.g., askgaybros"
@@ -531,6 +520,12 @@ class ResearchAnalyticsInterface:
                             min_score = gr.Slider(
                                 0, 1000, value=0, label="Minimum Score"
                             )
+                            include_comments = gr.Checkbox(
+                                label="Include Comments", value=True
+                            )
+                            search_page = gr.Number(
+                                label="Page", value=1, minimum=1, precision=0
+                            )
 
                     search_btn = gr.Button("🔍 Search Posts", variant="primary")
                     search_results = gr.Markdown()
@@ -545,6 +540,8 @@ class ResearchAnalyticsInterface:
                             date_to,
                             has_keywords,
                             min_score,
+                            include_comments,
+                            search_page,
                         ],
                         outputs=search_results,
                     )
@@ -636,7 +633,7 @@ def launch_research_interface():
     interface = ResearchAnalyticsInterface()
     app = interface.create_interface()
 
-    app.launch(
+    app.queue().launch(
         server_name="0.0.0.0",
         server_port=7861,  # Different port from annotation interface
         share=Config.GRADIO_SHARE,
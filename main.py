@@ -135,7 +135,8 @@ def analyze_network(data_path: str = None):
 
     # Try database-based analysis first (preferred for community resilience)
     try:
-        network_data = NetworkAnalyzer().build_user_network()
+        # Full network for the report, not the display-capped view
+        network_data = NetworkAnalyzer().build_user_network(display=False)
 
         if network_data and network_data.get("nodes"):
             logger.info(
@@ -218,6 +219,219 @@ def launch_enhanced_annotation_tool(
     annotation_tool.launch(share=False)
 
 
+def refresh_annotation_queue(full: bool = False):
+    """Score new posts and re-rank the active-learning annotation queue"""
+    from src.active_learning import AnnotationQueue
+
+    logger.info("Refreshing active-learning annotation queue...")
+
+    stats = AnnotationQueue().refresh(full=full)
+    print(
+        f"\n🎯 Annotation queue: {stats['scored']} posts scored, "
+        f"{stats['reranked']} items re-ranked"
+    )
+
+
+def retrain_classifier(force: bool = False):
+    """Retrain the triage classifier once enough new annotations exist"""
+    from config.settings import Config
+    from src.misinformation_classifier import MisinformationClassifier
+
+    logger.info("Checking for new annotations to retrain on...")
+
+    classifier = MisinformationClassifier()
+    if os.path.exists(Config.TRIAGE_MODEL_PATH):
+        classifier.load_model()
+
+    if not classifier.retrain_if_needed(min_new_annotations=0 if force else None):
+        print(
+            f"\n🧠 Triage classifier unchanged: "
+            f"{classifier.new_annotation_count()} new annotations"
+        )
+        return
+
+    print("\n🧠 Triage classifier retrained and all posts rescored")
+    for target, metrics in classifier.training_results["targets"].items():
+        accuracy = metrics.get("test_accuracy")
+        summary = f"{accuracy:.3f}" if accuracy is not None else "n/a"
+        print(f"   {target}: {metrics['samples']} samples, test accuracy {summary}")
+
+
+def update_interaction_graph(full: bool = False):
+    """Fold new posts and comments into the materialized interaction graph"""
+    from src.interaction_graph import InteractionGraphStore
+
+    logger.info("Updating materialized interaction graph...")
+
+    store = InteractionGraphStore()
+    processed = store.rebuild() if full else store.update()
+    graph = store.load_graph()
+    print(
+        f"\n🕸️ Interaction graph v{store.version()}: {processed} new rows, "
+        f"{graph.number_of_nodes()} users, {graph.number_of_edges()} edges"
+    )
+
+
+def update_analytics_rollups(full: bool = False):
+    """Fold new posts and comments into the daily dashboard rollups"""
+    from src.analytics_rollup import AnalyticsRollupStore
+
+    logger.info("Updating analytics rollups...")
+
+    store = AnalyticsRollupStore()
+    processed = store.rebuild() if full else store.update()
+    summary = store.summary()
+    print(
+        f"\n📊 Analytics rollups v{store.version()}: {processed} new rows, "
+        f"{summary['total_posts']} posts, {summary['total_comments']} comments"
+    )
+
+
+def update_keyword_index(full: bool = False):
+    """Index new posts and comments for keyword search and counts"""
+    from src.keyword_index import KeywordIndex
+
+    logger.info("Updating keyword index...")
+
+    index = KeywordIndex()
+    postings = index.rebuild() if full else index.update()
+    counts = index.document_counts()
+    print(
+        f"\n🔎 Keyword index v{index.version()}: {postings} new postings, "
+        f"{len(counts)} terms"
+    )
+    for term, count in sorted(
+        counts.items(), key=lambda x: x[1]["posts"] + x[1]["comments"], reverse=True
+    )[:10]:
+        print(f"   {term}: {count['posts']} posts, {count['comments']} comments")
+
+
+def update_search_index(full: bool = False):
+    """Add new posts and comments to the full-text search index"""
+    from src.full_text_search import FullTextSearch
+
+    logger.info("Updating full-text search index...")
+
+    search = FullTextSearch()
+    indexed = search.rebuild() if full else search.update()
+    print(
+        f"\n🔍 Search index v{search.version()} ({search.backend}): "
+        f"{indexed} new documents"
+    )
+
+
+def update_word_frequencies(full: bool = False):
+    """Count the terms of new posts and comments for the word cloud"""
+    from src.word_frequency import WordFrequencyStore
+
+    logger.info("Updating word frequencies...")
+
+    store = WordFrequencyStore()
+    counted = store.rebuild() if full else store.update()
+    top_terms = store.top_terms(10)
+    print(f"\n☁️  Word frequencies v{store.version()}: {counted} new posts/comments")
+    for term, count in top_terms.items():
+        print(f"   {term}: {count:,}")
+
+
+def export_snapshot():
+    """Export posts, comments, annotations and embeddings to Parquet"""
+    from src.analytics_snapshot import SnapshotExporter
+
+    logger.info("Exporting analytics snapshot...")
+
+    exporter = SnapshotExporter()
+    path = exporter.export()
+    with open(path / "manifest.json") as f:
+        tables = json.load(f)["tables"]
+    print(f"\n🗄️  Analytics snapshot: {path}")
+    for table, info in tables.items():
+        print(
+            f"   {table}: {info['rows']:,} rows in {len(info['partitions'])} partitions"
+        )
+
+
+def corpus_report(output_path: str = None):
+    """Summarize the corpus with aggregate queries and save the report"""
+    from src.corpus_report import CorpusReport
+
+    logger.info("Building corpus report...")
+
+    corpus = CorpusReport()
+    report = corpus.build()
+    path = corpus.save(report, output_path)
+    print(
+        f"\n📋 Corpus report: {report['total_posts']:,} posts, "
+        f"{report['total_comments']:,} comments, "
+        f"{report['translated_posts']:,} translated posts"
+    )
+    for subreddit, counts in list(report["subreddits"].items())[:10]:
+        print(
+            f"   r/{subreddit}: {counts['posts']:,} posts, "
+            f"{counts['comments']:,} comments"
+        )
+    print(f"💾 Report saved to {path}")
+
+
+def update_network_timeline(subreddit: str = None, full: bool = False):
+    """Compute weekly sliding-window network metrics not yet stored"""
+    from src.temporal_network import TemporalNetworkAnalyzer
+
+    logger.info("Updating temporal network metrics...")
+
+    windows = TemporalNetworkAnalyzer().run(subreddit=subreddit, full=full)
+    print(f"\n📈 Network timeline ({subreddit or 'all'}): {len(windows)} new windows")
+    for window in windows:
+        print(
+            f"   {window['window_start']}: {window['num_nodes']} users, "
+            f"{window['num_edges']} edges, "
+            f"{len(window['misinformation_clusters'])} misinformation clusters"
+        )
+
+
+def update_cascades(full: bool = False, limit: int = 10):
+    """Recompute reply cascades for posts with new comments and list the top ones"""
+    from src.cascade_analysis import CascadeAnalyzer
+
+    logger.info("Updating reply-tree cascades...")
+
+    analyzer = CascadeAnalyzer()
+    updated = analyzer.update(full=full)
+    print(f"\n🌊 Reply cascades: {updated} posts updated")
+    for cascade in analyzer.top_cascades(limit=limit):
+        print(
+            f"   r/{cascade['subreddit']} {cascade['post_id']}: "
+            f"{cascade['size']} comments, depth {cascade['depth']}, "
+            f"virality {cascade['structural_virality']:.2f}"
+        )
+
+
+def run_network_report(force: bool = False):
+    """Nightly per-subreddit/language network metrics and bridge analysis"""
+    from src.network_batch import NetworkBatchJob
+
+    logger.info("Running batch network report...")
+
+    report = NetworkBatchJob().run(force=force)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_path = f"data/network_batch_report_{timestamp}.json"
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+
+    bridges = report["bridges"]
+    print(
+        f"\n🕸️ Network report: {len(report['partitions'])} partitions computed, "
+        f"{len(report['skipped'])} unchanged"
+    )
+    print(
+        f"   Cross-subreddit: {bridges['num_nodes']} subreddits, "
+        f"{bridges['num_edges']} shared-user links, "
+        f"{len(bridges['top_bridge_users'])} bridge users"
+    )
+    print(f"   Report saved to {report_path}")
+
+
 def create_visualizations(data_path: str, output_dir: str = "visualizations"):
     """Generate comprehensive research visualizations"""
     from src.research_visualizations import ResearchVisualizations
@@ -255,6 +469,18 @@ def main():
             "analyze",
             "annotate",
             "annotate-enhanced",
+            "annotation-queue",
+            "retrain-classifier",
+            "interaction-graph",
+            "network-timeline",
+            "cascades",
+            "network-report",
+            "analytics-rollup",
+            "keyword-index",
+            "search-index",
+            "word-frequencies",
+            "snapshot",
+            "corpus-report",
             "visualize",
             "demo",
         ],
@@ -264,7 +490,7 @@ def main():
     parser.add_argument(
         "--data-path",
         type=str,
-        help="Path to data file for analysis or annotation (legacy support)",
+        help="Path to data file or analytics snapshot for analysis or annotation (legacy support)",
     )
 
     parser.add_argument(
@@ -284,6 +510,12 @@ def main():
         "--language", type=str, help="Filter posts by language for annotation"
     )
 
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Rebuild/recompute the annotation queue, interaction graph, network timeline, cascades, network report, analytics rollups, keyword index, search index or word frequencies, or retrain the triage classifier without waiting for new annotations",
+    )
+
     args = parser.parse_args()
 
     if args.command == "collect":
@@ -381,6 +613,42 @@ def main():
                 limit=args.limit, filter_criteria=filter_criteria
             )
 
+    elif args.command == "annotation-queue":
+        refresh_annotation_queue(full=args.full_refresh)
+
+    elif args.command == "retrain-classifier":
+        retrain_classifier(force=args.full_refresh)
+
+    elif args.command == "interaction-graph":
+        update_interaction_graph(full=args.full_refresh)
+
+    elif args.command == "network-timeline":
+        update_network_timeline(subreddit=args.subreddit, full=args.full_refresh)
+
+    elif args.command == "cascades":
+        update_cascades(full=args.full_refresh, limit=args.limit)
+
+    elif args.command == "network-report":
+        run_network_report(force=args.full_refresh)
+
+    elif args.command == "analytics-rollup":
+        update_analytics_rollups(full=args.full_refresh)
+
+    elif args.command == "keyword-index":
+        update_keyword_index(full=args.full_refresh)
+
+    elif args.command == "search-index":
+        update_search_index(full=args.full_refresh)
+
+    elif args.command == "word-frequencies":
+        update_word_frequencies(full=args.full_refresh)
+
+    elif args.command == "snapshot":
+        export_snapshot()
+
+    elif args.command == "corpus-report":
+        corpus_report()
+
     elif args.command == "visualize":
         if not args.data_path:
             logger.error("--data-path required for visualization")
@@ -11,7 +11,7 @@ from plotly.subplots import make_subplots
 
 
 class RealDataResearchDemo:
-    def __init__(self):
+    def __init__(self, snapshot_path=None):
         # Load real data
         with open(
             "/Users/drjforrest/dev/academicdev/misinformation_gay_mens_Health/data/analytics_report_20250902_063515.json",
@@ -19,11 +19,20 @@ class RealDataResearchDemo:
         ) as f:
             self.analytics_data = json.load(f)
 
-        with open(
-            "/Users/drjforrest/dev/academicdev/misinformation_gay_mens_Health/data/raw_reddit_data_20250902_060559.json",
-            "r",
-        ) as f:
-            self.raw_data = json.load(f)
+        if snapshot_path:
+            # Posts and comments from an analytics snapshot instead of the raw export
+            from src.analytics_snapshot import AnalyticsSnapshot
+
+            self.raw_data = AnalyticsSnapshot(snapshot_path).threads(
+                ["subreddit", "title", "selftext", "score", "language"],
+                ["author", "body", "score", "language"],
+            )
+        else:
+            with open(
+                "/Users/drjforrest/dev/academicdev/misinformation_gay_mens_Health/data/raw_reddit_data_20250902_060559.json",
+                "r",
+            ) as f:
+                self.raw_data = json.load(f)
 
         # Convert to DataFrames
         self.posts_df = pd.DataFrame(self.raw_data)
@@ -0,0 +1,384 @@
+"""
+Active-learning annotation queue
+Ranks unannotated posts by classifier uncertainty, spreads them across
+embedding clusters for diversity and stores the ranking in the
+annotation_queue table so annotation tools can page through it cheaply
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from sqlalchemy import and_, func, null, or_, update
+from sqlalchemy.orm import Session
+
+from src.data_persistence import DataPersistenceManager
+from src.database_models import (
+    AnnotationQueueItem,
+    PostAnnotation,
+    RedditComment,
+    RedditPost,
+)
+from src.embedding_classifier import parse_embedding
+
+
+def uncertainty_from_score(scores: np.ndarray) -> np.ndarray:
+    """
+    Margin-based uncertainty for binary probability scores
+
+    A score of 0.5 is maximally uncertain (1.0), scores of 0 or 1 are certain
+    (0.0). Missing scores count as fully uncertain.
+    """
+    scores = np.asarray(scores, dtype=float)
+    margin = np.abs(2 * np.clip(scores, 0.0, 1.0) - 1)
+    return np.where(np.isnan(scores), 1.0, 1.0 - margin)
+
+
+class AnnotationQueue:
+    """
+    Precomputed annotation queue ordered by expected model improvement
+
+    Priority mixes uncertainty sampling with diversity: items are ranked by
+    uncertainty inside their embedding cluster and every extra item from the
+    same cluster is discounted, so a page covers many regions of the corpus
+    instead of many near-duplicate borderline posts.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        score_column: str = "misinformation_score",
+        n_clusters: int = 20,
+        diversity_weight: float = 0.3,
+        centroids_path: str = "models/annotation_queue_centroids.npy",
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.score_column = getattr(RedditPost, score_column)
+        self.n_clusters = n_clusters
+        self.diversity_weight = diversity_weight
+        self.centroids_path = Path(centroids_path)
+        self.centroids = (
+            np.load(self.centroids_path) if self.centroids_path.exists() else None
+        )
+
+    def _candidate_query(self, session: Session, post_ids: Optional[List[str]]):
+        """Unannotated posts with the columns needed for ranking"""
+        annotated = session.query(PostAnnotation.post_id).filter(
+            PostAnnotation.post_id.isnot(None)
+        )
+        query = session.query(
+            RedditPost.id,
+            RedditPost.post_id,
+            self.score_column.label("score"),
+            RedditPost.combined_embedding,
+        ).filter(~RedditPost.post_id.in_(annotated))
+
+        if post_ids is not None:
+            query = query.filter(RedditPost.post_id.in_(post_ids))
+        return query
+
+    def _fit_centroids(self, session: Session, sample_size: int = 20000):
+        """Cluster a sample of stored embeddings and persist the centroids"""
+        from sklearn.cluster import MiniBatchKMeans
+
+        rows = (
+            self._candidate_query(session, None)
+            .filter(RedditPost.combined_embedding.isnot(None))
+            .limit(sample_size)
+        )
+        vectors = [parse_embedding(row.combined_embedding) for row in rows]
+        vectors = [vector for vector in vectors if vector is not None]
+        if len(vectors) < self.n_clusters:
+            logger.warning("Not enough embeddings to cluster; diversity disabled")
+            self.centroids = None
+            return
+
+        dims = pd.Series([len(vector) for vector in vectors]).mode()[0]
+        matrix = np.vstack([vector for vector in vectors if len(vector) == dims])
+
+        kmeans = MiniBatchKMeans(
+            n_clusters=self.n_clusters, random_state=42, n_init=3
+        ).fit(matrix)
+        self.centroids = kmeans.cluster_centers_.astype(np.float32)
+
+        self.centroids_path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(self.centroids_path, self.centroids)
+        logger.info(
+            f"Fitted {self.n_clusters} embedding clusters on {len(matrix)} posts"
+        )
+
+    def _assign_clusters(self, embeddings: List[Any]) -> np.ndarray:
+        """Nearest-centroid cluster for each stored embedding (-1 if unavailable)"""
+        clusters = np.full(len(embeddings), -1, dtype=int)
+        if self.centroids is None:
+            return clusters
+
+        dims = self.centroids.shape[1]
+        index, vectors = [], []
+        for i, value in enumerate(embeddings):
+            vector = parse_embedding(value)
+            if vector is not None and vector.shape[0] == dims:
+                index.append(i)
+                vectors.append(vector)
+
+        if vectors:
+            matrix = np.vstack(vectors)
+            # Squared distances without the constant |x|^2 term
+            distances = (self.centroids**2).sum(axis=1) - 2 * matrix @ self.centroids.T
+            clusters[index] = distances.argmin(axis=1)
+        return clusters
+
+    def refresh(
+        self,
+        full: bool = False,
+        post_ids: Optional[List[str]] = None,
+        batch_size: int = 1000,
+    ) -> Dict[str, int]:
+        """
+        Bring the queue up to date
+
+        By default only posts added since the last refresh are scored and
+        clustered (RedditPost.id watermark). Pass ``post_ids`` to re-rank
+        queued posts whose stored scores changed, or ``full=True`` to
+        re-cluster and rebuild every pending entry. Only the clusters that
+        gained, lost or changed items are re-ranked.
+        """
+        with self.db_manager.get_session() as session:
+            if full or (self.centroids is None and post_ids is None):
+                self._fit_centroids(session)
+
+            query = self._candidate_query(session, post_ids)
+            if post_ids is not None and not full:
+                query = query.filter(
+                    RedditPost.post_id.in_(session.query(AnnotationQueueItem.post_id))
+                )
+            elif not full:
+                watermark = session.query(
+                    func.max(AnnotationQueueItem.post_row_id)
+                ).scalar()
+                if watermark is not None:
+                    query = query.filter(RedditPost.id > watermark)
+
+            upserted = 0
+            clusters = set()
+            batch = []
+            for row in query.yield_per(batch_size):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    upserted += self._upsert_batch(session, batch, clusters)
+                    batch = []
+            if batch:
+                upserted += self._upsert_batch(session, batch, clusters)
+
+            reranked = self._rerank(session, None if full else clusters)
+            session.commit()
+
+        logger.info(f"Annotation queue refreshed: {upserted} posts scored")
+        return {"scored": upserted, "reranked": reranked}
+
+    def _upsert_batch(
+        self, session: Session, rows: List[Any], touched: Set[int]
+    ) -> int:
+        """
+        Insert or update queue entries for a batch of candidate posts, adding
+        the clusters they leave or join to ``touched``
+        """
+        scores = np.array(
+            [np.nan if row.score is None else row.score for row in rows], dtype=float
+        )
+        uncertainty = uncertainty_from_score(scores)
+        clusters = self._assign_clusters([row.combined_embedding for row in rows])
+
+        existing = {
+            post_id: (item_id, cluster_id)
+            for post_id, item_id, cluster_id in session.query(
+                AnnotationQueueItem.post_id,
+                AnnotationQueueItem.id,
+                AnnotationQueueItem.cluster_id,
+            ).filter(AnnotationQueueItem.post_id.in_([row.post_id for row in rows]))
+        }
+
+        now = datetime.utcnow()
+        inserts, updates = [], []
+        for row, score, item_uncertainty, cluster in zip(
+            rows, scores, uncertainty, clusters
+        ):
+            values = {
+                "post_id": row.post_id,
+                "post_row_id": row.id,
+                "model_score": None if np.isnan(score) else float(score),
+                "uncertainty": float(item_uncertainty),
+                "cluster_id": int(cluster),
+                "updated_at": now,
+            }
+            touched.add(int(cluster))
+            # Existing items keep their status so annotated posts stay done
+            if row.post_id in existing:
+                item_id, old_cluster = existing[row.post_id]
+                touched.add(old_cluster)
+                updates.append({"id": item_id, **values})
+            else:
+                inserts.append({**values, "status": "pending"})
+
+        if inserts:
+            session.bulk_insert_mappings(AnnotationQueueItem, inserts)
+        if updates:
+            session.bulk_update_mappings(AnnotationQueueItem, updates)
+        return len(rows)
+
+    def _rerank(self, session: Session, clusters: Optional[Set[int]] = None) -> int:
+        """
+        Recompute priorities of pending items from their stored signals
+
+        Runs as one UPDATE over a windowed ranking, limited to ``clusters``
+        (every cluster when None), and writes only rows whose rank changed.
+        """
+        if clusters is not None and not clusters:
+            return 0
+
+        item = AnnotationQueueItem
+        pending = session.query(
+            item.id,
+            item.uncertainty,
+            (
+                func.row_number().over(
+                    partition_by=item.cluster_id,
+                    order_by=(item.uncertainty.desc(), item.id),
+                )
+                - 1
+            ).label("rank"),
+        ).filter(item.status == "pending")
+        if clusters is not None:
+            pending = pending.filter(item.cluster_id.in_(clusters))
+        ranked = pending.subquery()
+
+        priority = (1 - self.diversity_weight) * ranked.c.uncertainty + (
+            self.diversity_weight / (1.0 + ranked.c.rank)
+        )
+        result = session.execute(
+            update(item)
+            .where(item.id == ranked.c.id)
+            .where(
+                or_(
+                    item.cluster_rank.is_(None),
+                    item.priority.is_(None),
+                    item.cluster_rank != ranked.c.rank,
+                    func.abs(item.priority - priority) > 1e-9,
+                )
+            )
+            .values(cluster_rank=ranked.c.rank, priority=priority)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def has_pending(self, session: Session) -> bool:
+        """Whether the queue has been built and still has work in it"""
+        return (
+            session.query(AnnotationQueueItem.id)
+            .filter(AnnotationQueueItem.status == "pending")
+            .first()
+            is not None
+        )
+
+    def page_query(self, session: Session, served: Optional[Set[int]] = None):
+        """
+        Query of (RedditPost, priority, queue id) for pending items, best first
+
+        ``served`` holds the queue ids already shown in this session. Pages
+        exclude them rather than continuing after a (priority, id) cursor,
+        because re-ranking after each annotation raises the priority of
+        items of the annotated cluster, which would move unseen items above
+        a cursor and skip them.
+        """
+        query = (
+            session.query(
+                RedditPost, AnnotationQueueItem.priority, AnnotationQueueItem.id
+            )
+            .join(
+                AnnotationQueueItem, AnnotationQueueItem.post_id == RedditPost.post_id
+            )
+            .filter(AnnotationQueueItem.status == "pending")
+        )
+        if served:
+            query = query.filter(AnnotationQueueItem.id.notin_(served))
+        return query.order_by(
+            AnnotationQueueItem.priority.desc(), AnnotationQueueItem.id.asc()
+        )
+
+    def recency_query(self, session: Session):
+        """Newest-first fallback with the same row shape as page_query()"""
+        return session.query(RedditPost, null(), null()).order_by(
+            RedditPost.created_utc.desc()
+        )
+
+    def mark_annotated(self, post_id: str) -> None:
+        """
+        Remove an annotated post from the pending queue and re-rank its
+        cluster; bumps the data version so cached analytics see the annotation
+        """
+        with self.db_manager.get_session() as session:
+            cluster = (
+                session.query(AnnotationQueueItem.cluster_id)
+                .filter(AnnotationQueueItem.post_id == post_id)
+                .scalar()
+            )
+            session.query(AnnotationQueueItem).filter(
+                AnnotationQueueItem.post_id == post_id
+            ).update(
+                {"status": "annotated", "updated_at": datetime.utcnow()},
+                synchronize_session=False,
+            )
+            if cluster is not None:
+                self._rerank(session, {cluster})
+            session.commit()
+        self.db_manager.bump_data_version()
+
+
+def load_comments_for_posts(
+    session: Session, post_ids: List[str], per_post: int = 10
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Earliest ``per_post`` comments of each post in one windowed query"""
+    if not post_ids:
+        return {}
+
+    position = (
+        func.row_number()
+        .over(
+            partition_by=RedditComment.post_id,
+            order_by=RedditComment.created_utc.asc(),
+        )
+        .label("position")
+    )
+    ranked = (
+        session.query(
+            RedditComment.post_id,
+            RedditComment.comment_id,
+            RedditComment.author,
+            RedditComment.body,
+            RedditComment.created_utc,
+            RedditComment.score,
+            position,
+        )
+        .filter(RedditComment.post_id.in_(post_ids))
+        .subquery()
+    )
+
+    comments = {post_id: [] for post_id in post_ids}
+    for row in (
+        session.query(ranked)
+        .filter(ranked.c.position <= per_post)
+        .order_by(ranked.c.post_id, ranked.c.position)
+    ):
+        comments[row.post_id].append(
+            {
+                "comment_id": row.comment_id,
+                "author": row.author,
+                "body": row.body,
+                "created_utc": row.created_utc.isoformat() if row.created_utc else "",
+                "score": row.score,
+            }
+        )
+    return comments
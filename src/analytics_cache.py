@@ -0,0 +1,157 @@
+"""
+Analytics result cache
+Keeps dashboard analysis results for a TTL, keyed by method, parameters and
+the corpus data version, so repeated dashboard loads reuse one computation
+and any ingest write invalidates every cached result at once
+"""
+
+import functools
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import Config
+from src.data_persistence import DataPersistenceManager
+
+
+class AnalyticsCache:
+    """
+    TTL cache for analytics results
+
+    Entries live in memory and, when ``cache_dir`` is set, in pickle files
+    there as well, so several dashboard processes sharing the directory
+    compute each result once. Cached values are shared between callers and
+    must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        db_manager: DataPersistenceManager,
+        ttl_seconds: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+    ):
+        self.db_manager = db_manager
+        self.ttl_seconds = (
+            Config.ANALYTICS_CACHE_TTL if ttl_seconds is None else ttl_seconds
+        )
+        cache_dir = Config.ANALYTICS_CACHE_DIR if cache_dir is None else cache_dir
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(name: str, args: Tuple, kwargs: Dict, version: int) -> str:
+        """Stable key of a method call against one data version"""
+        payload = repr((name, args, sorted(kwargs.items()), version))
+        return f"v{version}_{hashlib.sha1(payload.encode()).hexdigest()}"
+
+    def get_or_compute(
+        self, name: str, args: Tuple, kwargs: Dict, compute: Callable[[], Any]
+    ) -> Any:
+        """Cached result of a call, computed and stored on a miss"""
+        if self.ttl_seconds <= 0:
+            return compute()
+
+        version = self.db_manager.data_version()
+        key = self.key(name, args, kwargs, version)
+        entry = self._entries.get(key) or self._read(key)
+        if entry is not None and time.time() - entry[0] < self.ttl_seconds:
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = compute()
+        entry = (time.time(), value)
+        self._entries[key] = entry
+        self._write(key, entry)
+        self._evict(version)
+        return value
+
+    def clear(self) -> None:
+        """Drop every cached result, in memory and on disk"""
+        self._entries.clear()
+        if self.cache_dir:
+            for path in self.cache_dir.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _evict(self, version: int) -> None:
+        """
+        Drop expired entries and entries of older data versions, in memory
+        and on disk (leftover temporary files included)
+        """
+        now = time.time()
+        for key in [
+            key
+            for key, (created, _) in self._entries.items()
+            if now - created >= self.ttl_seconds or self._version_of(key) < version
+        ]:
+            del self._entries[key]
+
+        if not self.cache_dir:
+            return
+        for path in self.cache_dir.iterdir():
+            if path.suffix not in (".pkl", ".tmp"):
+                continue
+            try:
+                expired = now - path.stat().st_mtime >= self.ttl_seconds
+                if expired or self._version_of(path.name) < version:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _version_of(key: str) -> int:
+        """Data version of a key or cache file name (-1 if it has none)"""
+        prefix = key.split("_", 1)[0]
+        return int(prefix[1:]) if prefix[:1] == "v" and prefix[1:].isdigit() else -1
+
+    def _read(self, key: str) -> Optional[Tuple[float, Any]]:
+        if not self.cache_dir:
+            return None
+        path = self.cache_dir / f"{key}.pkl"
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable analytics cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _write(self, key: str, entry: Tuple[float, Any]) -> None:
+        if not self.cache_dir:
+            return
+        path = self.cache_dir / f"{key}.pkl"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write analytics cache entry {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+
+def cached_analysis(method: Callable) -> Callable:
+    """Serve a method of an object with an ``analytics_cache`` from the cache"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.analytics_cache.get_or_compute(
+            method.__name__, args, kwargs, lambda: method(self, *args, **kwargs)
+        )
+
+    return wrapper
@@ -4,32 +4,38 @@ Analytics Dashboard for Health Misinformation Research
 Provides comprehensive insights and visualizations for research teams
 """
 
+import base64
 import json
-import re
+import os
 from collections import Counter, defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
+import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from loguru import logger
 from plotly.subplots import make_subplots
+from sqlalchemy import and_, case, extract, func, or_
 
 try:
-    import base64
-    import io
-
-    import matplotlib.pyplot as plt
     from wordcloud import WordCloud
 
     WORDCLOUD_AVAILABLE = True
 except ImportError:
     WORDCLOUD_AVAILABLE = False
 
-from config.settings import ResearchConfig
+from config.settings import Config, ResearchConfig
+from src.analytics_cache import AnalyticsCache, cached_analysis
+from src.analytics_frame import AnalyticsFrame
+from src.analytics_rollup import AnalyticsRollupStore
 from src.data_persistence import DataPersistenceManager
 from src.database_models import RedditComment, RedditPost
+from src.full_text_search import FullTextSearch
+from src.keyword_index import KeywordIndex, find_offsets, post_text
+from src.model_registry import ModelRegistry
+from src.word_frequency import WordFrequencyStore
 
 # Import ML classifiers
 try:
@@ -51,17 +57,18 @@ class HealthMisinformationAnalytics:
 
     def __init__(self):
         self.db_manager = DataPersistenceManager()
-        self.posts_data = []
-        self.comments_data = []
-        self.analytics_cache = {}
+        self.frame = AnalyticsFrame()
+        self._frame_version: Optional[int] = None
+        self.analytics_cache = AnalyticsCache(db_manager=self.db_manager)
         self.ml_classifier = None
         self.lgbtq_classifier = None
+        self.model_registry = ModelRegistry()
 
-        # Load ML models if available
+        # Load ML models if available, preferring the sklearn-free scorers
         if ML_AVAILABLE:
             try:
                 self.ml_classifier = HealthContentClassifier()
-                self.ml_classifier.load_model()
+                self._load_classifier(self.ml_classifier)
                 logger.info("Health content classifier loaded successfully")
             except Exception as e:
                 logger.warning(f"Could not load ML classifier: {e}")
@@ -70,287 +77,387 @@ class HealthMisinformationAnalytics:
         if LGBTQ_ML_AVAILABLE:
             try:
                 self.lgbtq_classifier = LGBTQContentClassifier()
-                self.lgbtq_classifier.load_model()
+                self._load_classifier(self.lgbtq_classifier)
                 logger.info("LGBTQ+ content classifier loaded successfully")
             except Exception as e:
                 logger.warning(f"Could not load LGBTQ+ ML classifier: {e}")
                 self.lgbtq_classifier = None
 
-    def load_data(self) -> Dict[str, int]:
-        """Load all posts and comments from database"""
-        logger.info("Loading data for analytics...")
+        self.keyword_index = KeywordIndex(db_manager=self.db_manager)
+        self.search_index = FullTextSearch(db_manager=self.db_manager)
+        self.word_frequencies = WordFrequencyStore(db_manager=self.db_manager)
+        self.rollups = AnalyticsRollupStore(
+            db_manager=self.db_manager,
+            health_classifier=self.ml_classifier,
+            lgbtq_classifier=self.lgbtq_classifier,
+        )
 
-        with self.db_manager.get_session() as session:
-            # Load posts
-            posts = session.query(RedditPost).all()
-            self.posts_data = [
-                {
-                    "post_id": post.post_id,
-                    "subreddit": post.subreddit,
-                    "title": post.title,
-                    "selftext": post.selftext or "",
-                    "author": post.author,
-                    "created_utc": post.created_utc,
-                    "score": post.score,
-                    "num_comments": post.num_comments,
-                    "language": post.language,
-                    "is_newcomer_related": post.is_newcomer_related,
-                    "english_translation": getattr(post, "english_translation", None),
-                    "contains_health_keywords": getattr(
-                        post, "contains_health_keywords", False
-                    ),
-                    "keyword_count": getattr(post, "keyword_count", 0),
-                }
-                for post in posts
-            ]
+    @staticmethod
+    def _load_classifier(classifier) -> None:
+        """Load the exported scorer, falling back to the pickled sklearn pipeline"""
+        try:
+            classifier.load_scorer()
+        except FileNotFoundError:
+            logger.info("No exported scorer found, loading sklearn pipeline")
+            classifier.load_model()
 
-            # Load comments
-            comments = session.query(RedditComment).all()
-            self.comments_data = [
-                {
-                    "comment_id": comment.comment_id,
-                    "post_id": comment.post_id,
-                    "author": comment.author,
-                    "body": comment.body,
-                    "created_utc": comment.created_utc,
-                    "score": comment.score,
-                    "language": comment.language,
-                    "english_translation": getattr(
-                        comment, "english_translation", None
-                    ),
-                }
-                for comment in comments
-            ]
+    def _model_performance(self, model_name: str, classifier) -> Dict[str, Any]:
+        """Latest registered training metrics for a classifier"""
+        entry = self.model_registry.get(model_name) or {}
 
-        stats = {
-            "total_posts": len(self.posts_data),
-            "total_comments": len(self.comments_data),
-            "unique_authors": len(
-                set(
-                    [p["author"] for p in self.posts_data]
-                    + [c["author"] for c in self.comments_data]
-                )
-            ),
+        feature_count = entry.get("feature_count")
+        if feature_count is None and classifier.scorer is not None:
+            feature_count = len(classifier.scorer.feature_names)
+
+        return {
+            "feature_count": feature_count,
+            "training_accuracy": entry.get("training_accuracy"),
+            "test_accuracy": entry.get("test_accuracy"),
+            "trained_at": entry.get("trained_at"),
+            "params": entry.get("params"),
         }
 
+    def load_data(self) -> Dict[str, int]:
+        """Load all posts and comments from database"""
+        logger.info("Loading data for analytics...")
+
+        version = self.db_manager.data_version()
+        self.frame = AnalyticsFrame.load(self.db_manager)
+        self._frame_version = version
+        stats = self.frame.summary()
+
         logger.info(
             f"Loaded {stats['total_posts']} posts, {stats['total_comments']} comments from {stats['unique_authors']} unique authors"
         )
         return stats
 
+    def _ensure_frame(self) -> None:
+        """Reload the frame if data was written since it was loaded"""
+        if self._frame_version != self.db_manager.data_version():
+            self.load_data()
+
+    @cached_analysis
+    def dashboard_data(self) -> Dict[str, Any]:
+        """
+        Dashboard analyses read from the daily rollups
+
+        Rows ingested since the last rollup update are folded in first, so
+        the cost depends on new data and the number of rollup groups, not on
+        corpus size.
+        """
+        self.rollups.update()
+
+        language_analysis = self.rollups.language_distribution()
+        keyword_analysis = self.rollups.health_keywords()
+        subreddit_analysis = self.rollups.subreddit_patterns()
+        newcomer_analysis = self.rollups.newcomer_content()
+
+        return {
+            "data_summary": self.rollups.summary(),
+            "language_analysis": language_analysis,
+            "keyword_analysis": keyword_analysis,
+            "subreddit_analysis": subreddit_analysis,
+            "temporal_analysis": self.rollups.temporal_patterns(),
+            "newcomer_analysis": newcomer_analysis,
+            "ml_analysis": self.rollup_ml_health_classification(),
+            "insights": self._insights(
+                language_analysis,
+                keyword_analysis,
+                subreddit_analysis,
+                newcomer_analysis,
+            ),
+        }
+
+    @cached_analysis
     def analyze_language_distribution(self) -> Dict[str, Any]:
         """Analyze language distribution across posts and comments"""
 
-        # Posts by language
-        post_languages = Counter(
-            [p["language"] for p in self.posts_data if p["language"]]
-        )
+        with self.db_manager.get_session() as session:
+            # Posts by language
+            post_languages = dict(
+                session.query(RedditPost.language, func.count(RedditPost.id))
+                .filter(RedditPost.language.isnot(None), RedditPost.language != "")
+                .group_by(RedditPost.language)
+                .all()
+            )
 
-        # Comments by language
-        comment_languages = Counter(
-            [c["language"] for c in self.comments_data if c["language"]]
-        )
+            # Comments by language
+            comment_languages = dict(
+                session.query(RedditComment.language, func.count(RedditComment.id))
+                .filter(
+                    RedditComment.language.isnot(None), RedditComment.language != ""
+                )
+                .group_by(RedditComment.language)
+                .all()
+            )
 
-        # Multilingual posts (posts with translations)
-        multilingual_posts = len(
-            [p for p in self.posts_data if p["english_translation"]]
-        )
+            # Multilingual posts (posts with translations)
+            total_posts, multilingual_posts = session.query(
+                func.count(RedditPost.id),
+                self._count_where(
+                    RedditPost.english_translation.isnot(None)
+                    & (RedditPost.english_translation != "")
+                ),
+            ).one()
 
         # Language coverage
         all_languages = set(post_languages.keys()) | set(comment_languages.keys())
 
         return {
-            "post_languages": dict(post_languages),
-            "comment_languages": dict(comment_languages),
+            "post_languages": post_languages,
+            "comment_languages": comment_languages,
             "total_languages": len(all_languages),
-            "multilingual_posts": multilingual_posts,
+            "total_posts": total_posts,
+            "multilingual_posts": multilingual_posts or 0,
             "multilingual_percentage": (
-                (multilingual_posts / len(self.posts_data) * 100)
-                if self.posts_data
-                else 0
+                ((multilingual_posts or 0) / total_posts * 100) if total_posts else 0
             ),
         }
 
+    @cached_analysis
     def analyze_health_keywords(self) -> Dict[str, Any]:
         """Analyze health keyword usage across posts"""
 
         # Health keywords from config
         primary_keywords = ResearchConfig.PRIMARY_KEYWORDS
         colloquial_terms = ResearchConfig.COLLOQUIAL_TERMS
-        all_keywords = primary_keywords + colloquial_terms
-
-        keyword_counts = defaultdict(int)
+        all_keywords = list(dict.fromkeys(primary_keywords + colloquial_terms))
+
+        # Posts containing each keyword, read from the inverted index
+        self.keyword_index.update()
+        original = {keyword.lower(): keyword for keyword in all_keywords}
+        post_keywords: Dict[int, set] = {}
+        post_fields: Dict[int, tuple] = {}
+        for doc_id, term, *fields in self.keyword_index.post_hits(
+            all_keywords,
+            RedditPost.post_id,
+            RedditPost.subreddit,
+            RedditPost.language,
+            RedditPost.is_newcomer_related,
+        ):
+            post_keywords.setdefault(doc_id, set()).add(original[term])
+            post_fields[doc_id] = fields
+
+        keyword_counts = Counter()
+        combinations = Counter()
         posts_with_keywords = []
+        for doc_id, found in post_keywords.items():
+            keywords = [keyword for keyword in all_keywords if keyword in found]
+            keyword_counts.update(keywords)
+            if len(keywords) > 1:
+                combinations[", ".join(sorted(keywords))] += 1
+
+            post_id, subreddit, language, is_newcomer_related = post_fields[doc_id]
+            posts_with_keywords.append(
+                {
+                    "post_id": post_id,
+                    "subreddit": subreddit,
+                    "keywords": keywords,
+                    "keyword_count": len(keywords),
+                    "language": language,
+                    "is_newcomer_related": bool(is_newcomer_related),
+                }
+            )
 
-        for post in self.posts_data:
-            full_text = (post["title"] + " " + post["selftext"]).lower()
-            found_keywords = []
-
-            for keyword in all_keywords:
-                if keyword.lower() in full_text:
-                    keyword_counts[keyword] += 1
-                    found_keywords.append(keyword)
-
-            if found_keywords:
-                posts_with_keywords.append(
-                    {
-                        "post_id": post["post_id"],
-                        "subreddit": post["subreddit"],
-                        "keywords": found_keywords,
-                        "keyword_count": len(found_keywords),
-                        "language": post["language"],
-                        "is_newcomer_related": post["is_newcomer_related"],
-                    }
-                )
-
-        # Top keyword combinations
-        keyword_combinations = defaultdict(int)
-        for post in posts_with_keywords:
-            if len(post["keywords"]) > 1:
-                combo = tuple(sorted(post["keywords"]))
-                keyword_combinations[combo] += 1
+        with self.db_manager.get_session() as session:
+            total_posts = session.query(func.count(RedditPost.id)).scalar() or 0
 
         return {
-            "keyword_counts": dict(keyword_counts),
+            "keyword_counts": {
+                keyword: keyword_counts[keyword]
+                for keyword in all_keywords
+                if keyword_counts[keyword]
+            },
             "posts_with_keywords": len(posts_with_keywords),
             "keyword_coverage": (
-                (len(posts_with_keywords) / len(self.posts_data) * 100)
-                if self.posts_data
-                else 0
+                (len(posts_with_keywords) / total_posts * 100) if total_posts else 0
             ),
-            "top_combinations": {
-                ", ".join(combo): count
-                for combo, count in sorted(
-                    keyword_combinations.items(), key=lambda x: x[1], reverse=True
-                )[:10]
-            },
+            "top_combinations": dict(combinations.most_common(10)),
             "posts_with_keywords_data": posts_with_keywords,
         }
 
+    @cached_analysis
     def analyze_subreddit_patterns(self) -> Dict[str, Any]:
         """Analyze patterns across different subreddits"""
 
-        subreddit_stats = defaultdict(
-            lambda: {
-                "post_count": 0,
-                "comment_count": 0,
-                "languages": set(),
-                "health_keywords": 0,
-                "newcomer_posts": 0,
-                "avg_score": 0,
-                "total_score": 0,
+        with self.db_manager.get_session() as session:
+            # Post aggregates by subreddit
+            post_rows = (
+                session.query(
+                    RedditPost.subreddit,
+                    func.count(RedditPost.id),
+                    self._count_where(RedditPost.contains_health_keywords.is_(True)),
+                    self._count_where(RedditPost.is_newcomer_related.is_(True)),
+                    func.coalesce(func.sum(RedditPost.score), 0),
+                )
+                .group_by(RedditPost.subreddit)
+                .all()
+            )
+
+            subreddit_languages = defaultdict(list)
+            for subreddit, language in (
+                session.query(RedditPost.subreddit, RedditPost.language)
+                .filter(RedditPost.language.isnot(None), RedditPost.language != "")
+                .distinct()
+            ):
+                subreddit_languages[subreddit].append(language)
+
+            # Count comments per subreddit through their posts
+            comment_counts = dict(
+                session.query(RedditPost.subreddit, func.count(RedditComment.id))
+                .join(RedditComment, RedditComment.post_id == RedditPost.post_id)
+                .group_by(RedditPost.subreddit)
+                .all()
+            )
+
+        subreddit_stats = {}
+        for sub, post_count, health_keywords, newcomer_posts, total_score in post_rows:
+            languages = subreddit_languages.get(sub, [])
+            subreddit_stats[sub] = {
+                "post_count": post_count,
+                "comment_count": comment_counts.get(sub, 0),
+                "languages": languages,
+                "health_keywords": health_keywords or 0,
+                "newcomer_posts": newcomer_posts or 0,
+                "avg_score": total_score / post_count if post_count else 0,
+                "total_score": total_score,
+                "language_diversity": len(languages),
             }
-        )
 
-        # Analyze posts by subreddit
-        for post in self.posts_data:
-            sub = post["subreddit"]
-            subreddit_stats[sub]["post_count"] += 1
-            if post["language"]:
-                subreddit_stats[sub]["languages"].add(post["language"])
-            if post["contains_health_keywords"]:
-                subreddit_stats[sub]["health_keywords"] += 1
-            if post["is_newcomer_related"]:
-                subreddit_stats[sub]["newcomer_posts"] += 1
-            if post["score"]:
-                subreddit_stats[sub]["total_score"] += post["score"]
-
-        # Calculate averages and convert sets to lists
-        for sub, stats in subreddit_stats.items():
-            if stats["post_count"] > 0:
-                stats["avg_score"] = stats["total_score"] / stats["post_count"]
-            stats["languages"] = list(stats["languages"])
-            stats["language_diversity"] = len(stats["languages"])
-
-        # Count comments per subreddit
-        comment_counts = defaultdict(int)
-        for comment in self.comments_data:
-            # Find the subreddit for this comment's post
-            post = next(
-                (p for p in self.posts_data if p["post_id"] == comment["post_id"]), None
-            )
-            if post:
-                comment_counts[post["subreddit"]] += 1
-
-        for sub, count in comment_counts.items():
-            subreddit_stats[sub]["comment_count"] = count
-
-        return dict(subreddit_stats)
+        return subreddit_stats
 
+    @cached_analysis
     def analyze_temporal_patterns(self) -> Dict[str, Any]:
         """Analyze temporal patterns in posts"""
 
-        # Convert dates and analyze
-        posts_with_dates = [p for p in self.posts_data if p["created_utc"]]
-
-        if not posts_with_dates:
-            return {"error": "No posts with valid dates found"}
+        with self.db_manager.get_session() as session:
+            earliest, latest = (
+                session.query(
+                    func.min(RedditPost.created_utc), func.max(RedditPost.created_utc)
+                )
+                .filter(RedditPost.created_utc.isnot(None))
+                .one()
+            )
+            if earliest is None:
+                return {"error": "No posts with valid dates found"}
+
+            # Counts per (day, hour); daily, weekly and hourly totals fold
+            # these at most 24-per-day buckets
+            day = func.date(RedditPost.created_utc)
+            hour = extract("hour", RedditPost.created_utc)
+            buckets = (
+                session.query(day, hour, func.count(RedditPost.id))
+                .filter(RedditPost.created_utc.isnot(None))
+                .group_by(day, hour)
+                .all()
+            )
 
-        # Daily posting patterns
         daily_counts = defaultdict(int)
         weekly_counts = defaultdict(int)
         hourly_counts = defaultdict(int)
 
-        for post in posts_with_dates:
-            date = post["created_utc"]
-            if isinstance(date, str):
-                date = datetime.fromisoformat(date.replace("Z", "+00:00"))
-
-            daily_counts[date.strftime("%Y-%m-%d")] += 1
-            weekly_counts[date.strftime("%Y-W%U")] += 1
-            hourly_counts[date.hour] += 1
+        for bucket_day, bucket_hour, count in buckets:
+            date = datetime.fromisoformat(str(bucket_day))
+            daily_counts[date.strftime("%Y-%m-%d")] += count
+            weekly_counts[date.strftime("%Y-W%U")] += count
+            hourly_counts[int(bucket_hour)] += count
 
         return {
             "daily_counts": dict(daily_counts),
             "weekly_counts": dict(weekly_counts),
             "hourly_counts": dict(hourly_counts),
-            "date_range": {
-                "earliest": min(
-                    p["created_utc"] for p in posts_with_dates if p["created_utc"]
-                ),
-                "latest": max(
-                    p["created_utc"] for p in posts_with_dates if p["created_utc"]
-                ),
-            },
+            "date_range": {"earliest": earliest, "latest": latest},
         }
 
+    @cached_analysis
     def analyze_newcomer_content(self) -> Dict[str, Any]:
         """Analyze content specifically related to newcomers"""
 
-        newcomer_posts = [p for p in self.posts_data if p["is_newcomer_related"]]
-
-        # Language distribution for newcomer posts
-        newcomer_languages = Counter(
-            [p["language"] for p in newcomer_posts if p["language"]]
+        newcomer = RedditPost.is_newcomer_related.is_(True)
+        full_text = func.lower(
+            RedditPost.title + " " + func.coalesce(RedditPost.selftext, "")
         )
+        keywords = ResearchConfig.PRIMARY_KEYWORDS + ResearchConfig.COLLOQUIAL_TERMS
 
-        # Health topics in newcomer posts
-        newcomer_keywords = defaultdict(int)
-        for post in newcomer_posts:
-            full_text = (post["title"] + " " + post["selftext"]).lower()
-            for keyword in (
-                ResearchConfig.PRIMARY_KEYWORDS + ResearchConfig.COLLOQUIAL_TERMS
-            ):
-                if keyword.lower() in full_text:
-                    newcomer_keywords[keyword] += 1
+        with self.db_manager.get_session() as session:
+            total_posts, total_newcomer_posts = session.query(
+                func.count(RedditPost.id), self._count_where(newcomer)
+            ).one()
+            total_newcomer_posts = total_newcomer_posts or 0
+
+            # Language distribution for newcomer posts
+            newcomer_languages = dict(
+                session.query(RedditPost.language, func.count(RedditPost.id))
+                .filter(
+                    newcomer,
+                    RedditPost.language.isnot(None),
+                    RedditPost.language != "",
+                )
+                .group_by(RedditPost.language)
+                .all()
+            )
+
+            # Health topics in newcomer posts, one counter column per keyword
+            keyword_hits = (
+                session.query(
+                    *[
+                        self._count_where(
+                            full_text.contains(keyword.lower(), autoescape=True)
+                        )
+                        for keyword in keywords
+                    ]
+                )
+                .filter(newcomer)
+                .one()
+            )
+            newcomer_keywords = {
+                keyword: hits for keyword, hits in zip(keywords, keyword_hits) if hits
+            }
 
-        # Subreddit distribution for newcomer posts
-        newcomer_subreddits = Counter([p["subreddit"] for p in newcomer_posts])
+            # Subreddit distribution for newcomer posts
+            newcomer_subreddits = dict(
+                session.query(RedditPost.subreddit, func.count(RedditPost.id))
+                .filter(newcomer)
+                .group_by(RedditPost.subreddit)
+                .all()
+            )
 
         return {
-            "total_newcomer_posts": len(newcomer_posts),
+            "total_newcomer_posts": total_newcomer_posts,
             "percentage_newcomer": (
-                (len(newcomer_posts) / len(self.posts_data) * 100)
-                if self.posts_data
-                else 0
+                (total_newcomer_posts / total_posts * 100) if total_posts else 0
             ),
-            "newcomer_languages": dict(newcomer_languages),
-            "newcomer_keywords": dict(newcomer_keywords),
-            "newcomer_subreddits": dict(newcomer_subreddits),
+            "newcomer_languages": newcomer_languages,
+            "newcomer_keywords": newcomer_keywords,
+            "newcomer_subreddits": newcomer_subreddits,
         }
 
+    @staticmethod
+    def _count_where(condition):
+        """SQL aggregate counting the rows of a group matching ``condition``"""
+        return func.sum(case((condition, 1), else_=0))
+
+    @cached_analysis
     def generate_insights(self) -> Dict[str, List[str]]:
         """Generate actionable insights for research teams"""
+        return self._insights(
+            self.analyze_language_distribution(),
+            self.analyze_health_keywords(),
+            self.analyze_subreddit_patterns(),
+            self.analyze_newcomer_content(),
+        )
+
+    def _insights(
+        self,
+        lang_data: Dict[str, Any],
+        keyword_data: Dict[str, Any],
+        subreddit_data: Dict[str, Any],
+        newcomer_data: Dict[str, Any],
+    ) -> Dict[str, List[str]]:
+        """
+        Insights from already computed analyses (uncached: the analyses are
+        large, and callers that have them have already paid for them)
+        """
 
         insights = {
             "language_insights": [],
@@ -359,12 +466,6 @@ class HealthMisinformationAnalytics:
             "research_recommendations": [],
         }
 
-        # Load analytics data
-        lang_data = self.analyze_language_distribution()
-        keyword_data = self.analyze_health_keywords()
-        subreddit_data = self.analyze_subreddit_patterns()
-        newcomer_data = self.analyze_newcomer_content()
-
         # Language insights
         if lang_data["multilingual_percentage"] > 10:
             insights["language_insights"].append(
@@ -440,6 +541,7 @@ class HealthMisinformationAnalytics:
 
         return insights
 
+    @cached_analysis
     def create_visualizations(self) -> Dict[str, go.Figure]:
         """Create comprehensive visualizations for the dashboard"""
 
@@ -513,10 +615,9 @@ class HealthMisinformationAnalytics:
             figures["subreddit_analysis"] = fig
 
         # Multilingual content analysis
-        multilingual_posts = len(
-            [p for p in self.posts_data if p["english_translation"]]
-        )
-        english_only = len(self.posts_data) - multilingual_posts
+        total_posts = lang_data["total_posts"]
+        multilingual_posts = lang_data["multilingual_posts"]
+        english_only = total_posts - multilingual_posts
 
         if multilingual_posts > 0:
             fig = px.pie(
@@ -534,7 +635,7 @@ class HealthMisinformationAnalytics:
         newcomer_data = self.analyze_newcomer_content()
         if newcomer_data["total_newcomer_posts"] > 0:
             newcomer_count = newcomer_data["total_newcomer_posts"]
-            general_count = len(self.posts_data) - newcomer_count
+            general_count = total_posts - newcomer_count
 
             fig = px.pie(
                 values=[general_count, newcomer_count],
@@ -580,206 +681,207 @@ class HealthMisinformationAnalytics:
         logger.info(f"Analytics report saved to {output_path}")
         return report
 
-    def generate_word_cloud(self, max_words: int = 100) -> str:
-        """Generate word cloud from posts and comments content"""
+    def word_cloud_path(self, max_words: int = 100) -> Optional[str]:
+        """
+        PNG word cloud of the stored word frequencies
+
+        Images are rendered once per frequency version and word count and
+        reused from Config.WORD_CLOUD_DIR until new content is counted.
+        """
         if not WORDCLOUD_AVAILABLE:
             return None
 
-        # Combine all text content
-        all_text = []
-        for post in self.posts_data:
-            all_text.append(post.get("title", ""))
-            all_text.append(post.get("selftext", ""))
-
-        for comment in self.comments_data:
-            all_text.append(comment.get("body", ""))
-
-        # Clean and combine text
-        text = " ".join(all_text).lower()
-        # Remove common words and Reddit-specific terms
-        stopwords = {
-            "the",
-            "and",
-            "or",
-            "but",
-            "in",
-            "on",
-            "at",
-            "to",
-            "for",
-            "of",
-            "with",
-            "by",
-            "from",
-            "as",
-            "is",
-            "was",
-            "are",
-            "were",
-            "be",
-            "been",
-            "have",
-            "has",
-            "had",
-            "do",
-            "does",
-            "did",
-            "will",
-            "would",
-            "could",
-            "should",
-            "may",
-            "might",
-            "must",
-            "can",
-            "this",
-            "that",
-            "these",
-            "those",
-            "i",
-            "you",
-            "he",
-            "she",
-            "it",
-            "we",
-            "they",
-            "me",
-            "him",
-            "her",
-            "us",
-            "them",
-            "my",
-            "your",
-            "his",
-            "its",
-            "our",
-            "their",
-            "a",
-            "an",
-            "reddit",
-            "post",
-            "comment",
-            "thread",
-            "sub",
-            "subreddit",
-            "user",
-            "edit",
-            "deleted",
-            "removed",
-            "amp",
-            "quot",
-            "gt",
-            "lt",
-        }
-
-        # Generate word cloud
         try:
+            self.word_frequencies.update()
+            version = self.word_frequencies.version()
+            cloud_dir = Path(Config.WORD_CLOUD_DIR)
+            path = cloud_dir / f"word_cloud_v{version}_{max_words}.png"
+            if path.exists():
+                return str(path)
+
+            frequencies = self.word_frequencies.top_terms(max_words)
+            if not frequencies:
+                return None
+
             wordcloud = WordCloud(
                 width=800,
                 height=400,
                 background_color="white",
                 max_words=max_words,
-                stopwords=stopwords,
                 colormap="viridis",
-            ).generate(text)
+            ).generate_from_frequencies(frequencies)
 
-            # Convert to base64 image
-            plt.figure(figsize=(10, 5))
-            plt.imshow(wordcloud, interpolation="bilinear")
-            plt.axis("off")
-
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format="png", bbox_inches="tight", dpi=150)
-            buffer.seek(0)
-            plt.close()
+            cloud_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                wordcloud.to_image().save(tmp_path, format="PNG")
+                os.replace(tmp_path, path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+            self._prune_word_clouds(cloud_dir, version)
 
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            # Don't print the base64 data
-            logger.info("Word cloud generated successfully")
-            return f"data:image/png;base64,{image_base64}"
+            logger.info(f"Word cloud v{version} generated successfully")
+            return str(path)
 
         except Exception as e:
             logger.warning(f"Word cloud generation failed: {e}")
             return None
 
+    @staticmethod
+    def _prune_word_clouds(cloud_dir: Path, version: int) -> None:
+        """
+        Delete images (and leftover temporary files) of other frequency
+        versions, which are never served again
+        """
+        for old_path in cloud_dir.glob("word_cloud_v*"):
+            if not old_path.name.startswith(f"word_cloud_v{version}_"):
+                old_path.unlink(missing_ok=True)
+
+    def generate_word_cloud(self, max_words: int = 100) -> Optional[str]:
+        """Generate word cloud from posts and comments content as a data URI"""
+        path = self.word_cloud_path(max_words)
+        if path is None:
+            return None
+
+        with open(path, "rb") as f:
+            image_base64 = base64.b64encode(f.read()).decode()
+        return f"data:image/png;base64,{image_base64}"
+
     def get_keyword_context(
         self, keyword: str, max_examples: int = 5
     ) -> List[Dict[str, Any]]:
-        """Get example posts/comments containing specific keywords with context"""
-        examples = []
-        keyword_lower = keyword.lower()
+        """
+        Get example posts/comments containing specific keywords with context
+
+        Research keywords are read from the keyword index; other terms from
+        the full-text index, so ad-hoc searches never add index terms.
+        """
+        if self.keyword_index.normalize(keyword) in self.keyword_index.keywords:
+            self.keyword_index.update()
+            found = self.keyword_index.examples(keyword, limit=max_examples)
+        else:
+            found = self._search_examples(keyword, max_examples)
 
-        # Search posts
-        for post in self.posts_data:
-            title = post.get("title", "").lower()
-            selftext = post.get("selftext", "").lower()
-
-            if keyword_lower in title or keyword_lower in selftext:
-                # Find the sentence containing the keyword
-                full_text = f"{post.get('title', '')} {post.get('selftext', '')}"
-                context = self._extract_context(full_text, keyword, 200)
-
-                examples.append(
-                    {
-                        "type": "post",
-                        "subreddit": post.get("subreddit", ""),
-                        "title": post.get("title", ""),
-                        "context": context,
-                        "author": post.get("author", "anonymous"),
-                        "created_utc": post.get("created_utc", ""),
-                        "score": post.get("score", 0),
-                    }
+        examples = []
+        for example in found:
+            entry = {
+                "type": example["type"],
+                "subreddit": example["subreddit"] or "",
+                "context": self._extract_context(
+                    example["text"], keyword, 200, example["offsets"]
+                ),
+                "author": example["author"],
+                "created_utc": example["created_utc"],
+                "score": example["score"],
+            }
+            if example["type"] == "post":
+                entry["title"] = example["title"]
+            examples.append(entry)
+
+        return examples
+
+    def _search_examples(self, keyword: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Best full-text matches of ``keyword`` as a phrase, shaped like
+        KeywordIndex.examples (offsets are empty for matches that are not
+        substrings, e.g. "sante" matching "santé")
+        """
+        self.search_index.update()
+        phrase = keyword.replace('"', " ").strip()
+        if not phrase:
+            return []
+        hits = self.search_index.search(f'"{phrase}"', page_size=limit)["results"]
+
+        ids = {"post": [], "comment": []}
+        for hit in hits:
+            ids[hit["doc_type"]].append(hit["doc_id"])
+        with self.db_manager.get_session() as session:
+            posts = {
+                post.id: post
+                for post in session.query(
+                    RedditPost.id,
+                    RedditPost.subreddit,
+                    RedditPost.title,
+                    RedditPost.selftext,
+                    RedditPost.author,
+                    RedditPost.created_utc,
+                    RedditPost.score,
+                ).filter(RedditPost.id.in_(ids["post"]))
+            }
+            comments = {
+                comment.id: comment
+                for comment in session.query(
+                    RedditComment.id,
+                    RedditPost.subreddit,
+                    RedditComment.body,
+                    RedditComment.author,
+                    RedditComment.created_utc,
+                    RedditComment.score,
                 )
+                .outerjoin(RedditPost, RedditPost.post_id == RedditComment.post_id)
+                .filter(RedditComment.id.in_(ids["comment"]))
+            }
 
-                if len(examples) >= max_examples:
-                    break
-
-        # Search comments if we need more examples
-        if len(examples) < max_examples:
-            for comment in self.comments_data:
-                body = comment.get("body", "").lower()
-
-                if keyword_lower in body:
-                    context = self._extract_context(
-                        comment.get("body", ""), keyword, 200
-                    )
-
-                    examples.append(
-                        {
-                            "type": "comment",
-                            "subreddit": comment.get("subreddit", ""),
-                            "context": context,
-                            "author": comment.get("author", "anonymous"),
-                            "created_utc": comment.get("created_utc", ""),
-                            "score": comment.get("score", 0),
-                        }
-                    )
-
-                    if len(examples) >= max_examples:
-                        break
-
-        return examples[:max_examples]
+        term = keyword.strip().lower()
+        examples = []
+        for hit in hits:
+            if hit["doc_type"] == "post" and hit["doc_id"] in posts:
+                row = posts[hit["doc_id"]]
+                text = post_text(row.title, row.selftext)
+                example = {"type": "post", "title": row.title}
+            elif hit["doc_type"] == "comment" and hit["doc_id"] in comments:
+                row = comments[hit["doc_id"]]
+                text = row.body or ""
+                example = {"type": "comment"}
+            else:
+                continue
+            example.update(
+                subreddit=row.subreddit,
+                text=text,
+                offsets=find_offsets(text.lower(), term),
+                author=row.author,
+                created_utc=row.created_utc,
+                score=row.score,
+            )
+            examples.append(example)
+        return examples
 
     def _extract_context(
-        self, text: str, keyword: str, context_length: int = 100
+        self,
+        text: str,
+        keyword: str,
+        context_length: int = 100,
+        offsets: Optional[List[int]] = None,
     ) -> str:
         """Extract context around a keyword with highlighting"""
         if not text:
             return ""
 
-        # Find keyword position (case-insensitive)
+        # Keyword positions (case-insensitive), from the index when available
         text_lower = text.lower()
         keyword_lower = keyword.lower()
+        if offsets is None or any(
+            text_lower[offset : offset + len(keyword_lower)] != keyword_lower
+            for offset in offsets
+        ):
+            offsets = find_offsets(text_lower, keyword_lower)
 
-        start_pos = text_lower.find(keyword_lower)
-        if start_pos == -1:
+        if not offsets:
             return text[:context_length] + "..."
 
         # Extract context around keyword
-        start = max(0, start_pos - context_length // 2)
-        end = min(len(text), start_pos + len(keyword) + context_length // 2)
-
-        context = text[start:end]
+        start = max(0, offsets[0] - context_length // 2)
+        end = min(len(text), offsets[0] + len(keyword) + context_length // 2)
+
+        # Highlight every occurrence inside the window
+        parts = []
+        position = start
+        for offset in offsets:
+            if offset < position or offset + len(keyword) > end:
+                continue
+            parts += [text[position:offset], f"**{keyword.upper()}**"]
+            position = offset + len(keyword)
+        context = "".join(parts) + text[position:end]
 
         # Add ellipsis if truncated
         if start > 0:
@@ -787,59 +889,94 @@ class HealthMisinformationAnalytics:
         if end < len(text):
             context = context + "..."
 
-        # Highlight keyword (case-insensitive replacement)
-        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-        context = pattern.sub(f"**{keyword.upper()}**", context)
-
         return context
 
     def get_recent_posts_preview(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get preview of recent posts for transparency"""
-        # Sort posts by creation date
-        sorted_posts = sorted(
-            self.posts_data,
-            key=lambda x: x.get("created_utc", datetime.min),
-            reverse=True,
-        )
+        return self.recent_posts_page(limit=limit)[0]
+
+    def recent_posts_page(
+        self, limit: int = 10, after: Optional[Tuple[Optional[datetime], int]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Optional[datetime], int]]]:
+        """
+        One page of posts, newest first and undated posts last
+
+        Keyset paginated on (created_utc, id): pass the returned cursor as
+        ``after`` for the next page; it is None on the last page.
+        """
+        with self.db_manager.get_session() as session:
+            query = session.query(
+                RedditPost.id,
+                RedditPost.title,
+                RedditPost.subreddit,
+                RedditPost.author,
+                RedditPost.created_utc,
+                RedditPost.score,
+                RedditPost.num_comments,
+                RedditPost.language,
+                RedditPost.contains_health_keywords,
+            )
+            created = RedditPost.created_utc
+            recent = []
+            if after is None or after[0] is not None:
+                dated = query.filter(created.isnot(None))
+                if after is not None:
+                    dated = dated.filter(
+                        or_(
+                            created < after[0],
+                            and_(created == after[0], RedditPost.id < after[1]),
+                        )
+                    )
+                recent = (
+                    dated.order_by(created.desc(), RedditPost.id.desc())
+                    .limit(limit + 1)
+                    .all()
+                )
+            if len(recent) <= limit:
+                undated = query.filter(created.is_(None))
+                if after is not None and after[0] is None:
+                    undated = undated.filter(RedditPost.id < after[1])
+                recent += (
+                    undated.order_by(RedditPost.id.desc())
+                    .limit(limit + 1 - len(recent))
+                    .all()
+                )
 
+        recent, more = recent[:limit], len(recent) > limit
         preview = []
-        for post in sorted_posts[:limit]:
+        for post in recent:
             preview.append(
                 {
-                    "title": post.get("title", "")[:100]
-                    + ("..." if len(post.get("title", "")) > 100 else ""),
-                    "subreddit": post.get("subreddit", ""),
-                    "author": post.get("author", "anonymous"),
-                    "created_utc": post.get("created_utc", ""),
-                    "score": post.get("score", 0),
-                    "num_comments": post.get("num_comments", 0),
-                    "language": post.get("language", "unknown"),
-                    "contains_health_keywords": post.get(
-                        "contains_health_keywords", False
-                    ),
+                    "title": post.title[:100]
+                    + ("..." if len(post.title) > 100 else ""),
+                    "subreddit": post.subreddit,
+                    "author": post.author,
+                    "created_utc": post.created_utc,
+                    "score": post.score,
+                    "num_comments": post.num_comments,
+                    "language": post.language,
+                    "contains_health_keywords": post.contains_health_keywords,
                 }
             )
 
-        return preview
+        cursor = (recent[-1].created_utc, recent[-1].id) if more else None
+        return preview, cursor
 
+    @cached_analysis
     def analyze_ml_health_classification(self) -> Dict[str, Any]:
         """Analyze content using trained ML model"""
         if not self.ml_classifier:
             return {"model_available": False, "message": "ML classifier not available"}
 
+        self._ensure_frame()
         # Classify all posts
-        post_texts = [
-            f"{post.get('title', '')} {post.get('selftext', '')}"
-            for post in self.posts_data
-        ]
+        posts = self.frame.posts
+        post_texts = (posts["title"] + " " + posts["selftext"]).tolist()
         post_predictions = self.ml_classifier.predict_health_content(post_texts)
 
         # Classify comments (sample if too many)
-        comment_texts = [
-            comment.get("body", "")
-            for comment in self.comments_data
-            if comment.get("body")
-        ]
+        bodies = self.frame.comments["body"]
+        comment_texts = bodies[bodies != ""].tolist()
         if len(comment_texts) > 500:
             # Sample 500 comments for faster processing
             import random
@@ -869,35 +1006,68 @@ class HealthMisinformationAnalytics:
 
         return {
             "model_available": True,
-            "post_classification": {
-                "total": len(post_predictions),
-                "health_related": post_health_count,
-                "general": len(post_predictions) - post_health_count,
-                "health_percentage": (
-                    (post_health_count / len(post_predictions) * 100)
-                    if post_predictions
-                    else 0
-                ),
-            },
-            "comment_classification": {
-                "total": len(comment_predictions),
-                "health_related": comment_health_count,
-                "general": len(comment_predictions) - comment_health_count,
-                "health_percentage": (
-                    (comment_health_count / len(comment_predictions) * 100)
-                    if comment_predictions
-                    else 0
-                ),
-            },
+            "post_classification": self._health_share(
+                len(post_predictions), post_health_count
+            ),
+            "comment_classification": self._health_share(
+                len(comment_predictions), comment_health_count
+            ),
             "high_confidence_examples": high_confidence_health[:5],  # Top 5 examples
             "top_health_features": top_features,
-            "model_performance": {
-                "feature_count": 5000,  # From training
-                "training_accuracy": 0.981,  # From training results
-                "test_accuracy": 0.939,  # From training results
-            },
+            "model_performance": self._model_performance(
+                "health_classifier", self.ml_classifier
+            ),
+        }
+
+    def rollup_ml_health_classification(self, sample_size: int = 200) -> Dict[str, Any]:
+        """ML health classification counts from the rollups"""
+        if not self.ml_classifier:
+            return {"model_available": False, "message": "ML classifier not available"}
+
+        counts = self.rollups.classification_counts()
+
+        # High-confidence examples come from a sample of the newest posts
+        with self.db_manager.get_session() as session:
+            recent = (
+                session.query(RedditPost.title, RedditPost.selftext)
+                .order_by(RedditPost.id.desc())
+                .limit(sample_size)
+                .all()
+            )
+        predictions = self.ml_classifier.predict_health_content(
+            [f"{title} {selftext or ''}" for title, selftext in recent]
+        )
+        high_confidence_health = [
+            pred
+            for pred in predictions
+            if pred["is_health_related"] and pred["confidence"] > 0.8
+        ]
+
+        return {
+            "model_available": True,
+            "post_classification": self._health_share(
+                counts["health_scored_posts"], counts["health_positive_posts"]
+            ),
+            "comment_classification": self._health_share(
+                counts["health_scored_comments"], counts["health_positive_comments"]
+            ),
+            "high_confidence_examples": high_confidence_health[:5],
+            "top_health_features": self.ml_classifier.get_top_health_features(10),
+            "model_performance": self._model_performance(
+                "health_classifier", self.ml_classifier
+            ),
         }
 
+    @staticmethod
+    def _health_share(total: int, health_related: int) -> Dict[str, Any]:
+        return {
+            "total": total,
+            "health_related": health_related,
+            "general": total - health_related,
+            "health_percentage": (health_related / total * 100) if total else 0,
+        }
+
+    @cached_analysis
     def analyze_ml_lgbtq_classification(self) -> Dict[str, Any]:
         """Analyze content using trained LGBTQ+ ML model"""
         if not self.lgbtq_classifier:
@@ -906,19 +1076,15 @@ class HealthMisinformationAnalytics:
                 "message": "LGBTQ+ ML classifier not available",
             }
 
+        self._ensure_frame()
         # Classify all posts
-        post_texts = [
-            f"{post.get('title', '')} {post.get('selftext', '')}"
-            for post in self.posts_data
-        ]
+        posts = self.frame.posts
+        post_texts = (posts["title"] + " " + posts["selftext"]).tolist()
         post_predictions = self.lgbtq_classifier.predict_lgbtq_content(post_texts)
 
         # Classify comments (sample if too many)
-        comment_texts = [
-            comment.get("body", "")
-            for comment in self.comments_data
-            if comment.get("body")
-        ]
+        bodies = self.frame.comments["body"]
+        comment_texts = bodies[bodies != ""].tolist()
         if len(comment_texts) > 500:
             # Sample 500 comments for faster processing
             import random
@@ -978,11 +1144,9 @@ class HealthMisinformationAnalytics:
             "context_distribution": context_distribution,
             "high_confidence_examples": high_confidence_lgbtq[:5],  # Top 5 examples
             "top_lgbtq_features": top_features,
-            "model_performance": {
-                "feature_count": 5000,  # From training
-                "training_accuracy": 0.95,  # Estimated from similar model
-                "test_accuracy": 0.92,  # Estimated from similar model
-            },
+            "model_performance": self._model_performance(
+                "lgbtq_classifier", self.lgbtq_classifier
+            ),
         }
 
 
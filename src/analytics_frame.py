@@ -0,0 +1,194 @@
+"""
+Columnar analytics frame
+Holds posts and comments as pandas tables with categorical subreddit and
+language columns and a post_id index, so dashboard analyses use vectorized
+joins and groupbys instead of loops over per-row dicts
+"""
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+from loguru import logger
+
+from src.data_persistence import DataPersistenceManager
+from src.database_models import RedditComment, RedditPost
+
+POST_COLUMNS = [
+    RedditPost.post_id,
+    RedditPost.subreddit,
+    RedditPost.title,
+    RedditPost.selftext,
+    RedditPost.author,
+    RedditPost.created_utc,
+    RedditPost.score,
+    RedditPost.num_comments,
+    RedditPost.language,
+    RedditPost.is_newcomer_related,
+    RedditPost.english_translation,
+    RedditPost.contains_health_keywords,
+    RedditPost.keyword_count,
+]
+
+COMMENT_COLUMNS = [
+    RedditComment.comment_id,
+    RedditComment.post_id,
+    RedditComment.author,
+    RedditComment.body,
+    RedditComment.created_utc,
+    RedditComment.score,
+    RedditComment.language,
+    RedditComment.english_translation,
+]
+
+CATEGORICAL = ["subreddit", "language"]
+
+
+def records(frame: pd.DataFrame) -> List[Dict]:
+    """Rows as dicts with missing values as None"""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+class AnalyticsFrame:
+    """
+    Posts and comments of the corpus as columnar tables
+
+    ``posts`` is indexed by post_id; ``comments`` carries the subreddit of
+    its post through an index join. Lower-cased text columns used for
+    keyword matching are built once and reused.
+    """
+
+    def __init__(
+        self,
+        posts: Optional[pd.DataFrame] = None,
+        comments: Optional[pd.DataFrame] = None,
+    ):
+        self.posts = self._prepare_posts(
+            posts
+            if posts is not None
+            else pd.DataFrame(columns=[c.key for c in POST_COLUMNS])
+        )
+        self.comments = self._prepare_comments(
+            comments
+            if comments is not None
+            else pd.DataFrame(columns=[c.key for c in COMMENT_COLUMNS])
+        )
+        self._post_text: Optional[pd.Series] = None
+        self._comment_text: Optional[pd.Series] = None
+
+    @classmethod
+    def load(cls, db_manager: DataPersistenceManager) -> "AnalyticsFrame":
+        """Read all posts and comments as column tuples (no ORM objects)"""
+        with db_manager.get_session() as session:
+            posts = pd.DataFrame.from_records(
+                session.query(*POST_COLUMNS).all(),
+                columns=[c.key for c in POST_COLUMNS],
+            )
+            comments = pd.DataFrame.from_records(
+                session.query(*COMMENT_COLUMNS).all(),
+                columns=[c.key for c in COMMENT_COLUMNS],
+            )
+        logger.debug(f"Analytics frame: {len(posts)} posts, {len(comments)} comments")
+        return cls(posts, comments)
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        path: Optional[str] = None,
+        subreddits: Optional[List[str]] = None,
+        month_from: Optional[str] = None,
+        month_to: Optional[str] = None,
+    ) -> "AnalyticsFrame":
+        """
+        Read the frame from an analytics snapshot (the latest one by default)
+        instead of the database, optionally limited to some subreddits and
+        months ("YYYY-MM") of posts
+        """
+        from src.analytics_snapshot import AnalyticsSnapshot
+
+        snapshot = AnalyticsSnapshot(path)
+        filters = {
+            "subreddits": subreddits,
+            "month_from": month_from,
+            "month_to": month_to,
+        }
+        posts = snapshot.to_pandas(
+            "posts", columns=[c.key for c in POST_COLUMNS], **filters
+        )
+        comments = snapshot.to_pandas(
+            "comments", columns=[c.key for c in COMMENT_COLUMNS], **filters
+        )
+        logger.debug(
+            f"Analytics frame from {snapshot.path}: {len(posts)} posts, "
+            f"{len(comments)} comments"
+        )
+        return cls(posts, comments)
+
+    def _prepare_posts(self, posts: pd.DataFrame) -> pd.DataFrame:
+        posts = posts.drop_duplicates("post_id").set_index("post_id", drop=False)
+        posts.index.name = None
+        posts["title"] = posts["title"].fillna("").astype(str)
+        posts["selftext"] = posts["selftext"].fillna("").astype(str)
+        posts["created_utc"] = pd.to_datetime(posts["created_utc"])
+        for column in ("score", "num_comments", "keyword_count"):
+            posts[column] = posts[column].astype("Int64")
+        for column in ("is_newcomer_related", "contains_health_keywords"):
+            posts[column] = posts[column].fillna(False).astype(bool)
+        for column in CATEGORICAL:
+            posts[column] = posts[column].astype("category")
+        return posts
+
+    def _prepare_comments(self, comments: pd.DataFrame) -> pd.DataFrame:
+        comments = comments.reset_index(drop=True)
+        comments["body"] = comments["body"].fillna("").astype(str)
+        comments["created_utc"] = pd.to_datetime(comments["created_utc"])
+        comments["score"] = comments["score"].astype("Int64")
+        comments["language"] = comments["language"].astype("category")
+        comments["subreddit"] = pd.Categorical(
+            self.posts["subreddit"].reindex(comments["post_id"]).to_numpy(),
+            categories=self.posts["subreddit"].cat.categories,
+        )
+        return comments
+
+    @property
+    def post_text(self) -> pd.Series:
+        """Lower-cased "title selftext" of every post"""
+        if self._post_text is None:
+            self._post_text = (
+                self.posts["title"] + " " + self.posts["selftext"]
+            ).str.lower()
+        return self._post_text
+
+    @property
+    def comment_text(self) -> pd.Series:
+        """Lower-cased body of every comment"""
+        if self._comment_text is None:
+            self._comment_text = self.comments["body"].str.lower()
+        return self._comment_text
+
+    def keyword_matrix(self, keywords: List[str]) -> pd.DataFrame:
+        """Boolean posts x keywords table of case-insensitive substring hits"""
+        return pd.DataFrame(
+            {
+                keyword: self.post_text.str.contains(keyword.lower(), regex=False)
+                for keyword in keywords
+            },
+            index=self.posts.index,
+            columns=keywords,
+            dtype=bool,
+        )
+
+    @staticmethod
+    def keyword_combinations(matches: pd.DataFrame) -> pd.Series:
+        """ "a, b" keyword set of every row of a keyword matrix with 2+ hits"""
+        multiple = matches[matches.sum(axis=1) > 1]
+        if multiple.empty:
+            return pd.Series(dtype=object)
+        return multiple.apply(lambda row: ", ".join(sorted(row.index[row])), axis=1)
+
+    def summary(self) -> Dict[str, int]:
+        authors = pd.concat([self.posts["author"], self.comments["author"]])
+        return {
+            "total_posts": len(self.posts),
+            "total_comments": len(self.comments),
+            "unique_authors": authors.nunique(dropna=False) if len(authors) else 0,
+        }
@@ -0,0 +1,933 @@
+"""
+Materialized analytics rollups
+Keeps dashboard counts per subreddit x language x day in the database and
+folds in posts and comments newer than the stored watermarks, so dashboard
+refreshes read rollup rows instead of rescanning the corpus
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+from loguru import logger
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from config.settings import ResearchConfig
+from src.analytics_frame import POST_COLUMNS, AnalyticsFrame, records
+from src.data_persistence import (
+    DataPersistenceManager,
+    increment_rows,
+    surviving_max_ids,
+)
+from src.database_models import (
+    AnalyticsAuthor,
+    AnalyticsDailyRollup,
+    AnalyticsHourRollup,
+    AnalyticsKeywordRollup,
+    AnalyticsRollupState,
+    RedditComment,
+    RedditPost,
+)
+
+# Day bucket for posts/comments without a timestamp (kept out of time series)
+UNDATED = date(1970, 1, 1)
+
+DAILY_KEY = ["subreddit", "language", "rollup_date"]
+POST_COUNTS = [
+    "post_count",
+    "health_keyword_posts",
+    "keyword_posts",
+    "newcomer_posts",
+    "translated_posts",
+    "score_sum",
+    "health_scored_posts",
+    "health_positive_posts",
+    "lgbtq_scored_posts",
+    "lgbtq_positive_posts",
+]
+COMMENT_COUNTS = [
+    "comment_count",
+    "comment_score_sum",
+    "health_scored_comments",
+    "health_positive_comments",
+]
+
+
+def _days(created: pd.Series) -> pd.Series:
+    created = pd.to_datetime(created)
+    return created.dt.date.where(created.notna(), UNDATED)
+
+
+class AnalyticsRollupStore:
+    """
+    Daily dashboard rollups maintained from RedditPost/RedditComment.id
+    watermarks
+
+    Keyword hits use the research keywords at the time rows are rolled up
+    and classifier counts use whichever classifiers are available then
+    (``*_scored_*`` records how many rows a model actually saw); ``rebuild``
+    (``analytics-rollup --full-refresh``) recomputes everything and is
+    needed after either changes, e.g. after retraining a classifier.
+    Deleted posts are subtracted by ``remove_posts`` and re-scraped posts
+    swapped by ``prepare_post_updates``/``apply_post_updates``; other
+    in-place column rewrites also need a rebuild.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        health_classifier=None,
+        lgbtq_classifier=None,
+        batch_size: int = 5000,
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.health_classifier = health_classifier
+        self.lgbtq_classifier = lgbtq_classifier
+        self._classifiers_loaded = bool(health_classifier or lgbtq_classifier)
+        self.batch_size = batch_size
+        self.keywords = list(
+            dict.fromkeys(
+                ResearchConfig.PRIMARY_KEYWORDS + ResearchConfig.COLLOQUIAL_TERMS
+            )
+        )
+
+    def _load_classifiers(self) -> None:
+        """Load the exported (sklearn-free) scorers, when they exist"""
+        self._classifiers_loaded = True
+        try:
+            from src.health_content_classifier import HealthContentClassifier
+            from src.lgbtq_content_classifier import LGBTQContentClassifier
+        except ImportError:
+            return
+
+        for attribute, classifier_class in (
+            ("health_classifier", HealthContentClassifier),
+            ("lgbtq_classifier", LGBTQContentClassifier),
+        ):
+            try:
+                classifier = classifier_class()
+                classifier.load_scorer()
+                setattr(self, attribute, classifier)
+            except Exception as e:
+                logger.debug(f"No {attribute} scorer for analytics rollups: {e}")
+
+    def _state(self, session: Session) -> AnalyticsRollupState:
+        state = session.query(AnalyticsRollupState).with_for_update().first()
+        if state is None:
+            state = AnalyticsRollupState(
+                post_watermark=0, comment_watermark=0, version=0
+            )
+            session.add(state)
+            session.flush()
+        return state
+
+    def version(self) -> int:
+        """Current rollup version (0 before the first update)"""
+        with self.db_manager.get_session() as session:
+            return session.query(AnalyticsRollupState.version).scalar() or 0
+
+    def update(self) -> int:
+        """
+        Roll up posts and comments added since the last update
+
+        Returns:
+            Number of new posts and comments processed
+        """
+        if not self._classifiers_loaded:
+            self._load_classifiers()
+
+        with self.db_manager.get_session() as session:
+            try:
+                state = self._state(session)
+                max_post = session.query(func.max(RedditPost.id)).scalar() or 0
+                max_comment = session.query(func.max(RedditComment.id)).scalar() or 0
+
+                new_posts = max(max_post - state.post_watermark, 0)
+                new_comments = max(max_comment - state.comment_watermark, 0)
+                if not new_posts and not new_comments:
+                    session.rollback()
+                    return 0
+
+                for start in range(state.post_watermark, max_post, self.batch_size):
+                    end = min(start + self.batch_size, max_post)
+                    self._roll_posts(
+                        session,
+                        state,
+                        self._post_rows(
+                            session, RedditPost.id > start, RedditPost.id <= end
+                        ),
+                    )
+                for start in range(
+                    state.comment_watermark, max_comment, self.batch_size
+                ):
+                    end = min(start + self.batch_size, max_comment)
+                    self._roll_comments(
+                        session,
+                        self._comment_rows(
+                            session, RedditComment.id > start, RedditComment.id <= end
+                        ),
+                    )
+
+                state.post_watermark = max(max_post, state.post_watermark)
+                state.comment_watermark = max(max_comment, state.comment_watermark)
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+
+                logger.info(
+                    f"Analytics rollups v{state.version}: rolled up {new_posts} "
+                    f"posts, {new_comments} comments"
+                )
+                return new_posts + new_comments
+
+            except Exception:
+                session.rollback()
+                raise
+
+    def rebuild(self) -> int:
+        """Drop the rollups and recompute them from all posts and comments"""
+        with self.db_manager.get_session() as session:
+            for model in (
+                AnalyticsDailyRollup,
+                AnalyticsKeywordRollup,
+                AnalyticsHourRollup,
+                AnalyticsAuthor,
+                AnalyticsRollupState,
+            ):
+                session.query(model).delete()
+            session.commit()
+
+        return self.update()
+
+    def remove_posts(self, session: Session, posts) -> int:
+        """
+        Subtract posts about to be deleted, and their comments, from the rollups
+
+        ``posts`` is a condition on RedditPost selecting the posts. Call this
+        in the deleting transaction, before the delete; only rows already
+        rolled up (at or below the watermarks) are subtracted, and the
+        watermarks drop to the highest surviving ids.
+
+        Returns:
+            Number of posts and comments subtracted
+        """
+        state = session.query(AnalyticsRollupState).with_for_update().first()
+        if state is None:
+            return 0
+        if not self._classifiers_loaded:
+            self._load_classifiers()
+
+        removed = select(RedditPost.post_id).where(posts)
+        post_rows = self._post_rows(
+            session, posts, RedditPost.id <= state.post_watermark
+        )
+        comment_rows = self._comment_rows(
+            session,
+            RedditComment.post_id.in_(removed),
+            RedditComment.id <= state.comment_watermark,
+        )
+        max_post, max_comment = surviving_max_ids(session, posts)
+        state.post_watermark = min(state.post_watermark, max_post)
+        state.comment_watermark = min(state.comment_watermark, max_comment)
+        if not post_rows and not comment_rows:
+            return 0
+
+        self._roll_posts(session, state, post_rows, sign=-1)
+        self._roll_comments(session, comment_rows, sign=-1)
+        self._prune(session)
+
+        # Date range and author set of what remains
+        remaining = and_(
+            RedditPost.id <= state.post_watermark, ~RedditPost.post_id.in_(removed)
+        )
+        state.earliest_post, state.latest_post = (
+            session.query(
+                func.min(RedditPost.created_utc), func.max(RedditPost.created_utc)
+            )
+            .filter(remaining)
+            .one()
+        )
+        self._prune_authors(
+            session,
+            {row.author for row in post_rows + comment_rows if row.author},
+            remaining,
+            and_(
+                RedditComment.id <= state.comment_watermark,
+                or_(
+                    RedditComment.post_id.is_(None),
+                    ~RedditComment.post_id.in_(removed),
+                ),
+            ),
+        )
+
+        state.version = (state.version or 0) + 1
+        state.updated_at = datetime.utcnow()
+        logger.info(
+            f"Analytics rollups v{state.version}: removed {len(post_rows)} posts, "
+            f"{len(comment_rows)} comments"
+        )
+        return len(post_rows) + len(comment_rows)
+
+    def prepare_post_updates(self, post_ids: List[str]) -> List:
+        """Rolled-up rows of posts about to be updated in place (re-scraped)"""
+        with self.db_manager.get_session() as session:
+            watermark = session.query(AnalyticsRollupState.post_watermark).scalar()
+            if not watermark:
+                return []
+            return [
+                row
+                for start in range(0, len(post_ids), self.batch_size)
+                for row in self._post_rows(
+                    session,
+                    RedditPost.post_id.in_(post_ids[start : start + self.batch_size]),
+                    RedditPost.id <= watermark,
+                )
+            ]
+
+    def apply_post_updates(self, previous_rows: List) -> int:
+        """
+        Swap the rolled-up values of updated posts (``prepare_post_updates``
+        rows) for their current ones
+
+        Returns:
+            Number of posts re-rolled
+        """
+        if not previous_rows:
+            return 0
+        if not self._classifiers_loaded:
+            self._load_classifiers()
+
+        post_ids = [row.post_id for row in previous_rows]
+        with self.db_manager.get_session() as session:
+            try:
+                state = self._state(session)
+                for start in range(0, len(post_ids), self.batch_size):
+                    self._roll_posts(
+                        session,
+                        state,
+                        previous_rows[start : start + self.batch_size],
+                        sign=-1,
+                    )
+                    self._roll_posts(
+                        session,
+                        state,
+                        self._post_rows(
+                            session,
+                            RedditPost.post_id.in_(
+                                post_ids[start : start + self.batch_size]
+                            ),
+                            RedditPost.id <= state.post_watermark,
+                        ),
+                    )
+                self._prune(session)
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+                return len(post_ids)
+
+            except Exception:
+                session.rollback()
+                raise
+
+    @staticmethod
+    def _prune(session: Session) -> None:
+        """Delete rollup rows whose counts were subtracted down to zero"""
+        session.query(AnalyticsDailyRollup).filter(
+            AnalyticsDailyRollup.post_count == 0,
+            AnalyticsDailyRollup.comment_count == 0,
+        ).delete(synchronize_session=False)
+        session.query(AnalyticsKeywordRollup).filter(
+            AnalyticsKeywordRollup.post_hits == 0
+        ).delete(synchronize_session=False)
+        session.query(AnalyticsHourRollup).filter(
+            AnalyticsHourRollup.post_count == 0
+        ).delete(synchronize_session=False)
+
+    def _prune_authors(
+        self, session: Session, authors: Set[str], posts, comments
+    ) -> None:
+        """Forget ``authors`` that no longer appear in the remaining rows"""
+        authors = sorted(authors)
+        for start in range(0, len(authors), self.batch_size):
+            chunk = authors[start : start + self.batch_size]
+            active = {
+                author
+                for (author,) in session.query(RedditPost.author)
+                .filter(posts, RedditPost.author.in_(chunk))
+                .union(
+                    session.query(RedditComment.author).filter(
+                        comments, RedditComment.author.in_(chunk)
+                    )
+                )
+            }
+            gone = [author for author in chunk if author not in active]
+            if gone:
+                session.query(AnalyticsAuthor).filter(
+                    AnalyticsAuthor.author.in_(gone)
+                ).delete(synchronize_session=False)
+
+    def _classify(
+        self,
+        frame: pd.DataFrame,
+        texts: pd.Series,
+        classifier,
+        method: str,
+        label: str,
+        prefix: str,
+    ) -> None:
+        """Add <prefix>_scored / <prefix>_positive 0/1 columns to ``frame``"""
+        frame[f"{prefix}_scored"] = 0
+        frame[f"{prefix}_positive"] = 0
+        if classifier is None or texts.empty:
+            return
+
+        try:
+            predictions = getattr(classifier, method)(texts.tolist())
+        except Exception as e:
+            logger.warning(f"Classifier failed during analytics rollup: {e}")
+            return
+        frame.loc[texts.index, f"{prefix}_scored"] = 1
+        frame.loc[texts.index, f"{prefix}_positive"] = [
+            int(bool(prediction[label])) for prediction in predictions
+        ]
+
+    @staticmethod
+    def _post_rows(session: Session, *conditions) -> List:
+        return session.query(*POST_COLUMNS).filter(*conditions).all()
+
+    @staticmethod
+    def _comment_rows(session: Session, *conditions) -> List:
+        return (
+            session.query(
+                RedditPost.subreddit,
+                RedditComment.language,
+                RedditComment.created_utc,
+                RedditComment.score,
+                RedditComment.author,
+                RedditComment.body,
+            )
+            .select_from(RedditComment)
+            .outerjoin(RedditPost, RedditPost.post_id == RedditComment.post_id)
+            .filter(*conditions)
+            .all()
+        )
+
+    def _roll_posts(
+        self,
+        session: Session,
+        state: AnalyticsRollupState,
+        rows: List,
+        sign: int = 1,
+    ) -> None:
+        """Add (sign 1) or subtract (sign -1) post rows to/from the rollups"""
+        if not rows:
+            return
+
+        chunk = AnalyticsFrame(
+            pd.DataFrame.from_records(rows, columns=[c.key for c in POST_COLUMNS])
+        )
+        posts = chunk.posts
+        frame = pd.DataFrame(
+            {
+                "subreddit": posts["subreddit"].astype(object).fillna(""),
+                "language": posts["language"].astype(object).fillna(""),
+                "rollup_date": _days(posts["created_utc"]),
+                "post_count": 1,
+                "health_keyword_posts": posts["contains_health_keywords"].astype(int),
+                "newcomer_posts": posts["is_newcomer_related"].astype(int),
+                "translated_posts": (
+                    posts["english_translation"].fillna("") != ""
+                ).astype(int),
+                "score_sum": posts["score"].fillna(0).astype(int),
+            },
+            index=posts.index,
+        )
+
+        matches = chunk.keyword_matrix(self.keywords)
+        frame["keyword_posts"] = matches.any(axis=1).astype(int)
+
+        texts = posts["title"] + " " + posts["selftext"]
+        self._classify(
+            frame,
+            texts,
+            self.health_classifier,
+            "predict_health_content",
+            "is_health_related",
+            "health",
+        )
+        self._classify(
+            frame,
+            texts,
+            self.lgbtq_classifier,
+            "predict_lgbtq_content",
+            "is_lgbtq_related",
+            "lgbtq",
+        )
+        frame = frame.rename(
+            columns={
+                "health_scored": "health_scored_posts",
+                "health_positive": "health_positive_posts",
+                "lgbtq_scored": "lgbtq_scored_posts",
+                "lgbtq_positive": "lgbtq_positive_posts",
+            }
+        )
+
+        daily = frame.groupby(DAILY_KEY, sort=False)[POST_COUNTS].sum().reset_index()
+        daily[POST_COUNTS] *= sign
+        increment_rows(
+            session,
+            AnalyticsDailyRollup,
+            DAILY_KEY,
+            POST_COUNTS,
+            records(daily),
+            self.batch_size,
+            insert=sign > 0,
+        )
+
+        # Keyword hits: single keywords and the combinations seen together
+        hits = matches.rename_axis(columns="keyword").stack()
+        hits = hits[hits].reset_index(level="keyword")["keyword"]
+        keyword_rows = frame.loc[hits.index, DAILY_KEY].assign(
+            keyword=hits.to_numpy(), keyword_set_size=1
+        )
+        combinations = AnalyticsFrame.keyword_combinations(matches)
+        if len(combinations):
+            keyword_rows = pd.concat(
+                [
+                    keyword_rows,
+                    frame.loc[combinations.index, DAILY_KEY].assign(
+                        keyword=combinations.to_numpy(),
+                        keyword_set_size=matches.loc[combinations.index]
+                        .sum(axis=1)
+                        .to_numpy(),
+                    ),
+                ]
+            )
+        if len(keyword_rows):
+            keyword_rows["post_hits"] = 1
+            keyword_rows["newcomer_hits"] = frame.loc[
+                keyword_rows.index, "newcomer_posts"
+            ].to_numpy()
+            keywords = (
+                keyword_rows.groupby(
+                    DAILY_KEY + ["keyword", "keyword_set_size"], sort=False
+                )[["post_hits", "newcomer_hits"]]
+                .sum()
+                .reset_index()
+            )
+            keywords[["post_hits", "newcomer_hits"]] *= sign
+            increment_rows(
+                session,
+                AnalyticsKeywordRollup,
+                DAILY_KEY + ["keyword"],
+                ["post_hits", "newcomer_hits"],
+                records(keywords),
+                self.batch_size,
+                insert=sign > 0,
+            )
+
+        dated = posts["created_utc"].notna()
+        if dated.any():
+            hours = (
+                frame[dated]
+                .assign(hour=posts.loc[dated, "created_utc"].dt.hour)
+                .groupby(["subreddit", "language", "hour"], sort=False)
+                .size()
+                .rename("post_count")
+                .reset_index()
+            )
+            hours["post_count"] *= sign
+            increment_rows(
+                session,
+                AnalyticsHourRollup,
+                ["subreddit", "language", "hour"],
+                ["post_count"],
+                records(hours),
+                self.batch_size,
+                insert=sign > 0,
+            )
+
+        if sign > 0 and dated.any():
+            earliest = posts.loc[dated, "created_utc"].min().to_pydatetime()
+            latest = posts.loc[dated, "created_utc"].max().to_pydatetime()
+            if state.earliest_post is None or earliest < state.earliest_post:
+                state.earliest_post = earliest
+            if state.latest_post is None or latest > state.latest_post:
+                state.latest_post = latest
+
+        if sign > 0:
+            self._add_authors(session, posts["author"])
+
+    def _roll_comments(self, session: Session, rows: List, sign: int = 1) -> None:
+        """Add (sign 1) or subtract (sign -1) comment rows to/from the rollups"""
+        if not rows:
+            return
+
+        comments = pd.DataFrame.from_records(rows, columns=rows[0]._fields)
+        frame = pd.DataFrame(
+            {
+                "subreddit": comments["subreddit"].fillna(""),
+                "language": comments["language"].fillna(""),
+                "rollup_date": _days(comments["created_utc"]),
+                "comment_count": 1,
+                "comment_score_sum": comments["score"].fillna(0).astype(int),
+            }
+        )
+
+        bodies = comments["body"].fillna("")
+        self._classify(
+            frame,
+            bodies[bodies != ""],
+            self.health_classifier,
+            "predict_health_content",
+            "is_health_related",
+            "health",
+        )
+        frame = frame.rename(
+            columns={
+                "health_scored": "health_scored_comments",
+                "health_positive": "health_positive_comments",
+            }
+        )
+
+        daily = frame.groupby(DAILY_KEY, sort=False)[COMMENT_COUNTS].sum().reset_index()
+        daily[COMMENT_COUNTS] *= sign
+        increment_rows(
+            session,
+            AnalyticsDailyRollup,
+            DAILY_KEY,
+            COMMENT_COUNTS,
+            records(daily),
+            self.batch_size,
+            insert=sign > 0,
+        )
+        if sign > 0:
+            self._add_authors(session, comments["author"])
+
+    def _add_authors(self, session: Session, authors: pd.Series) -> None:
+        authors = set(authors.dropna().tolist())
+        if not authors:
+            return
+        known = {
+            author
+            for (author,) in session.query(AnalyticsAuthor.author).filter(
+                AnalyticsAuthor.author.in_(authors)
+            )
+        }
+        session.bulk_insert_mappings(
+            AnalyticsAuthor, [{"author": author} for author in authors - known]
+        )
+
+    # Dashboard reads: same result shapes as HealthMisinformationAnalytics
+
+    def summary(self) -> Dict[str, int]:
+        with self.db_manager.get_session() as session:
+            posts, comments = session.query(
+                func.coalesce(func.sum(AnalyticsDailyRollup.post_count), 0),
+                func.coalesce(func.sum(AnalyticsDailyRollup.comment_count), 0),
+            ).one()
+            authors = session.query(func.count(AnalyticsAuthor.id)).scalar()
+        return {
+            "total_posts": posts,
+            "total_comments": comments,
+            "unique_authors": authors,
+        }
+
+    def language_distribution(self) -> Dict[str, Any]:
+        with self.db_manager.get_session() as session:
+            rows = (
+                session.query(
+                    AnalyticsDailyRollup.language,
+                    func.sum(AnalyticsDailyRollup.post_count),
+                    func.sum(AnalyticsDailyRollup.comment_count),
+                    func.sum(AnalyticsDailyRollup.translated_posts),
+                )
+                .group_by(AnalyticsDailyRollup.language)
+                .all()
+            )
+
+        post_languages = {
+            language: posts for language, posts, _, _ in rows if language and posts
+        }
+        comment_languages = {
+            language: comments
+            for language, _, comments, _ in rows
+            if language and comments
+        }
+        total_posts = sum(posts for _, posts, _, _ in rows)
+        multilingual_posts = sum(translated for _, _, _, translated in rows)
+
+        return {
+            "post_languages": post_languages,
+            "comment_languages": comment_languages,
+            "total_languages": len(set(post_languages) | set(comment_languages)),
+            "total_posts": total_posts,
+            "multilingual_posts": multilingual_posts,
+            "multilingual_percentage": (
+                (multilingual_posts / total_posts * 100) if total_posts else 0
+            ),
+        }
+
+    def health_keywords(self) -> Dict[str, Any]:
+        """Keyword counts, coverage and top combinations (no per-post list)"""
+        with self.db_manager.get_session() as session:
+            total_posts, posts_with_keywords = session.query(
+                func.coalesce(func.sum(AnalyticsDailyRollup.post_count), 0),
+                func.coalesce(func.sum(AnalyticsDailyRollup.keyword_posts), 0),
+            ).one()
+            hits = func.sum(AnalyticsKeywordRollup.post_hits)
+            keyword_counts = dict(
+                session.query(AnalyticsKeywordRollup.keyword, hits)
+                .filter(AnalyticsKeywordRollup.keyword_set_size == 1)
+                .group_by(AnalyticsKeywordRollup.keyword)
+                .all()
+            )
+            top_combinations = dict(
+                session.query(AnalyticsKeywordRollup.keyword, hits)
+                .filter(AnalyticsKeywordRollup.keyword_set_size > 1)
+                .group_by(AnalyticsKeywordRollup.keyword)
+                .order_by(hits.desc())
+                .limit(10)
+                .all()
+            )
+
+        return {
+            "keyword_counts": {
+                keyword: keyword_counts[keyword]
+                for keyword in self.keywords
+                if keyword_counts.get(keyword)
+            },
+            "posts_with_keywords": posts_with_keywords,
+            "keyword_coverage": (
+                (posts_with_keywords / total_posts * 100) if total_posts else 0
+            ),
+            "top_combinations": top_combinations,
+        }
+
+    def subreddit_patterns(self) -> Dict[str, Any]:
+        with self.db_manager.get_session() as session:
+            rows = (
+                session.query(
+                    AnalyticsDailyRollup.subreddit,
+                    AnalyticsDailyRollup.language,
+                    func.sum(AnalyticsDailyRollup.post_count),
+                    func.sum(AnalyticsDailyRollup.comment_count),
+                    func.sum(AnalyticsDailyRollup.health_keyword_posts),
+                    func.sum(AnalyticsDailyRollup.newcomer_posts),
+                    func.sum(AnalyticsDailyRollup.score_sum),
+                )
+                .filter(AnalyticsDailyRollup.subreddit != "")
+                .group_by(AnalyticsDailyRollup.subreddit, AnalyticsDailyRollup.language)
+                .all()
+            )
+
+        subreddit_stats = {}
+        for sub, language, posts, comments, health, newcomer, score in rows:
+            stats = subreddit_stats.setdefault(
+                sub,
+                {
+                    "post_count": 0,
+                    "comment_count": 0,
+                    "languages": [],
+                    "health_keywords": 0,
+                    "newcomer_posts": 0,
+                    "avg_score": 0,
+                    "total_score": 0,
+                },
+            )
+            stats["post_count"] += posts
+            stats["comment_count"] += comments
+            stats["health_keywords"] += health
+            stats["newcomer_posts"] += newcomer
+            stats["total_score"] += score
+            if language and posts:
+                stats["languages"].append(language)
+
+        for stats in subreddit_stats.values():
+            if stats["post_count"]:
+                stats["avg_score"] = stats["total_score"] / stats["post_count"]
+            stats["language_diversity"] = len(stats["languages"])
+
+        return {
+            sub: stats for sub, stats in subreddit_stats.items() if stats["post_count"]
+        }
+
+    def subreddit_page(
+        self, limit: int = 20, after: Optional[Tuple[int, str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[int, str]]]:
+        """
+        One page of subreddit_patterns rows, most posts first
+
+        Keyset paginated on (post_count, subreddit): pass the returned cursor
+        as ``after`` for the next page; it is None on the last page.
+        """
+        post_count = func.sum(AnalyticsDailyRollup.post_count)
+        with self.db_manager.get_session() as session:
+            query = (
+                session.query(
+                    AnalyticsDailyRollup.subreddit,
+                    post_count,
+                    func.sum(AnalyticsDailyRollup.comment_count),
+                    func.sum(AnalyticsDailyRollup.health_keyword_posts),
+                    func.sum(AnalyticsDailyRollup.newcomer_posts),
+                    func.sum(AnalyticsDailyRollup.score_sum),
+                )
+                .filter(AnalyticsDailyRollup.subreddit != "")
+                .group_by(AnalyticsDailyRollup.subreddit)
+                .having(post_count > 0)
+            )
+            if after is not None:
+                query = query.having(
+                    or_(
+                        post_count < after[0],
+                        and_(
+                            post_count == after[0],
+                            AnalyticsDailyRollup.subreddit > after[1],
+                        ),
+                    )
+                )
+            rows = (
+                query.order_by(post_count.desc(), AnalyticsDailyRollup.subreddit)
+                .limit(limit + 1)
+                .all()
+            )
+            rows, more = rows[:limit], len(rows) > limit
+
+            languages = defaultdict(list)
+            for sub, language in (
+                session.query(
+                    AnalyticsDailyRollup.subreddit, AnalyticsDailyRollup.language
+                )
+                .filter(
+                    AnalyticsDailyRollup.subreddit.in_([row[0] for row in rows]),
+                    AnalyticsDailyRollup.language != "",
+                )
+                .group_by(AnalyticsDailyRollup.subreddit, AnalyticsDailyRollup.language)
+                .having(func.sum(AnalyticsDailyRollup.post_count) > 0)
+                .order_by(AnalyticsDailyRollup.subreddit, AnalyticsDailyRollup.language)
+            ):
+                languages[sub].append(language)
+
+        page = [
+            {
+                "subreddit": sub,
+                "post_count": posts,
+                "comment_count": comments,
+                "languages": languages[sub],
+                "health_keywords": health,
+                "newcomer_posts": newcomer,
+                "avg_score": score / posts,
+                "total_score": score,
+                "language_diversity": len(languages[sub]),
+            }
+            for sub, posts, comments, health, newcomer, score in rows
+        ]
+        cursor = (rows[-1][1], rows[-1][0]) if more else None
+        return page, cursor
+
+    def temporal_patterns(self) -> Dict[str, Any]:
+        with self.db_manager.get_session() as session:
+            state = session.query(AnalyticsRollupState).first()
+            if state is None or state.earliest_post is None:
+                return {"error": "No posts with valid dates found"}
+
+            days = (
+                session.query(
+                    AnalyticsDailyRollup.rollup_date,
+                    func.sum(AnalyticsDailyRollup.post_count),
+                )
+                .filter(AnalyticsDailyRollup.rollup_date != UNDATED)
+                .group_by(AnalyticsDailyRollup.rollup_date)
+                .having(func.sum(AnalyticsDailyRollup.post_count) > 0)
+                .order_by(AnalyticsDailyRollup.rollup_date)
+                .all()
+            )
+            hours = (
+                session.query(
+                    AnalyticsHourRollup.hour, func.sum(AnalyticsHourRollup.post_count)
+                )
+                .group_by(AnalyticsHourRollup.hour)
+                .all()
+            )
+            date_range = {"earliest": state.earliest_post, "latest": state.latest_post}
+
+        daily_counts = {}
+        weekly_counts = defaultdict(int)
+        for day, count in days:
+            daily_counts[day.strftime("%Y-%m-%d")] = count
+            weekly_counts[day.strftime("%Y-W%U")] += count
+
+        return {
+            "daily_counts": daily_counts,
+            "weekly_counts": dict(weekly_counts),
+            "hourly_counts": dict(hours),
+            "date_range": date_range,
+        }
+
+    def newcomer_content(self) -> Dict[str, Any]:
+        with self.db_manager.get_session() as session:
+            rows = (
+                session.query(
+                    AnalyticsDailyRollup.subreddit,
+                    AnalyticsDailyRollup.language,
+                    func.sum(AnalyticsDailyRollup.post_count),
+                    func.sum(AnalyticsDailyRollup.newcomer_posts),
+                )
+                .group_by(AnalyticsDailyRollup.subreddit, AnalyticsDailyRollup.language)
+                .all()
+            )
+            keyword_hits = dict(
+                session.query(
+                    AnalyticsKeywordRollup.keyword,
+                    func.sum(AnalyticsKeywordRollup.newcomer_hits),
+                )
+                .filter(AnalyticsKeywordRollup.keyword_set_size == 1)
+                .group_by(AnalyticsKeywordRollup.keyword)
+                .all()
+            )
+
+        total_posts = sum(posts for _, _, posts, _ in rows)
+        newcomer_languages = defaultdict(int)
+        newcomer_subreddits = defaultdict(int)
+        for sub, language, _, newcomer in rows:
+            if not newcomer:
+                continue
+            newcomer_subreddits[sub] += newcomer
+            if language:
+                newcomer_languages[language] += newcomer
+        total_newcomer_posts = sum(newcomer_subreddits.values())
+
+        return {
+            "total_newcomer_posts": total_newcomer_posts,
+            "percentage_newcomer": (
+                (total_newcomer_posts / total_posts * 100) if total_posts else 0
+            ),
+            "newcomer_languages": dict(newcomer_languages),
+            "newcomer_keywords": {
+                keyword: keyword_hits[keyword]
+                for keyword in self.keywords
+                if keyword_hits.get(keyword)
+            },
+            "newcomer_subreddits": dict(newcomer_subreddits),
+        }
+
+    def classification_counts(self) -> Dict[str, int]:
+        """Totals of the classifier scored/positive columns"""
+        columns = [
+            "health_scored_posts",
+            "health_positive_posts",
+            "health_scored_comments",
+            "health_positive_comments",
+            "lgbtq_scored_posts",
+            "lgbtq_positive_posts",
+        ]
+        with self.db_manager.get_session() as session:
+            totals = session.query(
+                *[
+                    func.coalesce(func.sum(getattr(AnalyticsDailyRollup, column)), 0)
+                    for column in columns
+                ]
+            ).one()
+        return dict(zip(columns, totals))
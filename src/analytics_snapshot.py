@@ -0,0 +1,349 @@
+"""
+Analytics snapshots
+Exports posts, comments, annotations and embeddings to Parquet partitioned
+by subreddit and month, with a manifest, so offline notebooks and batch
+reports read only the columns and partitions they need through
+memory-mapped Arrow instead of querying the production database
+"""
+
+import json
+import os
+import shutil
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from sqlalchemy import Boolean, DateTime, Float, Integer
+
+from config.settings import Config
+from src.data_persistence import DataPersistenceManager
+from src.database_models import PostAnnotation, RedditComment, RedditPost
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+MANIFEST = "manifest.json"
+UNDATED = "undated"
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"  # Comments whose post is missing
+
+EMBEDDING_COLUMNS = [
+    RedditPost.title_embedding,
+    RedditPost.content_embedding,
+    RedditPost.combined_embedding,
+]
+
+# Snapshot tables: columns exported from each model (embeddings get their own
+# table so post reads never touch the vectors)
+TABLES = {
+    "posts": [
+        column
+        for column in RedditPost.__table__.columns
+        if column.key not in {c.key for c in EMBEDDING_COLUMNS}
+    ],
+    "comments": list(RedditComment.__table__.columns),
+    "annotations": list(PostAnnotation.__table__.columns),
+    "embeddings": [RedditPost.__table__.c.id, RedditPost.__table__.c.post_id]
+    + [RedditPost.__table__.c[c.key] for c in EMBEDDING_COLUMNS],
+}
+
+
+def _arrow_type(column) -> "pa.DataType":
+    if column.key in {c.key for c in EMBEDDING_COLUMNS}:
+        return pa.list_(pa.float32())
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _schema(table: str) -> "pa.Schema":
+    """Arrow schema of a snapshot table, partition columns included"""
+    fields = [(column.key, _arrow_type(column)) for column in TABLES[table]]
+    if table != "posts":
+        fields.append(("subreddit", pa.string()))
+    return pa.schema(fields + [("month", pa.string())])
+
+
+def _vector(text: Optional[str]) -> Optional[List[float]]:
+    """Parse an embedding stored as "[x, y, ...]" text"""
+    if not text:
+        return None
+    try:
+        values = np.array(json.loads(text), dtype=np.float32)
+    except (TypeError, ValueError):
+        values = np.fromstring(text.strip("[]{}() "), sep=",", dtype=np.float32)
+    return values.tolist() if values.size else None
+
+
+def _month(created: Optional[datetime]) -> str:
+    return created.strftime("%Y-%m") if created else UNDATED
+
+
+def _json_records(frame: pd.DataFrame) -> List[Dict]:
+    """Rows as dicts with ISO timestamps and null fields left out"""
+    for column in frame.select_dtypes("datetime").columns:
+        frame[column] = frame[column].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return [
+        {key: value for key, value in row.items() if value is not None}
+        for row in frame.astype(object).where(frame.notna(), None).to_dict("records")
+    ]
+
+
+class SnapshotExporter:
+    """
+    Writes a snapshot of the corpus under ``root``
+
+    Every table is partitioned by the subreddit and month of the post a row
+    belongs to, so one partition holds complete threads. Snapshots are
+    written to a temporary directory and renamed when complete.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        root: Optional[str] = None,
+        batch_size: int = 20000,
+    ):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for analytics snapshots")
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.root = Path(root or Config.SNAPSHOT_DIR)
+        self.batch_size = batch_size
+
+    def export(self) -> Path:
+        """Export a new snapshot; returns its directory"""
+        name = f"snapshot_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        path = self.root / name
+        tmp_path = self.root / f"{name}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        try:
+            manifest = {
+                "name": name,
+                "created_at": datetime.utcnow().isoformat(),
+                "data_version": self.db_manager.data_version(),
+                "partitioning": ["subreddit", "month"],
+                "tables": {},
+            }
+            for table in TABLES:
+                manifest["tables"][table] = self._write_table(table, tmp_path / table)
+
+            with open(tmp_path / MANIFEST, "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, path)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        logger.info(
+            f"Analytics snapshot {path}: "
+            + ", ".join(
+                f"{rows['rows']} {table}" for table, rows in manifest["tables"].items()
+            )
+        )
+        return path
+
+    def _write_table(self, table: str, path: Path) -> Dict:
+        columns = TABLES[table]
+        schema = _schema(table)
+        partitions = Counter()
+
+        def batches() -> Iterator["pa.RecordBatch"]:
+            for rows in self._rows(table):
+                frame = pd.DataFrame.from_records(
+                    rows, columns=[field.name for field in schema]
+                )
+                for column in EMBEDDING_COLUMNS:
+                    if column.key in frame:
+                        frame[column.key] = frame[column.key].map(_vector)
+                partitions.update(
+                    zip(frame["subreddit"].fillna(HIVE_NULL), frame["month"])
+                )
+                yield pa.RecordBatch.from_pandas(
+                    frame, schema=schema, preserve_index=False
+                )
+
+        ds.write_dataset(
+            batches(),
+            path,
+            schema=schema,
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([("subreddit", pa.string()), ("month", pa.string())]),
+                flavor="hive",
+            ),
+            basename_template="part-{i}.parquet",
+            min_rows_per_group=5000,
+            max_partitions=1_000_000,
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        return {
+            "rows": sum(partitions.values()),
+            "columns": [column.key for column in columns],
+            "partitions": {
+                f"subreddit={subreddit}/month={month}": rows
+                for (subreddit, month), rows in sorted(partitions.items())
+            },
+        }
+
+    def _rows(self, table: str) -> Iterator[List]:
+        """Rows of ``table`` plus subreddit and month, in id-range batches"""
+        model = {
+            "posts": RedditPost,
+            "comments": RedditComment,
+            "annotations": PostAnnotation,
+            "embeddings": RedditPost,
+        }[table]
+
+        with self.db_manager.get_session() as session:
+            query = session.query(*TABLES[table])
+            if table == "posts":
+                extra = (RedditPost.created_utc,)
+            else:
+                extra = (RedditPost.subreddit, RedditPost.created_utc)
+            if model is not RedditPost:
+                query = query.outerjoin(RedditPost, RedditPost.post_id == model.post_id)
+            elif table == "embeddings":
+                query = query.filter(
+                    RedditPost.title_embedding.isnot(None)
+                    | RedditPost.content_embedding.isnot(None)
+                    | RedditPost.combined_embedding.isnot(None)
+                )
+            query = query.add_columns(*extra)
+
+            last_id = 0
+            while True:
+                rows = (
+                    query.filter(model.id > last_id)
+                    .order_by(model.id)
+                    .limit(self.batch_size)
+                    .all()
+                )
+                if not rows:
+                    return
+                last_id = rows[-1][0]
+                yield [(*row[:-1], _month(row[-1])) for row in rows]
+
+
+class AnalyticsSnapshot:
+    """
+    Read access to an exported snapshot
+
+    Files are memory-mapped and only the requested columns and the
+    partitions matching the subreddit/month filters are read.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for analytics snapshots")
+        path = Path(path) if path else self.latest()
+        if path is None:
+            raise FileNotFoundError(f"No analytics snapshot in {Config.SNAPSHOT_DIR}")
+        if not (path / MANIFEST).exists():
+            latest = self.latest(path)
+            if latest is None:
+                raise FileNotFoundError(f"No analytics snapshot in {path}")
+            path = latest
+
+        self.path = path
+        with open(path / MANIFEST) as f:
+            self.manifest = json.load(f)
+        self._filesystem = pafs.LocalFileSystem(use_mmap=True)
+
+    @staticmethod
+    def latest(root: Optional[Path] = None) -> Optional[Path]:
+        """Most recent complete snapshot under ``root``"""
+        root = Path(root or Config.SNAPSHOT_DIR)
+        if not root.is_dir():
+            return None
+        snapshots = sorted(path.parent for path in root.glob(f"snapshot_*/{MANIFEST}"))
+        return snapshots[-1] if snapshots else None
+
+    @staticmethod
+    def is_snapshot(path: str) -> bool:
+        path = Path(path)
+        return (path / MANIFEST).exists() or AnalyticsSnapshot.latest(path) is not None
+
+    def dataset(self, table: str) -> "ds.Dataset":
+        if table not in self.manifest["tables"]:
+            raise KeyError(f"Snapshot has no {table} table")
+        # Exporting an empty table writes no files
+        if not (self.path / table).is_dir():
+            return ds.dataset(_schema(table).empty_table())
+        return ds.dataset(
+            str(self.path / table),
+            format="parquet",
+            partitioning="hive",
+            filesystem=self._filesystem,
+        )
+
+    def read(
+        self,
+        table: str,
+        columns: Optional[List[str]] = None,
+        subreddits: Optional[List[str]] = None,
+        month_from: Optional[str] = None,
+        month_to: Optional[str] = None,
+    ) -> "pa.Table":
+        """
+        Read a table, pruned to ``columns`` and to partitions of the given
+        subreddits and months ("YYYY-MM", inclusive; a month range leaves
+        out undated rows)
+        """
+        condition = None
+        for part in (
+            ds.field("subreddit").isin(subreddits) if subreddits else None,
+            ds.field("month") >= month_from if month_from else None,
+            ds.field("month") <= month_to if month_to else None,
+            ds.field("month") != UNDATED if month_from or month_to else None,
+        ):
+            if part is not None:
+                condition = part if condition is None else condition & part
+
+        return self.dataset(table).to_table(columns=columns, filter=condition)
+
+    def to_pandas(self, table: str, columns: Optional[List[str]] = None, **filters):
+        """``read`` as a DataFrame"""
+        return self.read(table, columns=columns, **filters).to_pandas()
+
+    def threads(
+        self, post_columns: List[str], comment_columns: List[str], **filters
+    ) -> List[Dict]:
+        """
+        Posts as dicts with their comments under "comments", the layout of
+        the JSON data exports, for tools written against those files
+        """
+        posts = self.to_pandas(
+            "posts", columns=list(dict.fromkeys(["post_id", *post_columns])), **filters
+        )
+        comments = self.to_pandas(
+            "comments",
+            columns=list(dict.fromkeys(["post_id", *comment_columns])),
+            **filters,
+        )
+
+        comments_by_post = {}
+        for comment in _json_records(comments):
+            comments_by_post.setdefault(comment.get("post_id"), []).append(comment)
+
+        threads = []
+        for post in _json_records(posts):
+            post["comments"] = comments_by_post.get(post["post_id"], [])
+            threads.append(post)
+        return threads
@@ -0,0 +1,274 @@
+"""
+Reply-tree cascade analysis
+Reconstructs the comment tree of every post in one ordered pass over the
+comments and stores per-post cascade statistics (depth, breadth,
+structural virality, time-to-N-replies) for ranking spreading threads
+"""
+
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from sqlalchemy import func, select
+
+from src.data_persistence import DataPersistenceManager
+from src.database_models import PostCascade, RedditComment, RedditPost
+
+# Reply counts N with a stored time-to-N column
+TIME_TO_REPLIES = {
+    1: "time_to_first_reply_hours",
+    10: "time_to_10_replies_hours",
+    100: "time_to_100_replies_hours",
+}
+
+RANKABLE = [
+    "size",
+    "depth",
+    "max_breadth",
+    "structural_virality",
+    "unique_participants",
+]
+
+
+def _comment_depths(parent: np.ndarray) -> np.ndarray:
+    """Reply depth of every comment (1 = direct reply to the post)"""
+    # Pointer jumping: O(log depth) vectorized passes instead of a tree walk
+    hops = (parent >= 0).astype(np.int64)
+    jump = parent.copy()
+    for _ in range(64):
+        active = np.flatnonzero(jump >= 0)
+        if not len(active):
+            break
+        targets = jump[active]
+        hops[active] += hops[targets]
+        jump[active] = jump[targets]
+    return hops + 1
+
+
+def reply_tree_stats(comments: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cascade statistics for every post in a frame of its comments
+
+    Expects post_id, comment_id, parent_id, author, created_utc,
+    post_created_utc and row_id columns, with all comments of a post in
+    the frame. Comments whose parent is missing hang off the post.
+    Structural virality is the Wiener index of the tree (post included)
+    divided by the number of node pairs.
+    """
+    comments = comments.sort_values(
+        ["post_id", "created_utc"], kind="stable"
+    ).reset_index(drop=True)
+    n = len(comments)
+    post_codes, post_ids = pd.factorize(comments["post_id"])
+
+    # parent_id is "t1_<comment_id>" for replies to comments
+    parent_ids = comments["parent_id"].fillna("")
+    parent_keys = parent_ids.str.slice(3).where(parent_ids.str.startswith("t1_"))
+    parent = pd.Index(comments["comment_id"]).get_indexer(parent_keys)
+    valid = (parent >= 0) & (parent != np.arange(n))
+    valid[valid] &= post_codes[parent[valid]] == post_codes[valid]
+    parent = np.where(valid, parent, -1)
+
+    depth = _comment_depths(parent)
+    num_posts = len(post_ids)
+    size = np.bincount(post_codes, minlength=num_posts)
+
+    # Breadth: most comments on one level of the tree
+    levels, level_counts = np.unique(
+        post_codes.astype(np.int64) * (depth.max() + 1) + depth, return_counts=True
+    )
+    breadth = np.zeros(num_posts, dtype=np.int64)
+    np.maximum.at(breadth, levels // (depth.max() + 1), level_counts)
+
+    # Subtree sizes, accumulated from the deepest level upwards
+    subtree = np.ones(n, dtype=np.int64)
+    order = np.argsort(-depth, kind="stable")
+    boundaries = np.flatnonzero(np.diff(depth[order])) + 1
+    for level in np.split(order, boundaries):
+        children = level[parent[level] >= 0]
+        np.add.at(subtree, parent[children], subtree[children])
+
+    # Wiener index: every edge is on s * (N - s) of the tree's shortest paths
+    tree_nodes = size + 1
+    wiener = np.bincount(
+        post_codes,
+        weights=subtree * (tree_nodes[post_codes] - subtree),
+        minlength=num_posts,
+    )
+    virality = 2 * wiener / (tree_nodes * (tree_nodes - 1))
+
+    max_depth = np.zeros(num_posts, dtype=np.int64)
+    np.maximum.at(max_depth, post_codes, depth)
+
+    stats = pd.DataFrame(
+        {
+            "post_id": post_ids,
+            "size": size,
+            "depth": max_depth,
+            "max_breadth": breadth,
+            "structural_virality": virality,
+        }
+    )
+
+    # Time to the Nth reply (comments are in time order within each post)
+    starts = np.concatenate([[0], np.cumsum(size)[:-1]])
+    delay_hours = (
+        (comments["created_utc"] - comments["post_created_utc"]).dt.total_seconds()
+        / 3600
+    ).clip(lower=0)
+    delay_hours = delay_hours.to_numpy(dtype=float, na_value=np.nan)
+    for replies, column in TIME_TO_REPLIES.items():
+        reached = size >= replies
+        values = np.full(num_posts, np.nan)
+        values[reached] = delay_hours[starts[reached] + replies - 1]
+        stats[column] = values
+
+    authors = comments["author"].where(comments["author"] != "[deleted]")
+    stats["unique_participants"] = (
+        authors.groupby(post_codes).nunique().reindex(range(num_posts)).values
+    )
+    stats["last_comment_row_id"] = (
+        comments["row_id"].groupby(post_codes).max().reindex(range(num_posts)).values
+    )
+    return stats
+
+
+class CascadeAnalyzer:
+    """
+    Per-post reply cascades for the whole corpus
+
+    ``update`` recomputes only posts that received comments since the last
+    run (RedditComment.id watermark); comments are streamed in post order so
+    memory stays bounded by ``batch_size`` comments.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        batch_size: int = 50000,
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.batch_size = batch_size
+
+    def update(self, full: bool = False) -> int:
+        """
+        Compute cascade stats for posts with new comments (or all posts)
+
+        Returns:
+            Number of posts whose cascade was (re)computed
+        """
+        updated = 0
+        with self.db_manager.get_session() as session:
+            try:
+                for frame in self._comment_batches(session, full):
+                    stats = reply_tree_stats(frame)
+                    self._save(session, stats)
+                    updated += len(stats)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+        logger.info(f"Computed reply cascades for {updated} posts")
+        return updated
+
+    def _comment_batches(self, session, full: bool) -> Iterator[pd.DataFrame]:
+        """Comment frames holding complete posts, in one ordered scan"""
+        query = session.query(
+            RedditComment.id.label("row_id"),
+            RedditComment.post_id,
+            RedditComment.comment_id,
+            RedditComment.parent_id,
+            RedditComment.author,
+            RedditComment.created_utc,
+            RedditPost.created_utc.label("post_created_utc"),
+        ).join(RedditPost, RedditPost.post_id == RedditComment.post_id)
+
+        if not full:
+            watermark = (
+                session.query(func.max(PostCascade.last_comment_row_id)).scalar() or 0
+            )
+            changed = (
+                select(RedditComment.post_id)
+                .where(RedditComment.id > watermark)
+                .distinct()
+            )
+            query = query.filter(RedditComment.post_id.in_(changed))
+
+        columns = [c["name"] for c in query.column_descriptions]
+        rows: List = []
+        for row in query.order_by(RedditComment.post_id).yield_per(self.batch_size):
+            if len(rows) >= self.batch_size and row.post_id != rows[-1][1]:
+                yield self._frame(rows, columns)
+                rows = []
+            rows.append(tuple(row))
+        if rows:
+            yield self._frame(rows, columns)
+
+    @staticmethod
+    def _frame(rows: List, columns: List[str]) -> pd.DataFrame:
+        frame = pd.DataFrame.from_records(rows, columns=columns)
+        for column in ("created_utc", "post_created_utc"):
+            frame[column] = pd.to_datetime(frame[column])
+        return frame
+
+    def _save(self, session, stats: pd.DataFrame) -> None:
+        """Insert or update PostCascade rows for the computed posts"""
+        post_ids = stats["post_id"].tolist()
+        existing = dict(
+            session.query(PostCascade.post_id, PostCascade.id)
+            .filter(PostCascade.post_id.in_(post_ids))
+            .all()
+        )
+
+        now = datetime.utcnow()
+        records = stats.astype(object).where(stats.notna(), None).to_dict("records")
+        inserts, updates = [], []
+        for record in records:
+            record["computed_at"] = now
+            if record["post_id"] in existing:
+                updates.append({"id": existing[record["post_id"]], **record})
+            else:
+                inserts.append(record)
+
+        if inserts:
+            session.bulk_insert_mappings(PostCascade, inserts)
+        if updates:
+            session.bulk_update_mappings(PostCascade, updates)
+
+    def top_cascades(
+        self, by: str = "structural_virality", limit: int = 20, min_size: int = 10
+    ) -> List[Dict]:
+        """Largest or most viral threads, with their post titles"""
+        if by not in RANKABLE and by not in TIME_TO_REPLIES.values():
+            raise ValueError(f"Cannot rank cascades by {by}")
+
+        column = getattr(PostCascade, by)
+        # Time-to-N ranks fastest first; shape metrics rank largest first
+        ordering = column.asc() if by.startswith("time_to") else column.desc()
+
+        with self.db_manager.get_session() as session:
+            rows = (
+                session.query(PostCascade, RedditPost.title, RedditPost.subreddit)
+                .join(RedditPost, RedditPost.post_id == PostCascade.post_id)
+                .filter(PostCascade.size >= min_size, column.isnot(None))
+                .order_by(ordering)
+                .limit(limit)
+                .all()
+            )
+
+            return [
+                {
+                    "post_id": cascade.post_id,
+                    "title": title,
+                    "subreddit": subreddit,
+                    **{name: getattr(cascade, name) for name in RANKABLE},
+                    **{
+                        name: getattr(cascade, name)
+                        for name in TIME_TO_REPLIES.values()
+                    },
+                }
+                for cascade, title, subreddit in rows
+            ]
@@ -0,0 +1,328 @@
+"""
+Corpus health report
+Summarizes the collected posts and comments (volume, subreddit engagement,
+languages, most discussed posts, active commenters, health discussion)
+with aggregate queries, so a report takes the same few round-trips however
+large the corpus is
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from src.data_persistence import DataPersistenceManager
+from src.database_models import RedditComment, RedditPost
+
+HEALTH_KEYWORDS = [
+    "health",
+    "doctor",
+    "medicine",
+    "treatment",
+    "symptoms",
+    "therapy",
+    "medical",
+    "hospital",
+    "clinic",
+    "hiv",
+    "prep",
+    "std",
+    "mental health",
+    "anxiety",
+    "depression",
+]
+
+
+class CorpusReport:
+    """
+    Aggregate statistics of the corpus
+
+    Every section is a single query; per-post figures (comment counts, top
+    comments) come from GROUP BY and window functions rather than a query
+    per post. Text statistics are computed over the first ``sample_size``
+    comments, as the reports always have.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        sample_size: int = 1000,
+        health_keywords: Optional[List[str]] = None,
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.sample_size = sample_size
+        self.health_keywords = health_keywords or HEALTH_KEYWORDS
+
+    def build(self) -> Dict[str, Any]:
+        """All report sections"""
+        with self.db_manager.get_session() as session:
+            report = {
+                "timestamp": datetime.now().isoformat(),
+                **self.overview(session),
+                "subreddits": self.subreddit_engagement(session),
+                "languages": self.language_distribution(session),
+                "recent_posts": self.recent_posts(session),
+                "content_quality": self.content_quality(session),
+                "popular_posts": self.popular_posts(session),
+                "comment_patterns": self.comment_patterns(session),
+                "top_commenters": self.top_commenters(session),
+                "health_discussion": self.health_discussion(session),
+            }
+        logger.info(
+            f"Corpus report: {report['total_posts']} posts, "
+            f"{report['total_comments']} comments"
+        )
+        return report
+
+    def save(self, report: Dict[str, Any], path: Optional[str] = None) -> str:
+        """Write a report as JSON; returns the file path"""
+        path = path or (
+            f"data/corpus_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        return path
+
+    @staticmethod
+    def _comment_counts():
+        return (
+            select(
+                RedditComment.post_id.label("post_id"),
+                func.count(RedditComment.id).label("comment_count"),
+            )
+            .group_by(RedditComment.post_id)
+            .subquery()
+        )
+
+    def _comment_sample(self, size: int):
+        return (
+            select(RedditComment.body, RedditComment.score)
+            .order_by(RedditComment.id)
+            .limit(size)
+            .subquery()
+        )
+
+    def overview(self, session: Session) -> Dict[str, int]:
+        total_posts, total_comments, translated_posts = session.execute(
+            select(
+                select(func.count(RedditPost.id)).scalar_subquery(),
+                select(func.count(RedditComment.id)).scalar_subquery(),
+                select(func.count(RedditPost.id))
+                .where(RedditPost.english_translation.isnot(None))
+                .scalar_subquery(),
+            )
+        ).one()
+        return {
+            "total_posts": total_posts,
+            "total_comments": total_comments,
+            "translated_posts": translated_posts,
+        }
+
+    def subreddit_engagement(self, session: Session) -> Dict[str, Dict[str, int]]:
+        """Posts and comments per subreddit, most comments first"""
+        counts = self._comment_counts()
+        comments = func.coalesce(func.sum(counts.c.comment_count), 0)
+        rows = (
+            session.query(RedditPost.subreddit, func.count(RedditPost.id), comments)
+            .outerjoin(counts, counts.c.post_id == RedditPost.post_id)
+            .group_by(RedditPost.subreddit)
+            .order_by(comments.desc(), func.count(RedditPost.id).desc())
+            .all()
+        )
+        return {
+            subreddit: {"posts": posts, "comments": int(comment_count)}
+            for subreddit, posts, comment_count in rows
+        }
+
+    def language_distribution(self, session: Session) -> Dict[str, int]:
+        language = func.coalesce(RedditPost.language, "unknown")
+        rows = (
+            session.query(language, func.count(RedditPost.id))
+            .group_by(language)
+            .order_by(func.count(RedditPost.id).desc())
+            .all()
+        )
+        return dict(rows)
+
+    def recent_posts(self, session: Session, limit: int = 5) -> List[Dict[str, Any]]:
+        rows = (
+            session.query(
+                RedditPost.post_id,
+                RedditPost.subreddit,
+                RedditPost.title,
+                RedditPost.language,
+                RedditPost.score,
+            )
+            .order_by(RedditPost.created_utc.desc())
+            .limit(limit)
+            .all()
+        )
+        return [row._asdict() for row in rows]
+
+    def content_quality(self, session: Session, sample: int = 100) -> Dict[str, Any]:
+        """Average title+selftext length of sampled posts with real content"""
+        posts = (
+            select(RedditPost.title, RedditPost.selftext)
+            .order_by(RedditPost.id)
+            .limit(sample)
+            .subquery()
+        )
+        length = func.length(posts.c.title) + func.coalesce(
+            func.length(posts.c.selftext), 0
+        )
+        substantial = and_(func.length(func.trim(posts.c.title)) > 0, length > 10)
+        average, with_content, sampled = session.execute(
+            select(
+                func.avg(case((substantial, length))),
+                func.count(case((substantial, 1))),
+                func.count(),
+            ).select_from(posts)
+        ).one()
+        return {
+            "avg_post_length": float(average or 0),
+            "posts_with_content": with_content,
+            "sampled_posts": sampled,
+        }
+
+    def popular_posts(
+        self,
+        session: Session,
+        limit: int = 5,
+        min_comments: int = 5,
+        comments_per_post: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """
+        Posts with more than ``min_comments`` comments, most discussed first,
+        each with its top-scored comments
+        """
+        counts = self._comment_counts()
+        top = (
+            select(counts)
+            .where(counts.c.comment_count > min_comments)
+            .order_by(counts.c.comment_count.desc(), counts.c.post_id)
+            .limit(limit)
+            .subquery()
+        )
+        ranked = (
+            select(
+                RedditComment.post_id,
+                RedditComment.body,
+                RedditComment.score,
+                func.row_number()
+                .over(
+                    partition_by=RedditComment.post_id,
+                    order_by=(RedditComment.score.desc(), RedditComment.id),
+                )
+                .label("rank"),
+            )
+            .where(RedditComment.post_id.in_(select(top.c.post_id)))
+            .subquery()
+        )
+        rows = session.execute(
+            select(
+                RedditPost.post_id,
+                RedditPost.subreddit,
+                RedditPost.title,
+                top.c.comment_count,
+                ranked.c.body,
+                ranked.c.score,
+            )
+            .join(top, top.c.post_id == RedditPost.post_id)
+            .outerjoin(
+                ranked,
+                and_(
+                    ranked.c.post_id == RedditPost.post_id,
+                    ranked.c.rank <= comments_per_post,
+                ),
+            )
+            .order_by(top.c.comment_count.desc(), top.c.post_id, ranked.c.rank)
+        ).all()
+
+        posts: Dict[str, Dict[str, Any]] = {}
+        for post_id, subreddit, title, comment_count, body, score in rows:
+            post = posts.setdefault(
+                post_id,
+                {
+                    "post_id": post_id,
+                    "subreddit": subreddit,
+                    "title": title,
+                    "comment_count": comment_count,
+                    "top_comments": [],
+                },
+            )
+            if body is not None or score is not None:
+                post["top_comments"].append({"body": body or "", "score": score})
+        return list(posts.values())
+
+    def comment_patterns(self, session: Session) -> Dict[str, float]:
+        """Average length and score of sampled comments"""
+        comments = self._comment_sample(self.sample_size)
+        average_length, average_score, sampled = session.execute(
+            select(
+                func.avg(func.length(comments.c.body)),
+                func.avg(comments.c.score),
+                func.count(),
+            ).select_from(comments)
+        ).one()
+        return {
+            "avg_length": float(average_length or 0),
+            "avg_score": float(average_score or 0),
+            "sampled_comments": sampled,
+        }
+
+    def top_commenters(self, session: Session, limit: int = 10) -> Dict[str, int]:
+        rows = (
+            session.query(RedditComment.author, func.count(RedditComment.id))
+            .filter(
+                RedditComment.author.isnot(None),
+                RedditComment.author != "",
+                RedditComment.author != "[deleted]",
+            )
+            .group_by(RedditComment.author)
+            .order_by(func.count(RedditComment.id).desc(), RedditComment.author)
+            .limit(limit)
+            .all()
+        )
+        return dict(rows)
+
+    def health_discussion(self, session: Session, samples: int = 3) -> Dict[str, Any]:
+        """
+        Share of sampled comments mentioning a health keyword, plus a few
+        substantial examples from twice the sample
+        """
+
+        def mentions_health(body):
+            text = func.lower(body)
+            return or_(
+                *(
+                    text.contains(keyword.lower(), autoescape=True)
+                    for keyword in self.health_keywords
+                )
+            )
+
+        comments = self._comment_sample(self.sample_size)
+        health_comments, analyzed = session.execute(
+            select(
+                func.count(case((mentions_health(comments.c.body), 1))),
+                func.count(),
+            ).select_from(comments)
+        ).one()
+
+        wider = self._comment_sample(self.sample_size * 2)
+        examples = session.execute(
+            select(wider.c.body, wider.c.score)
+            .where(mentions_health(wider.c.body), func.length(wider.c.body) > 50)
+            .limit(samples)
+        ).all()
+
+        return {
+            "health_comments": health_comments,
+            "analyzed_comments": analyzed,
+            "percentage": health_comments / analyzed * 100 if analyzed else 0.0,
+            "examples": [{"body": body, "score": score} for body, score in examples],
+        }
@@ -3,17 +3,160 @@ Data persistence module for Reddit health misinformation research platform
 Handles database operations with proper duplicate detection and upsert logic
 """
 
+import importlib
 import json
+import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from loguru import logger
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, func, not_, or_, select, text
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
 from config.settings import Config
-from src.database_models import Base, PostAnnotation, RedditComment, RedditPost
+from src.database_models import (
+    Base,
+    DataVersion,
+    PostAnnotation,
+    RedditComment,
+    RedditPost,
+)
+
+
+def increment_rows(
+    session: Session,
+    model,
+    key_columns: List[str],
+    count_columns: List[str],
+    rows: List[Dict],
+    batch_size: int = 10000,
+    insert: bool = True,
+) -> None:
+    """
+    Add the counts of ``rows`` to existing rows by key, inserting new keys
+
+    With ``insert=False`` keys without a row are skipped, so subtracting
+    (negative counts) never creates negative rows.
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    dialect = session.bind.dialect.name
+
+    if not insert:
+        statement = (
+            table.update()
+            .where(
+                *(
+                    table.c[column] == bindparam(f"key_{column}")
+                    for column in key_columns
+                )
+            )
+            .values(
+                {
+                    column: table.c[column] + bindparam(f"add_{column}")
+                    for column in count_columns
+                }
+            )
+        )
+        parameters = [
+            {
+                **{f"key_{column}": row[column] for column in key_columns},
+                **{f"add_{column}": row[column] for column in count_columns},
+            }
+            for row in rows
+        ]
+        for start in range(0, len(parameters), batch_size):
+            session.execute(statement, parameters[start : start + batch_size])
+        return
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={
+                column: table.c[column] + statement.excluded[column]
+                for column in count_columns
+            },
+        )
+        for start in range(0, len(rows), batch_size):
+            session.execute(statement, rows[start : start + batch_size])
+        return
+
+    # Portable fallback: update in place, insert when no row matched
+    for row in rows:
+        matched = session.execute(
+            table.update()
+            .where(*(table.c[column] == row[column] for column in key_columns))
+            .values({column: table.c[column] + row[column] for column in count_columns})
+        ).rowcount
+        if not matched:
+            session.execute(table.insert().values(row))
+
+
+def surviving_max_ids(session: Session, posts) -> Tuple[int, int]:
+    """
+    Highest post and comment ids left once the posts matching ``posts`` and
+    their comments are deleted
+
+    SQLite hands the ids of deleted trailing rows out again, so watermark
+    stores lower their watermarks to these before the delete; otherwise new
+    rows reusing those ids would never be picked up.
+    """
+    deleted_post_ids = select(RedditPost.post_id).where(posts)
+    max_post = (
+        session.query(func.max(RedditPost.id)).filter(not_(posts)).scalar() or 0
+    )
+    max_comment = (
+        session.query(func.max(RedditComment.id))
+        .filter(
+            or_(
+                RedditComment.post_id.is_(None),
+                RedditComment.post_id.notin_(deleted_post_ids),
+            )
+        )
+        .scalar()
+        or 0
+    )
+    return max_post, max_comment
+
+
+# Stores derived from posts and comments that ingest keeps up to date:
+# stats key -> (module, class, Config flag enabling updates at ingest)
+DERIVED_STORES = {
+    "graph_rows": (
+        "src.interaction_graph",
+        "InteractionGraphStore",
+        "AUTO_UPDATE_INTERACTION_GRAPH",
+    ),
+    "rollup_rows": (
+        "src.analytics_rollup",
+        "AnalyticsRollupStore",
+        "AUTO_UPDATE_ANALYTICS_ROLLUPS",
+    ),
+    "keyword_postings": (
+        "src.keyword_index",
+        "KeywordIndex",
+        "AUTO_UPDATE_KEYWORD_INDEX",
+    ),
+    "search_documents": (
+        "src.full_text_search",
+        "FullTextSearch",
+        "AUTO_UPDATE_SEARCH_INDEX",
+    ),
+    "word_frequency_docs": (
+        "src.word_frequency",
+        "WordFrequencyStore",
+        "AUTO_UPDATE_WORD_FREQUENCIES",
+    ),
+}
 
 
 class DataPersistenceManager:
@@ -24,9 +167,15 @@ class DataPersistenceManager:
         self.database_url = database_url or Config.DATABASE_URL
         self.engine = create_engine(self.database_url)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self._triage_model = None
+        self._triage_model_mtime = None
+        self._derived_stores = {}
 
-        # Ensure tables exist
+        # Ensure tables exist, and indexes added to tables that already did
         Base.metadata.create_all(self.engine)
+        for table in (RedditPost.__table__, RedditComment.__table__):
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
 
         logger.info(f"Initialized database persistence: {self.database_url}")
 
@@ -62,10 +211,15 @@ class DataPersistenceManager:
             )
             return [row[0] for row in existing]
 
-    def save_post(self, post_data: Dict) -> Tuple[bool, str]:
+    def save_post(
+        self, post_data: Dict, bump_version: bool = True
+    ) -> Tuple[bool, str]:
         """
         Save a single post to database with upsert logic
 
+        ``bump_version=False`` leaves invalidating cached analytics to the
+        caller (bulk_save_posts bumps once per batch).
+
         Returns:
             Tuple of (success: bool, message: str)
         """
@@ -80,11 +234,17 @@ class DataPersistenceManager:
 
                 if existing_post:
                     # Update existing post (in case of score changes, etc.)
+                    # (scraped comment dicts are not assigned to the relationship)
                     for key, value in post_data.items():
-                        if hasattr(existing_post, key) and key != "post_id":
+                        if hasattr(existing_post, key) and key not in (
+                            "post_id",
+                            "comments",
+                        ):
                             setattr(existing_post, key, value)
 
                     session.commit()
+                    if bump_version:
+                        self.bump_data_version()
                     return True, f"Updated existing post {post_data['post_id']}"
 
                 else:
@@ -122,6 +282,8 @@ class DataPersistenceManager:
                             comment_count += 1
 
                     session.commit()
+                    if bump_version:
+                        self.bump_data_version()
                     return (
                         True,
                         f"Saved new post {post_data['post_id']} with {comment_count} comments",
@@ -168,6 +330,7 @@ class DataPersistenceManager:
 
                 if should_close_session:
                     session.commit()
+                    self.bump_data_version()
                 return True, f"Updated comment {comment_data['comment_id']}"
 
             else:
@@ -183,6 +346,7 @@ class DataPersistenceManager:
 
                 if should_close_session:
                     session.commit()
+                    self.bump_data_version()
                 return True, f"Saved new comment {comment_data['comment_id']}"
 
         except IntegrityError as e:
@@ -218,17 +382,27 @@ class DataPersistenceManager:
             f"Processing {len(posts_data)} posts, {len(existing_ids)} already exist"
         )
 
+        new_post_ids = []
+
+        # Derived stores re-read re-scraped posts (scores etc.) after the save
+        prepared = (
+            self._call_derived_stores("prepare_post_updates", list(existing_ids))
+            if existing_ids
+            else {}
+        )
+
         for post_data in posts_data:
             post_id = post_data["post_id"]
 
             try:
-                success, message = self.save_post(post_data)
+                success, message = self.save_post(post_data, bump_version=False)
 
                 if success:
                     if post_id in existing_ids:
                         stats["updated"] += 1
                     else:
                         stats["saved"] += 1
+                        new_post_ids.append(post_id)
 
                     if stats["saved"] % 50 == 0:  # Progress logging
                         logger.info(
@@ -242,9 +416,147 @@ class DataPersistenceManager:
                 stats["errors"] += 1
                 logger.error(f"Exception saving post {post_id}: {e}")
 
+        # Severity triage for newly ingested posts
+        stats["triaged"] = self.triage_posts(new_post_ids)
+
+        # Fold new posts and comments into the graph, rollups and indexes
+        if new_post_ids:
+            stats.update(self.update_derived_stores())
+        for name, previous in prepared.items():
+            try:
+                self.derived_store(name).apply_post_updates(previous)
+            except Exception as e:
+                logger.error(f"Error in {name} apply_post_updates: {e}")
+
+        # Invalidate cached analytics computed from the previous corpus
+        if stats["saved"] or stats["updated"]:
+            stats["data_version"] = self.bump_data_version()
+
         logger.info(f"Bulk save complete: {stats}")
         return stats
 
+    def triage_posts(self, post_ids: List[str]) -> int:
+        """
+        Score posts with the trained misinformation classifier, if one exists
+
+        With Config.AUTO_RETRAIN the classifier is first retrained (and every
+        post rescored) once enough new annotations have arrived. Triage
+        failures are logged and never interrupt data collection.
+        """
+        if not post_ids or not Config.AUTO_TRIAGE:
+            return 0
+
+        try:
+            if not os.path.exists(Config.TRIAGE_MODEL_PATH):
+                return 0
+            model = self._load_triage_model()
+
+            if Config.AUTO_RETRAIN and model.retrain_if_needed():
+                # Retraining rescored every post, the new ones included
+                self._triage_model_mtime = os.path.getmtime(Config.TRIAGE_MODEL_PATH)
+                return len(post_ids)
+
+            stats = model.score_posts(post_ids=post_ids)
+            if stats["high_severity"]:
+                logger.warning(
+                    f"Triage flagged {stats['high_severity']} new high-severity posts"
+                )
+            return stats["scored"]
+
+        except Exception as e:
+            logger.error(f"Error triaging new posts: {e}")
+            return 0
+
+    def _load_triage_model(self):
+        """
+        The triage classifier, loaded again whenever the model file changes
+        (e.g. retrained by `python main.py retrain-classifier`)
+        """
+        mtime = os.path.getmtime(Config.TRIAGE_MODEL_PATH)
+        if self._triage_model is None or mtime != self._triage_model_mtime:
+            from src.misinformation_classifier import MisinformationClassifier
+
+            model = MisinformationClassifier(db_manager=self)
+            model.load_model(Config.TRIAGE_MODEL_PATH)
+            self._triage_model, self._triage_model_mtime = model, mtime
+        return self._triage_model
+
+    def derived_store(self, name: str):
+        """Shared instance of one of the DERIVED_STORES, imported on first use"""
+        if name not in self._derived_stores:
+            module, class_name, _ = DERIVED_STORES[name]
+            store_class = getattr(importlib.import_module(module), class_name)
+            self._derived_stores[name] = store_class(db_manager=self)
+        return self._derived_stores[name]
+
+    def _call_derived_stores(
+        self, method: str, *args, enabled_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Call ``method`` on every derived store that has it
+
+        Failures are logged and never interrupt data collection; the stores
+        catch up on their next update or ``--full-refresh``.
+        """
+        results = {}
+        for name, (_, _, flag) in DERIVED_STORES.items():
+            if enabled_only and not getattr(Config, flag):
+                continue
+            try:
+                store = self.derived_store(name)
+                if hasattr(store, method):
+                    results[name] = getattr(store, method)(*args)
+            except Exception as e:
+                logger.error(f"Error in {name} {method}: {e}")
+                results[name] = 0
+        return results
+
+    def update_derived_stores(self) -> Dict[str, int]:
+        """Fold new posts and comments into every enabled derived store"""
+        return self._call_derived_stores("update", enabled_only=True)
+
+    def remove_from_derived_stores(self, session: Session, posts) -> Dict[str, int]:
+        """
+        Take the posts matching the RedditPost condition ``posts``, and their
+        comments, out of the derived stores that keep copies of them
+
+        Runs in the caller's transaction before the rows are deleted, so a
+        failing store rolls the delete back instead of keeping deleted rows.
+        """
+        return {
+            name: self.derived_store(name).remove_posts(session, posts)
+            for name in DERIVED_STORES
+            if hasattr(self.derived_store(name), "remove_posts")
+        }
+
+    def data_version(self) -> int:
+        """Current corpus data version (0 before the first ingest)"""
+        with self.get_session() as session:
+            return session.query(DataVersion.version).scalar() or 0
+
+    def bump_data_version(self) -> int:
+        """
+        Increment the corpus data version after a write
+
+        Analytics caches key their results by this version, so a bump makes
+        every result computed from earlier data stale.
+        """
+        with self.get_session() as session:
+            try:
+                state = session.query(DataVersion).with_for_update().first()
+                if state is None:
+                    state = DataVersion(version=0)
+                    session.add(state)
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+                return state.version
+
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error bumping data version: {e}")
+                return 0
+
     def load_and_save_json_data(self, json_file_path: str) -> Dict[str, int]:
         """
         Load Reddit data from JSON file and save to database
@@ -318,18 +630,32 @@ class DataPersistenceManager:
         Returns:
             Number of posts removed
         """
+        # Set up the derived stores (and their schemas) before the delete
+        # transaction locks the database
+        for name in DERIVED_STORES:
+            self.derived_store(name)
+
         with self.get_session() as session:
             try:
                 cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+                old_posts = RedditPost.created_utc < cutoff_date
+                self.remove_from_derived_stores(session, old_posts)
 
-                # Delete old posts and their comments (cascading)
+                # Delete old posts and their comments
+                session.query(RedditComment).filter(
+                    RedditComment.post_id.in_(
+                        session.query(RedditPost.post_id).filter(old_posts)
+                    )
+                ).delete(synchronize_session=False)
                 deleted_count = (
                     session.query(RedditPost)
-                    .filter(RedditPost.created_utc < cutoff_date)
-                    .delete()
+                    .filter(old_posts)
+                    .delete(synchronize_session=False)
                 )
 
                 session.commit()
+                if deleted_count:
+                    self.bump_data_version()
                 logger.info(
                     f"Cleaned up {deleted_count} posts older than {days_to_keep} days"
                 )
@@ -7,12 +7,15 @@ from datetime import datetime
 from sqlalchemy import (
     Boolean,
     Column,
+    Date,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
     create_engine,
 )
 from sqlalchemy.ext.declarative import declarative_base
@@ -25,6 +28,7 @@ class RedditPost(Base):
     """Model for Reddit posts"""
 
     __tablename__ = "reddit_posts"
+    __table_args__ = (Index("ix_reddit_posts_created", "created_utc", "id"),)
 
     id = Column(Integer, primary_key=True)
     post_id = Column(String(50), unique=True, nullable=False)
@@ -72,6 +76,7 @@ class RedditComment(Base):
     """Model for Reddit comments"""
 
     __tablename__ = "reddit_comments"
+    __table_args__ = (Index("ix_reddit_comments_post_score", "post_id", "score"),)
 
     id = Column(Integer, primary_key=True)
     comment_id = Column(String(50), unique=True, nullable=False)
@@ -146,6 +151,13 @@ class NetworkMetrics(Base):
     density = Column(Float)
     num_communities = Column(Integer)
     largest_community_size = Column(Integer)
+    information_flow_speed = Column(Float)  # 1 / median hours to first reply
+
+    # Sliding-window time series (NULL for one-off snapshots)
+    scope = Column(String(100))  # "all" or a subreddit name
+    window_start = Column(DateTime)
+    window_end = Column(DateTime)
+
     metrics_json = Column(Text)  # Full metrics as JSON
 
 
@@ -271,6 +283,370 @@ class InterventionResponse(Base):
     severity = relationship("MisinformationSeverity", back_populates="interventions")
 
 
+class MisinformationPrediction(Base):
+    """Model for automated misinformation triage of posts"""
+
+    __tablename__ = "misinformation_predictions"
+
+    id = Column(Integer, primary_key=True)
+    post_id = Column(
+        String(50), ForeignKey("reddit_posts.post_id"), unique=True, nullable=False
+    )
+
+    # Predicted annotation fields
+    category = Column(String(50))  # Accurate, Misinformation, etc.
+    category_confidence = Column(Float)
+    severity_level = Column(Integer)  # 1-5 scale
+    severity_confidence = Column(Float)
+    health_topic = Column(String(100))  # PrEP/STI_testing/HIV_treatment
+    misinformation_score = Column(Float)  # P(category == Misinformation)
+
+    model_version = Column(String(50))  # trained_at of the scoring model
+    scored_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    post = relationship("RedditPost")
+
+
+class AnnotationQueueItem(Base):
+    """Model for the precomputed active-learning annotation queue"""
+
+    __tablename__ = "annotation_queue"
+    __table_args__ = (
+        # Annotation pages are read with one scan of this index
+        Index("ix_annotation_queue_status_priority", "status", "priority", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    post_id = Column(
+        String(50), ForeignKey("reddit_posts.post_id"), unique=True, nullable=False
+    )
+    post_row_id = Column(Integer, index=True)  # RedditPost.id, refresh watermark
+
+    # Active-learning signals
+    model_score = Column(Float)  # Stored classifier score the item was ranked on
+    uncertainty = Column(Float)  # 1 - margin; 1.0 when the post is unscored
+    cluster_id = Column(Integer)  # Embedding cluster (-1 without an embedding)
+    cluster_rank = Column(Integer)  # Uncertainty rank within the cluster
+    priority = Column(Float)  # Combined uncertainty + diversity score
+
+    status = Column(String(20), default="pending")  # pending/annotated
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    post = relationship("RedditPost")
+
+
+class InteractionEdge(Base):
+    """Model for the materialized user interaction graph (daily edge weights)"""
+
+    __tablename__ = "interaction_edges"
+    __table_args__ = (
+        UniqueConstraint(
+            "source_author",
+            "target_author",
+            "subreddit",
+            "interaction_date",
+            name="uq_interaction_edges_key",
+        ),
+        Index("ix_interaction_edges_date", "interaction_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    source_author = Column(String(100), nullable=False)  # Commenter
+    target_author = Column(String(100), nullable=False)  # Post/parent author
+    subreddit = Column(String(100), nullable=False)  # Subreddit of the post
+    interaction_date = Column(Date, nullable=False)  # Day of the comment
+    weight = Column(Integer, default=0)  # Number of interactions that day
+
+
+class InteractionUserActivity(Base):
+    """Model for the node set of the materialized interaction graph"""
+
+    __tablename__ = "interaction_user_activity"
+    __table_args__ = (
+        UniqueConstraint(
+            "author",
+            "subreddit",
+            "activity_date",
+            name="uq_interaction_user_activity_key",
+        ),
+        Index("ix_interaction_user_activity_date", "activity_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    author = Column(String(100), nullable=False)
+    subreddit = Column(String(100), nullable=False)
+    activity_date = Column(Date, nullable=False)  # Day of the post/comment
+    activity_count = Column(Integer, default=0)  # Posts + comments that day
+
+
+class InteractionPendingReply(Base):
+    """Model for replies folded into the interaction graph before their parent"""
+
+    __tablename__ = "interaction_pending_replies"
+
+    id = Column(Integer, primary_key=True)
+    comment_row_id = Column(Integer, unique=True, nullable=False)  # Reply's id
+    parent_comment_id = Column(String(50), nullable=False, index=True)
+
+
+class InteractionGraphState(Base):
+    """Model for the ingest watermarks of the materialized interaction graph"""
+
+    __tablename__ = "interaction_graph_state"
+
+    id = Column(Integer, primary_key=True)
+    post_watermark = Column(Integer, default=0)  # Last folded-in RedditPost.id
+    comment_watermark = Column(Integer, default=0)  # Last RedditComment.id
+    version = Column(Integer, default=0)  # Bumped whenever the graph changes
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PostCascade(Base):
+    """Model for reply-tree cascade statistics of a post"""
+
+    __tablename__ = "post_cascades"
+    __table_args__ = (
+        # Spreading threads are ranked by virality or size
+        Index("ix_post_cascades_virality", "structural_virality"),
+        Index("ix_post_cascades_size", "size"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    post_id = Column(
+        String(50), ForeignKey("reddit_posts.post_id"), unique=True, nullable=False
+    )
+
+    # Reply-tree shape (the post is the root at depth 0)
+    size = Column(Integer)  # Number of comments
+    depth = Column(Integer)  # Deepest reply level
+    max_breadth = Column(Integer)  # Most comments on a single level
+    structural_virality = Column(Float)  # Mean distance between tree nodes
+    unique_participants = Column(Integer)  # Distinct comment authors
+
+    # Propagation speed, hours from the post (NULL if never reached)
+    time_to_first_reply_hours = Column(Float)
+    time_to_10_replies_hours = Column(Float)
+    time_to_100_replies_hours = Column(Float)
+
+    last_comment_row_id = Column(Integer)  # Newest RedditComment.id included
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    post = relationship("RedditPost")
+
+
+class AnalyticsDailyRollup(Base):
+    """Model for dashboard counts per subreddit, language and day"""
+
+    __tablename__ = "analytics_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "subreddit",
+            "language",
+            "rollup_date",
+            name="uq_analytics_daily_rollups_key",
+        ),
+        Index("ix_analytics_daily_rollups_date", "rollup_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    subreddit = Column(String(100), nullable=False)  # Subreddit of the post
+    language = Column(String(10), nullable=False)  # Post/comment language
+    rollup_date = Column(Date, nullable=False)  # Day the post/comment was created
+
+    post_count = Column(Integer, default=0)
+    comment_count = Column(Integer, default=0)
+    health_keyword_posts = Column(Integer, default=0)  # contains_health_keywords
+    keyword_posts = Column(Integer, default=0)  # Posts matching a research keyword
+    newcomer_posts = Column(Integer, default=0)
+    translated_posts = Column(Integer, default=0)  # Posts with a translation
+    score_sum = Column(Integer, default=0)  # Post scores
+    comment_score_sum = Column(Integer, default=0)
+
+    # Classifier outputs (scored = rows the model was available for)
+    health_scored_posts = Column(Integer, default=0)
+    health_positive_posts = Column(Integer, default=0)
+    health_scored_comments = Column(Integer, default=0)
+    health_positive_comments = Column(Integer, default=0)
+    lgbtq_scored_posts = Column(Integer, default=0)
+    lgbtq_positive_posts = Column(Integer, default=0)
+
+
+class AnalyticsKeywordRollup(Base):
+    """Model for research keyword hits per subreddit, language and day"""
+
+    __tablename__ = "analytics_keyword_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "subreddit",
+            "language",
+            "rollup_date",
+            "keyword",
+            name="uq_analytics_keyword_rollups_key",
+        ),
+        Index("ix_analytics_keyword_rollups_date", "rollup_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    subreddit = Column(String(100), nullable=False)
+    language = Column(String(10), nullable=False)
+    rollup_date = Column(Date, nullable=False)
+    keyword = Column(String(500), nullable=False)  # Keyword or "a, b" combination
+    keyword_set_size = Column(Integer, default=1)  # 1 for single keywords
+    post_hits = Column(Integer, default=0)
+    newcomer_hits = Column(Integer, default=0)
+
+
+class AnalyticsHourRollup(Base):
+    """Model for post counts per subreddit, language and hour of day"""
+
+    __tablename__ = "analytics_hour_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "subreddit", "language", "hour", name="uq_analytics_hour_rollups_key"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    subreddit = Column(String(100), nullable=False)
+    language = Column(String(10), nullable=False)
+    hour = Column(Integer, nullable=False)  # 0-23
+    post_count = Column(Integer, default=0)
+
+
+class AnalyticsAuthor(Base):
+    """Model for the distinct post and comment authors seen by the rollups"""
+
+    __tablename__ = "analytics_authors"
+
+    id = Column(Integer, primary_key=True)
+    author = Column(String(100), unique=True, nullable=False)
+
+
+class AnalyticsRollupState(Base):
+    """Model for the ingest watermarks of the analytics rollups"""
+
+    __tablename__ = "analytics_rollup_state"
+
+    id = Column(Integer, primary_key=True)
+    post_watermark = Column(Integer, default=0)  # Last rolled-up RedditPost.id
+    comment_watermark = Column(Integer, default=0)  # Last RedditComment.id
+    version = Column(Integer, default=0)  # Bumped whenever the rollups change
+    earliest_post = Column(DateTime)
+    latest_post = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class KeywordTerm(Base):
+    """Model for the vocabulary of the keyword inverted index"""
+
+    __tablename__ = "keyword_terms"
+
+    id = Column(Integer, primary_key=True)
+    term = Column(String(100), unique=True, nullable=False)  # Lower-cased
+    source = Column(String(20), default="config")  # config or search
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class KeywordPosting(Base):
+    """Model for keyword occurrences in one post or comment"""
+
+    __tablename__ = "keyword_postings"
+    __table_args__ = (
+        Index("ix_keyword_postings_term_doc", "term_id", "doc_type", "doc_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    term_id = Column(Integer, nullable=False)  # KeywordTerm.id
+    doc_type = Column(String(10), nullable=False)  # post or comment
+    doc_id = Column(Integer, nullable=False)  # RedditPost.id or RedditComment.id
+    offsets = Column(Text)  # Comma-separated offsets in the lower-cased text
+
+
+class KeywordIndexState(Base):
+    """Model for the ingest watermarks of the keyword inverted index"""
+
+    __tablename__ = "keyword_index_state"
+
+    id = Column(Integer, primary_key=True)
+    post_watermark = Column(Integer, default=0)  # Last indexed RedditPost.id
+    comment_watermark = Column(Integer, default=0)  # Last RedditComment.id
+    version = Column(Integer, default=0)  # Bumped whenever postings change
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SearchDocument(Base):
+    """Model for a post or comment in the full-text search index"""
+
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        UniqueConstraint("doc_type", "doc_id", name="uq_search_documents_doc"),
+        Index("ix_search_documents_created", "created_utc"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    doc_type = Column(String(10), nullable=False)  # post or comment
+    doc_id = Column(Integer, nullable=False)  # RedditPost.id or RedditComment.id
+    post_id = Column(String(20))  # Reddit post ID (of the parent for comments)
+    subreddit = Column(String(100))
+    language = Column(String(10))
+    created_utc = Column(DateTime)
+    score = Column(Integer)
+    contains_health_keywords = Column(Boolean, default=False)  # Of the post
+    is_newcomer_related = Column(Boolean, default=False)  # Of the post
+    title = Column(Text)  # Post title (empty for comments)
+    body = Column(Text)  # Post selftext or comment body
+    translation = Column(Text)  # English translation, if any
+
+
+class SearchIndexState(Base):
+    """Model for the ingest watermarks of the full-text search index"""
+
+    __tablename__ = "search_index_state"
+
+    id = Column(Integer, primary_key=True)
+    post_watermark = Column(Integer, default=0)  # Last indexed RedditPost.id
+    comment_watermark = Column(Integer, default=0)  # Last RedditComment.id
+    version = Column(Integer, default=0)  # Bumped whenever documents change
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class WordFrequency(Base):
+    """Model for corpus-wide term frequencies (word cloud rollup)"""
+
+    __tablename__ = "word_frequencies"
+    __table_args__ = (Index("ix_word_frequencies_count", "count"),)
+
+    id = Column(Integer, primary_key=True)
+    term = Column(String(100), unique=True, nullable=False)  # Lower-cased token
+    count = Column(Integer, default=0)  # Occurrences in posts and comments
+    doc_count = Column(Integer, default=0)  # Posts and comments containing it
+
+
+class WordFrequencyState(Base):
+    """Model for the ingest watermarks of the word frequency rollup"""
+
+    __tablename__ = "word_frequency_state"
+
+    id = Column(Integer, primary_key=True)
+    post_watermark = Column(Integer, default=0)  # Last counted RedditPost.id
+    comment_watermark = Column(Integer, default=0)  # Last RedditComment.id
+    version = Column(Integer, default=0)  # Bumped whenever counts change
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DataVersion(Base):
+    """Model for the corpus data version, bumped on every ingest write"""
+
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 def create_database(database_url: str):
     """Create database and tables"""
     engine = create_engine(database_url)
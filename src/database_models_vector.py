@@ -203,7 +203,12 @@ class NetworkMetrics(Base):
 
     # Misinformation-specific metrics
     misinformation_centrality_correlation = Column(Float)
-    information_flow_speed = Column(Float)
+    information_flow_speed = Column(Float)  # 1 / median hours to first reply
+
+    # Sliding-window time series (NULL for one-off snapshots)
+    scope = Column(String(100))  # "all" or a subreddit name
+    window_start = Column(DateTime)
+    window_end = Column(DateTime)
 
     metrics_json = Column(Text)
 
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Embedding-based content classifier
+Trains a linear or MLP head directly on the sentence embeddings stored in
+RedditPost.combined_embedding, so posts are never re-tokenized with TF-IDF
+"""
+
+import json
+import pickle
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.data_persistence import DataPersistenceManager
+from src.database_models import RedditPost
+from src.model_registry import ModelRegistry
+
+# Weak-label column produced by each classifier's rule-based labeller
+LABEL_COLUMNS = {"health": "is_health_related", "lgbtq": "is_lgbtq_related"}
+
+
+def parse_embedding(value: Any) -> Optional[np.ndarray]:
+    """Parse a stored embedding (pgvector text, JSON list or array) to float32"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def build_head(head: str = "linear"):
+    """Create an untrained linear or MLP classifier head"""
+    if head == "mlp":
+        from sklearn.neural_network import MLPClassifier
+
+        return MLPClassifier(
+            hidden_layer_sizes=(128,), early_stopping=True, random_state=42
+        )
+
+    from sklearn.linear_model import LogisticRegression
+
+    return LogisticRegression(random_state=42, class_weight="balanced", max_iter=1000)
+
+
+class EmbeddingClassifier:
+    """
+    Classifier head over stored post embeddings
+
+    The head only sees embedding vectors, so it works for any language the
+    embedding model covers without translating posts first. Labels come from
+    the same rule-based labellers as the TF-IDF classifiers, which keeps the
+    two approaches directly comparable.
+    """
+
+    def __init__(self, target: str = "health", head: str = "linear"):
+        if target not in LABEL_COLUMNS:
+            raise ValueError(f"Unknown target: {target}")
+        if head not in ("linear", "mlp"):
+            raise ValueError(f"Unknown head: {head}")
+
+        self.db_manager = DataPersistenceManager()
+        self.target = target
+        self.head = head
+        self.label_column = LABEL_COLUMNS[target]
+        self.model = None
+        self.embedding_dim = None
+        self.training_results = None
+
+    def iter_embedding_batches(
+        self,
+        post_ids: Optional[List[str]] = None,
+        batch_size: int = 1000,
+        include_text: bool = False,
+    ) -> Iterator[Tuple[List[str], np.ndarray, List[str]]]:
+        """
+        Stream (post_ids, embedding matrix, texts) batches from the database
+
+        Only the columns needed for scoring are selected and rows are fetched
+        in chunks, so the full corpus is never materialized at once.
+        """
+        columns = [RedditPost.post_id, RedditPost.combined_embedding]
+        if include_text:
+            columns += [RedditPost.title, RedditPost.selftext]
+
+        with self.db_manager.get_session() as session:
+            query = session.query(*columns).filter(
+                RedditPost.combined_embedding.isnot(None)
+            )
+            if post_ids is not None:
+                query = query.filter(RedditPost.post_id.in_(post_ids))
+
+            ids, vectors, texts = [], [], []
+            for row in query.yield_per(batch_size):
+                vector = parse_embedding(row.combined_embedding)
+                if vector is None:
+                    continue
+                if self.embedding_dim is None:
+                    self.embedding_dim = vector.shape[0]
+                if vector.shape[0] != self.embedding_dim:
+                    continue
+
+                ids.append(row.post_id)
+                vectors.append(vector)
+                if include_text:
+                    texts.append(f"{row.title} {row.selftext or ''}")
+
+                if len(ids) >= batch_size:
+                    yield ids, np.vstack(vectors), texts
+                    ids, vectors, texts = [], [], []
+
+            if ids:
+                yield ids, np.vstack(vectors), texts
+
+    def load_training_data(self) -> Tuple[pd.DataFrame, np.ndarray]:
+        """Load post texts and embeddings, labelled with the rule-based labeller"""
+        logger.info("Loading stored post embeddings for training...")
+
+        ids, matrices, texts = [], [], []
+        for batch_ids, batch_vectors, batch_texts in self.iter_embedding_batches(
+            include_text=True
+        ):
+            ids.extend(batch_ids)
+            matrices.append(batch_vectors)
+            texts.extend(batch_texts)
+
+        if not ids:
+            empty = pd.DataFrame(columns=["id", "text", self.label_column])
+            return empty, np.empty((0, 0))
+
+        df = pd.DataFrame({"id": ids, "text": texts})
+        df = self._create_labels(df)
+
+        logger.info(f"Loaded {len(df)} posts with embeddings")
+        return df, np.vstack(matrices)
+
+    def _create_labels(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the matching TF-IDF classifier's weak labelling rules"""
+        if self.target == "health":
+            from src.health_content_classifier import HealthContentClassifier
+
+            return HealthContentClassifier().create_health_labels(df)
+
+        from src.lgbtq_content_classifier import LGBTQContentClassifier
+
+        return LGBTQContentClassifier().create_lgbtq_labels(df)
+
+    def train_model(self, embeddings: np.ndarray, labels) -> Dict[str, Any]:
+        """Train the head on embedding vectors"""
+        from sklearn.metrics import classification_report
+        from sklearn.model_selection import train_test_split
+
+        logger.info(f"Training {self.head} {self.target} head on embeddings...")
+
+        labels = np.asarray(labels)
+        if len(np.unique(labels)) < 2:
+            raise ValueError("Need both positive and negative examples for training")
+
+        X_train, X_test, y_train, y_test = train_test_split(
+            embeddings, labels, test_size=0.2, random_state=42, stratify=labels
+        )
+
+        self.model = build_head(self.head)
+        self.model.fit(X_train, y_train)
+        self.embedding_dim = embeddings.shape[1]
+
+        y_pred = self.model.predict(X_test)
+        results = {
+            "train_accuracy": self.model.score(X_train, y_train),
+            "test_accuracy": self.model.score(X_test, y_test),
+            "classification_report": classification_report(
+                y_test, y_pred, output_dict=True
+            ),
+            "training_samples": len(X_train),
+            "test_samples": len(X_test),
+            "embedding_dim": self.embedding_dim,
+        }
+
+        self.training_results = results
+        logger.info(
+            f"Training completed - Test Accuracy: {results['test_accuracy']:.3f}"
+        )
+        return results
+
+    def predict_embeddings(self, embeddings: np.ndarray) -> np.ndarray:
+        """Positive-class probability for a matrix of embeddings"""
+        if self.model is None:
+            raise ValueError("Model not trained yet. Call train_model() first.")
+
+        return self.model.predict_proba(embeddings)[:, 1]
+
+    def predict_posts(
+        self, post_ids: Optional[List[str]] = None, batch_size: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Score posts in batches straight from their stored embeddings"""
+        results = []
+        for ids, vectors, _ in self.iter_embedding_batches(post_ids, batch_size):
+            probabilities = self.predict_embeddings(vectors)
+            for post_id, probability in zip(ids, probabilities):
+                results.append(
+                    {
+                        "post_id": post_id,
+                        self.label_column: bool(probability > 0.5),
+                        "confidence": float(max(probability, 1 - probability)),
+                        f"{self.target}_probability": float(probability),
+                    }
+                )
+
+        return results
+
+    def save_model(self, filepath: Optional[str] = None):
+        """Save the trained head"""
+        filepath = filepath or f"models/{self.target}_embedding_{self.head}.pkl"
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+        model_data = {
+            "model": self.model,
+            "target": self.target,
+            "head": self.head,
+            "embedding_dim": self.embedding_dim,
+            "trained_at": datetime.now().isoformat(),
+        }
+
+        with open(filepath, "wb") as f:
+            pickle.dump(model_data, f)
+
+        if self.training_results:
+            self._register_metrics(filepath, model_data["trained_at"])
+
+        logger.info(f"Embedding classifier saved to {filepath}")
+
+    def _register_metrics(self, filepath: str, trained_at: str):
+        """Record the latest training metrics in the model registry"""
+        results = self.training_results
+        report = results["classification_report"]
+
+        ModelRegistry(str(Path(filepath).parent / "registry.json")).record(
+            Path(filepath).stem,
+            {
+                "model_path": filepath,
+                "trained_at": trained_at,
+                "training_accuracy": float(results["train_accuracy"]),
+                "test_accuracy": float(results["test_accuracy"]),
+                "macro_f1": float(report["macro avg"]["f1-score"]),
+                "feature_count": int(results["embedding_dim"]),
+                "training_samples": int(results["training_samples"]),
+                "test_samples": int(results["test_samples"]),
+                "params": {"head": self.head},
+            },
+        )
+
+    def load_model(self, filepath: Optional[str] = None):
+        """Load a trained head"""
+        filepath = filepath or f"models/{self.target}_embedding_{self.head}.pkl"
+        with open(filepath, "rb") as f:
+            model_data = pickle.load(f)
+
+        self.model = model_data["model"]
+        self.embedding_dim = model_data["embedding_dim"]
+
+        logger.info(f"Embedding classifier loaded from {filepath}")
+
+
+def _ms_per_1k(seconds: float, n_docs: int) -> float:
+    return seconds / max(n_docs, 1) * 1e6
+
+
+def benchmark_embedding_vs_tfidf(
+    target: str = "health", heads: Tuple[str, ...] = ("linear", "mlp")
+) -> Dict[str, Any]:
+    """
+    Compare accuracy and latency of embedding heads against the TF-IDF pipeline
+
+    Both approaches are trained and evaluated on the same posts, labels and
+    train/test split. TF-IDF latency includes vectorizing raw text; embedding
+    latency is reported separately for parsing stored vectors and for the head.
+    """
+    from sklearn.model_selection import train_test_split
+
+    from src.model_training import build_text_pipeline
+
+    classifier = EmbeddingClassifier(target=target, head=heads[0])
+
+    df, embeddings = classifier.load_training_data()
+    if df.empty:
+        logger.error("No posts with stored embeddings. Generate embeddings first.")
+        return {}
+
+    # Cost of streaming and parsing the stored vectors, excluding labelling
+    start = time.perf_counter()
+    for _ in classifier.iter_embedding_batches():
+        pass
+    load_seconds = time.perf_counter() - start
+
+    labels = df[classifier.label_column].to_numpy()
+    train_idx, test_idx = train_test_split(
+        np.arange(len(df)), test_size=0.2, random_state=42, stratify=labels
+    )
+    texts = df["text"].to_numpy()
+    n_test = len(test_idx)
+
+    report = {
+        "target": target,
+        "posts": len(df),
+        "test_samples": n_test,
+        "embedding_load_ms_per_1k_docs": _ms_per_1k(load_seconds, len(df)),
+        "models": {},
+    }
+
+    # TF-IDF baseline (the classifiers' default configuration)
+    pipeline = build_text_pipeline()
+    start = time.perf_counter()
+    pipeline.fit(texts[train_idx], labels[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = pipeline.predict(texts[test_idx])
+    predict_seconds = time.perf_counter() - start
+
+    report["models"]["tfidf"] = {
+        "test_accuracy": float(np.mean(predictions == labels[test_idx])),
+        "fit_seconds": fit_seconds,
+        "inference_ms_per_1k_docs": _ms_per_1k(predict_seconds, n_test),
+    }
+
+    for head in heads:
+        model = build_head(head)
+
+        start = time.perf_counter()
+        model.fit(embeddings[train_idx], labels[train_idx])
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        predictions = model.predict(embeddings[test_idx])
+        predict_seconds = time.perf_counter() - start
+
+        report["models"][f"embedding_{head}"] = {
+            "test_accuracy": float(np.mean(predictions == labels[test_idx])),
+            "fit_seconds": fit_seconds,
+            "inference_ms_per_1k_docs": _ms_per_1k(predict_seconds, n_test),
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target", choices=sorted(LABEL_COLUMNS), default="health")
+    parser.add_argument("--head", choices=["linear", "mlp"], default="linear")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Compare embedding heads with the TF-IDF pipeline instead of training",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        results = benchmark_embedding_vs_tfidf(args.target)
+        if results:
+            print(f"\n⚖️  Embedding vs TF-IDF benchmark ({results['posts']} posts)")
+            print(
+                f"Stored vector load: {results['embedding_load_ms_per_1k_docs']:.1f}ms/1k docs"
+            )
+            for name, stats in results["models"].items():
+                print(
+                    f"  {name:18s} accuracy {stats['test_accuracy']:.3f} | "
+                    f"fit {stats['fit_seconds']:.2f}s | "
+                    f"inference {stats['inference_ms_per_1k_docs']:.2f}ms/1k docs"
+                )
+    else:
+        classifier = EmbeddingClassifier(target=args.target, head=args.head)
+        df, embeddings = classifier.load_training_data()
+        if df.empty:
+            logger.error("No posts with stored embeddings. Generate embeddings first.")
+        else:
+            results = classifier.train_model(embeddings, df[classifier.label_column])
+            classifier.save_model()
+            print(f"\n🎯 Test Accuracy: {results['test_accuracy']:.3f}")
@@ -0,0 +1,677 @@
+"""
+Full-text search over posts, comments and their translations
+Keeps one search document per post or comment, maintained from
+RedditPost/RedditComment.id watermarks at ingest, indexed with a weighted
+tsvector + GIN index on PostgreSQL or an FTS5 table on SQLite, and answers
+ranked, paginated, highlighted queries with phrase and boolean syntax
+"""
+
+import math
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import DateTime, and_, bindparam, func, inspect, or_, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from config.settings import Config
+from src.data_persistence import DataPersistenceManager, surviving_max_ids
+from src.database_models import (
+    RedditComment,
+    RedditPost,
+    SearchDocument,
+    SearchIndexState,
+)
+
+# PostgreSQL text search configuration per detected language ("simple" for
+# languages without a stemmer, e.g. Tagalog, Chinese, Punjabi)
+LANGUAGE_CONFIGS = {
+    "en": "english",
+    "es": "spanish",
+    "fr": "french",
+    "pt": "portuguese",
+}
+
+HIGHLIGHT_START = "**"
+HIGHLIGHT_END = "**"
+
+RESULT_COLUMNS = (
+    "d.id, d.doc_type, d.doc_id, d.post_id, d.subreddit, d.language, d.title, "
+    "d.created_utc, d.score, d.contains_health_keywords, d.is_newcomer_related"
+)
+
+
+def language_config_sql(column: str) -> str:
+    """SQL expression picking the regconfig of a row from its language"""
+    cases = " ".join(
+        f"WHEN '{language}' THEN '{config}'::regconfig"
+        for language, config in LANGUAGE_CONFIGS.items()
+    )
+    return f"CASE {column} {cases} ELSE 'simple'::regconfig END"
+
+
+def parse_query(query: str) -> Tuple[List[List[str]], List[str]]:
+    """
+    Split web-style search syntax into OR groups of required phrases and a
+    list of excluded phrases
+
+    ``"viral load" prep OR pep -vaccine`` ->
+    ([["viral load", "prep"], ["pep"]], ["vaccine"])
+    """
+    groups: List[List[str]] = [[]]
+    excluded: List[str] = []
+    for token in re.findall(r'-?"[^"]*"?|\S+', query):
+        if token == "OR":
+            if groups[-1]:
+                groups.append([])
+            continue
+        negated = token.startswith("-") and len(token) > 1
+        phrase = token.lstrip("-").strip('"').strip()
+        if not re.search(r"\w", phrase):
+            continue
+        (excluded if negated else groups[-1]).append(phrase)
+    return [group for group in groups if group], excluded
+
+
+def fts5_query(query: str) -> Optional[str]:
+    """FTS5 MATCH expression of a web-style query (None if nothing to match)"""
+    groups, excluded = parse_query(query)
+    if not groups:
+        return None
+
+    def quote(phrase: str) -> str:
+        return '"' + phrase.replace('"', '""') + '"'
+
+    expression = " OR ".join(
+        "(" + " AND ".join(quote(phrase) for phrase in group) + ")" for group in groups
+    )
+    for phrase in excluded:
+        expression = f"({expression}) NOT {quote(phrase)}"
+    return expression
+
+
+class FullTextSearch:
+    """
+    Ranked full-text search of posts and comments
+
+    Titles weigh more than bodies, and bodies more than English
+    translations. The backend follows the database: PostgreSQL tsvector/GIN
+    with per-language configurations, SQLite FTS5 (unicode61 tokenizer,
+    diacritics folded), or a LIKE scan where neither is available.
+
+    Documents copy columns of their rows. They are dropped with posts
+    removed by cleanup_old_data and re-indexed when posts are re-scraped;
+    other in-place edits need ``search-index --full-refresh``.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        batch_size: int = 5000,
+        rank_limit: Optional[int] = None,
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.batch_size = batch_size
+        self.rank_limit = Config.SEARCH_RANK_LIMIT if rank_limit is None else rank_limit
+        self.backend = self.ensure_schema()
+
+    def ensure_schema(self) -> str:
+        """Create the backend-specific search structures; returns the backend"""
+        engine = self.db_manager.engine
+        if engine.dialect.name == "postgresql":
+            vector = (
+                f"setweight(to_tsvector({language_config_sql('language')}, "
+                "coalesce(title, '')), 'A') || "
+                f"setweight(to_tsvector({language_config_sql('language')}, "
+                "coalesce(body, '')), 'B') || "
+                "setweight(to_tsvector('english'::regconfig, "
+                "coalesce(translation, '')), 'C')"
+            )
+            existing = {
+                c["name"] for c in inspect(engine).get_columns("search_documents")
+            }
+            if "search_vector" in existing:
+                return "postgresql"
+
+            with engine.begin() as connection:
+                connection.execute(
+                    text(
+                        "ALTER TABLE search_documents ADD COLUMN "
+                        f"search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED"
+                    )
+                )
+                connection.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS ix_search_documents_vector "
+                        "ON search_documents USING GIN (search_vector)"
+                    )
+                )
+            logger.info("Added search_vector and its GIN index to search_documents")
+            return "postgresql"
+
+        if engine.dialect.name == "sqlite":
+            try:
+                with engine.begin() as connection:
+                    connection.execute(
+                        text(
+                            "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+                            "title, body, translation, content='search_documents', "
+                            "content_rowid='id', "
+                            "tokenize='unicode61 remove_diacritics 2')"
+                        )
+                    )
+                return "fts5"
+            except OperationalError as e:
+                logger.warning(f"SQLite FTS5 unavailable, searching with LIKE: {e}")
+
+        return "like"
+
+    def _state(self, session: Session) -> SearchIndexState:
+        state = session.query(SearchIndexState).with_for_update().first()
+        if state is None:
+            state = SearchIndexState(post_watermark=0, comment_watermark=0, version=0)
+            session.add(state)
+            session.flush()
+        return state
+
+    def version(self) -> int:
+        """Current index version (0 before the first update)"""
+        with self.db_manager.get_session() as session:
+            return session.query(SearchIndexState.version).scalar() or 0
+
+    def update(self) -> int:
+        """
+        Add posts and comments ingested since the last update to the index
+
+        Returns:
+            Number of documents indexed
+        """
+        with self.db_manager.get_session() as session:
+            try:
+                state = self._state(session)
+                max_post = session.query(func.max(RedditPost.id)).scalar() or 0
+                max_comment = session.query(func.max(RedditComment.id)).scalar() or 0
+                if (
+                    max_post <= state.post_watermark
+                    and max_comment <= state.comment_watermark
+                ):
+                    session.rollback()
+                    return 0
+
+                last_document = session.query(func.max(SearchDocument.id)).scalar()
+                indexed = 0
+                for start in range(state.post_watermark, max_post, self.batch_size):
+                    indexed += self._add_posts(
+                        session,
+                        RedditPost.id > start,
+                        RedditPost.id <= min(start + self.batch_size, max_post),
+                    )
+                for start in range(
+                    state.comment_watermark, max_comment, self.batch_size
+                ):
+                    indexed += self._add_comments(
+                        session,
+                        RedditComment.id > start,
+                        RedditComment.id <= min(start + self.batch_size, max_comment),
+                    )
+                self._index_fts(session, last_document)
+
+                state.post_watermark = max(max_post, state.post_watermark)
+                state.comment_watermark = max(max_comment, state.comment_watermark)
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+
+                logger.info(f"Search index v{state.version}: {indexed} new documents")
+                return indexed
+
+            except Exception:
+                session.rollback()
+                raise
+
+    def rebuild(self) -> int:
+        """Drop the search documents and index all posts and comments again"""
+        with self.db_manager.get_session() as session:
+            if self.backend == "fts5":
+                session.execute(
+                    text("INSERT INTO search_fts(search_fts) VALUES('delete-all')")
+                )
+            session.query(SearchDocument).delete()
+            session.query(SearchIndexState).delete()
+            session.commit()
+
+        return self.update()
+
+    def remove_posts(self, session: Session, posts) -> int:
+        """
+        Drop the documents of posts about to be deleted and of their comments
+
+        ``posts`` is a condition on RedditPost selecting the posts. Call this
+        in the deleting transaction, before the delete. The watermarks drop
+        to the highest surviving ids, as SQLite reuses deleted trailing ids.
+
+        Returns:
+            Number of documents removed
+        """
+        removed = self._delete_documents(
+            session,
+            or_(
+                and_(
+                    SearchDocument.doc_type == "post",
+                    SearchDocument.doc_id.in_(select(RedditPost.id).where(posts)),
+                ),
+                and_(
+                    SearchDocument.doc_type == "comment",
+                    SearchDocument.post_id.in_(select(RedditPost.post_id).where(posts)),
+                ),
+            ),
+        )
+        state = self._state(session)
+        max_post, max_comment = surviving_max_ids(session, posts)
+        state.post_watermark = min(state.post_watermark, max_post)
+        state.comment_watermark = min(state.comment_watermark, max_comment)
+        if removed:
+            state.version = (state.version or 0) + 1
+            state.updated_at = datetime.utcnow()
+        return removed
+
+    def prepare_post_updates(self, post_ids: List[str]) -> List[str]:
+        """Indexed posts among those about to be updated in place (re-scraped)"""
+        with self.db_manager.get_session() as session:
+            return [
+                post_id
+                for start in range(0, len(post_ids), self.batch_size)
+                for (post_id,) in session.query(SearchDocument.post_id).filter(
+                    SearchDocument.doc_type == "post",
+                    SearchDocument.post_id.in_(
+                        post_ids[start : start + self.batch_size]
+                    ),
+                )
+            ]
+
+    def apply_post_updates(self, post_ids: List[str]) -> int:
+        """
+        Index updated posts (``prepare_post_updates`` ids) and their comments
+        again, so text, score, language and keyword flags are current
+
+        Returns:
+            Number of documents indexed
+        """
+        if not post_ids:
+            return 0
+
+        with self.db_manager.get_session() as session:
+            try:
+                state = self._state(session)
+                indexed = 0
+                for start in range(0, len(post_ids), self.batch_size):
+                    batch = post_ids[start : start + self.batch_size]
+                    # Comment documents carry their post's id too
+                    self._delete_documents(session, SearchDocument.post_id.in_(batch))
+                    last_document = session.query(func.max(SearchDocument.id)).scalar()
+                    indexed += self._add_posts(
+                        session,
+                        RedditPost.post_id.in_(batch),
+                        RedditPost.id <= state.post_watermark,
+                    )
+                    indexed += self._add_comments(
+                        session,
+                        RedditComment.post_id.in_(batch),
+                        RedditComment.id <= state.comment_watermark,
+                    )
+                    self._index_fts(session, last_document)
+
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+
+                logger.info(
+                    f"Search index v{state.version}: re-indexed {indexed} documents"
+                )
+                return indexed
+
+            except Exception:
+                session.rollback()
+                raise
+
+    def _delete_documents(self, session: Session, condition) -> int:
+        """Delete the search documents matching ``condition``"""
+        ids = [
+            doc_id for (doc_id,) in session.query(SearchDocument.id).filter(condition)
+        ]
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start : start + self.batch_size]
+            if self.backend == "fts5":
+                # External-content FTS5 rows are deleted with their indexed values
+                session.execute(
+                    text(
+                        "INSERT INTO search_fts(search_fts, rowid, title, body, "
+                        "translation) SELECT 'delete', id, title, body, translation "
+                        "FROM search_documents WHERE id IN :ids"
+                    ).bindparams(bindparam("ids", expanding=True)),
+                    {"ids": batch},
+                )
+            session.query(SearchDocument).filter(SearchDocument.id.in_(batch)).delete(
+                synchronize_session=False
+            )
+        return len(ids)
+
+    def _index_fts(self, session: Session, last_document: Optional[int]) -> None:
+        """Add search documents with id > ``last_document`` to the FTS5 table"""
+        if self.backend == "fts5":
+            session.execute(
+                text(
+                    "INSERT INTO search_fts(rowid, title, body, translation) "
+                    "SELECT id, title, body, translation FROM search_documents "
+                    "WHERE id > :last_document"
+                ),
+                {"last_document": last_document or 0},
+            )
+
+    def _add_posts(self, session: Session, *conditions) -> int:
+        """Index the posts matching ``conditions``"""
+        rows = [
+            {
+                "doc_type": "post",
+                "doc_id": post.id,
+                "post_id": post.post_id,
+                "subreddit": post.subreddit,
+                "language": post.language,
+                "created_utc": post.created_utc,
+                "score": post.score,
+                "contains_health_keywords": bool(post.contains_health_keywords),
+                "is_newcomer_related": bool(post.is_newcomer_related),
+                "title": post.title or "",
+                "body": post.selftext or "",
+                "translation": post.english_translation,
+            }
+            for post in session.query(
+                RedditPost.id,
+                RedditPost.post_id,
+                RedditPost.subreddit,
+                RedditPost.language,
+                RedditPost.created_utc,
+                RedditPost.score,
+                RedditPost.contains_health_keywords,
+                RedditPost.is_newcomer_related,
+                RedditPost.title,
+                RedditPost.selftext,
+                RedditPost.english_translation,
+            ).filter(*conditions)
+        ]
+        if rows:
+            session.execute(SearchDocument.__table__.insert(), rows)
+        return len(rows)
+
+    def _add_comments(self, session: Session, *conditions) -> int:
+        """Index the comments matching ``conditions``"""
+        rows = [
+            {
+                "doc_type": "comment",
+                "doc_id": comment.id,
+                "post_id": comment.post_id,
+                "subreddit": comment.subreddit,
+                "language": comment.language,
+                "created_utc": comment.created_utc,
+                "score": comment.score,
+                "contains_health_keywords": bool(comment.contains_health_keywords),
+                "is_newcomer_related": bool(comment.is_newcomer_related),
+                "title": "",
+                "body": comment.body or "",
+                "translation": comment.english_translation,
+            }
+            for comment in session.query(
+                RedditComment.id,
+                RedditComment.post_id,
+                RedditPost.subreddit,
+                RedditComment.language,
+                RedditComment.created_utc,
+                RedditComment.score,
+                RedditPost.contains_health_keywords,
+                RedditPost.is_newcomer_related,
+                RedditComment.body,
+                RedditComment.english_translation,
+            )
+            .outerjoin(RedditPost, RedditPost.post_id == RedditComment.post_id)
+            .filter(*conditions)
+        ]
+        if rows:
+            session.execute(SearchDocument.__table__.insert(), rows)
+        return len(rows)
+
+    def search(
+        self,
+        query: str = "",
+        subreddit: Optional[str] = None,
+        language: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        has_keywords: bool = False,
+        min_score: int = 0,
+        doc_types: Tuple[str, ...] = ("post", "comment"),
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        One page of documents matching ``query`` and the filters, best first
+
+        ``query`` takes web search syntax: "quoted phrases", OR between
+        alternatives and -term to exclude. Without a query, matching
+        documents are listed newest first. Queries matching more than
+        ``rank_limit`` documents are listed newest first too, since scoring
+        every match costs seconds on the full corpus. ``has_keywords`` refers
+        to the post (for comments, the post they reply to).
+
+        Returns:
+            {"total", "page", "page_size", "pages", "ranked", "results":
+            [document dicts with "title_highlight" and "snippet" marked up in
+            **bold**]}
+        """
+        page = max(int(page), 1)
+        clauses, params, bind = self._filters(
+            subreddit, language, date_from, date_to, has_keywords, min_score, doc_types
+        )
+        params.update(limit=page_size, offset=(page - 1) * page_size)
+
+        query = (query or "").strip()
+        ranked = bool(query) and self.backend != "like"
+        if not query:
+            total, rows = self._list(clauses, params, bind)
+        elif self.backend == "postgresql":
+            total, rows = self._search_postgresql(
+                query, language, clauses, params, bind
+            )
+        elif self.backend == "fts5":
+            total, rows = self._search_fts5(query, clauses, params, bind)
+        else:
+            total, rows = self._search_like(query, clauses, params, bind)
+
+        return {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": math.ceil(total / page_size) if total else 0,
+            "ranked": ranked and total <= self.rank_limit,
+            "results": [dict(row._mapping) for row in rows],
+        }
+
+    @staticmethod
+    def _filters(
+        subreddit: Optional[str],
+        language: Optional[str],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        has_keywords: bool,
+        min_score: int,
+        doc_types: Tuple[str, ...],
+    ) -> Tuple[List[str], Dict[str, Any], List]:
+        """SQL conditions on search_documents d, their values and typed binds"""
+        clauses: List[str] = []
+        params: Dict[str, Any] = {}
+        bind = []
+        if set(doc_types) != {"post", "comment"}:
+            clauses.append("d.doc_type IN :doc_types")
+            params["doc_types"] = list(doc_types)
+            bind.append(bindparam("doc_types", expanding=True))
+        if subreddit:
+            clauses.append("d.subreddit = :subreddit")
+            params["subreddit"] = subreddit
+        if language:
+            clauses.append("d.language = :language")
+            params["language"] = language
+        if date_from:
+            clauses.append("d.created_utc >= :date_from")
+            params["date_from"] = date_from
+            bind.append(bindparam("date_from", type_=DateTime))
+        if date_to:
+            clauses.append("d.created_utc <= :date_to")
+            params["date_to"] = date_to
+            bind.append(bindparam("date_to", type_=DateTime))
+        if has_keywords:
+            clauses.append("d.contains_health_keywords = :has_keywords")
+            params["has_keywords"] = True
+        if min_score > 0:
+            clauses.append("d.score >= :min_score")
+            params["min_score"] = min_score
+        return clauses, params, bind
+
+    def _run(
+        self,
+        count_sql: str,
+        page_sql: Callable[[bool], str],
+        params: Dict,
+        bind: List,
+    ) -> Tuple[int, List]:
+        """Count the matches, then fetch one page ranked or newest first"""
+        with self.db_manager.get_session() as session:
+            total = session.execute(text(count_sql).bindparams(*bind), params).scalar()
+            if not total:
+                return 0, []
+            sql = page_sql(total <= self.rank_limit)
+            return (
+                total,
+                session.execute(text(sql).bindparams(*bind), params).fetchall(),
+            )
+
+    @staticmethod
+    def _where(clauses: List[str]) -> str:
+        return " AND ".join(clauses) or "1 = 1"
+
+    def _list(self, clauses: List[str], params: Dict, bind: List) -> Tuple[int, List]:
+        where = self._where(clauses)
+        return self._run(
+            f"SELECT count(*) FROM search_documents d WHERE {where}",
+            lambda ranked: (
+                f"SELECT {RESULT_COLUMNS}, NULL AS rank, d.title AS title_highlight, "
+                "substr(coalesce(d.body, ''), 1, 300) AS snippet "
+                f"FROM search_documents d WHERE {where} "
+                "ORDER BY d.created_utc DESC, d.id DESC LIMIT :limit OFFSET :offset"
+            ),
+            params,
+            bind,
+        )
+
+    def _search_fts5(
+        self, query: str, clauses: List[str], params: Dict, bind: List
+    ) -> Tuple[int, List]:
+        match = fts5_query(query)
+        if match is None:
+            return 0, []
+
+        params["match"] = match
+        where = self._where(["search_fts MATCH :match"] + clauses)
+        source = "search_fts JOIN search_documents d ON d.id = search_fts.rowid"
+        return self._run(
+            # Without filters the FTS table alone answers the count
+            f"SELECT count(*) FROM {source if clauses else 'search_fts'} "
+            f"WHERE {where}",
+            lambda ranked: (
+                f"SELECT {RESULT_COLUMNS}, "
+                f"{'bm25(search_fts, 10.0, 5.0, 2.0)' if ranked else 'NULL'} AS rank, "
+                f"highlight(search_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}') "
+                "AS title_highlight, "
+                f"snippet(search_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', "
+                "'…', 32) AS snippet "
+                f"FROM {source} WHERE {where} "
+                f"ORDER BY {'rank, d.id' if ranked else 'search_fts.rowid DESC'} "
+                "LIMIT :limit OFFSET :offset"
+            ),
+            params,
+            bind,
+        )
+
+    def _search_postgresql(
+        self,
+        query: str,
+        language: Optional[str],
+        clauses: List[str],
+        params: Dict,
+        bind: List,
+    ) -> Tuple[int, List]:
+        # Match the query as analysed by every configuration documents use
+        configs = (
+            [LANGUAGE_CONFIGS.get(language, "simple"), "english"]
+            if language
+            else list(LANGUAGE_CONFIGS.values()) + ["simple"]
+        )
+        tsquery = " || ".join(
+            f"websearch_to_tsquery('{config}', :query)"
+            for config in dict.fromkeys(configs)
+        )
+        params["query"] = query
+        where = self._where(["d.search_vector @@ q.query"] + clauses)
+        source = f"search_documents d, (SELECT {tsquery} AS query) q"
+        options = (
+            f"'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, "
+            'MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=" … "\''
+        )
+        config = language_config_sql("page.language")
+
+        def page_sql(ranked: bool) -> str:
+            rank = "ts_rank_cd(d.search_vector, q.query)" if ranked else "NULL"
+            order = "rank DESC, d.id" if ranked else "d.id DESC"
+            page_order = "page.rank DESC, page.id" if ranked else "page.id DESC"
+            # Headlines are expensive, so only the rows of the page get them
+            return (
+                "SELECT page.*, "
+                f"ts_headline({config}, page.title, q.query, "
+                f"'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, "
+                "HighlightAll=true') AS title_highlight, "
+                f"ts_headline({config}, concat_ws(' ', page.body, page.translation), "
+                f"q.query, {options}) AS snippet "
+                f"FROM (SELECT {RESULT_COLUMNS}, d.body, d.translation, "
+                f"{rank} AS rank FROM {source} WHERE {where} "
+                f"ORDER BY {order} LIMIT :limit OFFSET :offset) page, "
+                f"(SELECT {tsquery} AS query) q "
+                f"ORDER BY {page_order}"
+            )
+
+        return self._run(
+            f"SELECT count(*) FROM {source} WHERE {where}", page_sql, params, bind
+        )
+
+    def _search_like(
+        self, query: str, clauses: List[str], params: Dict, bind: List
+    ) -> Tuple[int, List]:
+        groups, excluded = parse_query(query)
+        if not groups:
+            return 0, []
+
+        document = (
+            "lower(coalesce(d.title, '') || ' ' || coalesce(d.body, '') || ' ' "
+            "|| coalesce(d.translation, ''))"
+        )
+
+        def like(phrase: str) -> str:
+            name = f"phrase_{len(params)}"
+            params[name] = f"%{phrase.lower()}%"
+            return f"{document} LIKE :{name}"
+
+        matches = " OR ".join(
+            "(" + " AND ".join(like(phrase) for phrase in group) + ")"
+            for group in groups
+        )
+        conditions = [f"({matches})"] + [f"NOT {like(phrase)}" for phrase in excluded]
+        return self._list(conditions + clauses, params, bind)
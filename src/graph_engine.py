@@ -0,0 +1,259 @@
+"""
+Graph engines for network analysis
+NetworkX gives exact results on small graphs; the sparse engine runs the same
+measures on a SciPy CSR adjacency matrix so corpus-sized interaction graphs
+can be analyzed on one machine
+"""
+
+from typing import Dict, Hashable, List, Optional, Set
+
+import networkx as nx
+import numpy as np
+from loguru import logger
+from scipy import sparse
+
+from config.settings import Config
+
+try:
+    import igraph
+
+    IGRAPH_AVAILABLE = True
+except ImportError:
+    IGRAPH_AVAILABLE = False
+
+
+class CSRGraph:
+    """Compressed sparse row adjacency of a directed NetworkX graph"""
+
+    def __init__(self, nodes: List[Hashable], adjacency: sparse.csr_array):
+        self.nodes = nodes
+        self.adjacency = adjacency
+
+        # Unweighted structure without self-loops, used for path counting
+        structure = adjacency.astype(bool).astype(np.float64).tolil()
+        structure.setdiag(0)
+        self.structure = sparse.csr_array(structure)
+        self.structure.eliminate_zeros()
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph, weight: str = "weight") -> "CSRGraph":
+        nodes = list(graph.nodes())
+        adjacency = nx.to_scipy_sparse_array(
+            graph, nodelist=nodes, weight=weight, format="csr", dtype=np.float64
+        )
+        return cls(nodes, adjacency)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    def to_dict(self, values: np.ndarray) -> Dict[Hashable, float]:
+        return dict(zip(self.nodes, values.tolist()))
+
+
+class NetworkXEngine:
+    """Exact NetworkX algorithms, suitable for graphs up to a few thousand nodes"""
+
+    name = "networkx"
+
+    def prepare(self, graph: nx.Graph) -> nx.Graph:
+        return graph
+
+    def degree_centrality(self, graph: nx.Graph) -> Dict:
+        return nx.degree_centrality(graph)
+
+    def betweenness_centrality(
+        self, graph: nx.Graph, k: Optional[int] = None, seed: int = 42
+    ) -> Dict:
+        return nx.betweenness_centrality(graph, k=k, seed=seed)
+
+    def eigenvector_centrality(self, graph: nx.Graph) -> Dict:
+        return nx.eigenvector_centrality(graph, max_iter=1000)
+
+    def pagerank(self, graph: nx.Graph, alpha: float = 0.85) -> Dict:
+        return nx.pagerank(graph, alpha=alpha)
+
+    def communities(self, graph: nx.Graph, seed: int = 42) -> List[Set]:
+        return nx.community.greedy_modularity_communities(graph.to_undirected())
+
+
+class SparseGraphEngine:
+    """
+    Sparse-matrix implementations of the NetworkAnalyzer measures
+
+    Results use the same normalization as their NetworkX counterparts.
+    Betweenness runs Brandes' algorithm for a batch of sources at once as
+    sparse matrix products (one BFS level per product).
+    """
+
+    name = "sparse"
+
+    def __init__(self, batch_size: int = 64, tol: float = 1.0e-6, max_iter: int = 1000):
+        self.batch_size = batch_size
+        self.tol = tol
+        self.max_iter = max_iter
+
+    def prepare(self, graph: nx.Graph) -> CSRGraph:
+        return CSRGraph.from_networkx(graph)
+
+    def degree_centrality(self, csr: CSRGraph) -> Dict:
+        n = csr.num_nodes
+        if n <= 1:
+            return csr.to_dict(np.ones(n))
+
+        # In-degree + out-degree, as nx.degree_centrality counts for DiGraphs
+        pattern = csr.adjacency.astype(bool)
+        degree = np.asarray(pattern.sum(axis=0) + pattern.sum(axis=1)).ravel()
+        return csr.to_dict(degree / (n - 1))
+
+    def pagerank(self, csr: CSRGraph, alpha: float = 0.85) -> Dict:
+        n = csr.num_nodes
+        if n == 0:
+            return {}
+
+        out_weight = np.asarray(csr.adjacency.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+        transition = sparse.diags_array(inverse) @ csr.adjacency
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(self.max_iter):
+            previous = rank
+            rank = alpha * (previous @ transition)
+            rank += (alpha * previous[dangling].sum() + 1 - alpha) / n
+            if np.abs(rank - previous).sum() < n * self.tol:
+                return csr.to_dict(rank)
+
+        raise nx.PowerIterationFailedConvergence(self.max_iter)
+
+    def eigenvector_centrality(self, csr: CSRGraph) -> Dict:
+        n = csr.num_nodes
+        if n == 0:
+            raise nx.NetworkXPointlessConcept(
+                "cannot compute centrality for the null graph"
+            )
+
+        # Same shifted, unweighted power iteration (x <- x + x A) as
+        # nx.eigenvector_centrality with its default weight=None
+        pattern = csr.adjacency.astype(bool).astype(np.float64)
+        x = np.full(n, 1.0 / n)
+        for _ in range(self.max_iter):
+            previous = x
+            x = previous + previous @ pattern
+            norm = np.linalg.norm(x) or 1.0
+            x = x / norm
+            if np.abs(x - previous).sum() < n * self.tol:
+                return csr.to_dict(x)
+
+        raise nx.PowerIterationFailedConvergence(self.max_iter)
+
+    def betweenness_centrality(
+        self, csr: CSRGraph, k: Optional[int] = None, seed: int = 42
+    ) -> Dict:
+        n = csr.num_nodes
+        betweenness = np.zeros(n)
+        if n <= 2:
+            return csr.to_dict(betweenness)
+
+        if k is None or k >= n:
+            sources = np.arange(n)
+        else:
+            sources = np.random.default_rng(seed).choice(n, size=k, replace=False)
+
+        forward = csr.structure
+        backward = sparse.csr_array(forward.T)
+        for start in range(0, len(sources), self.batch_size):
+            betweenness += self._batch_dependencies(
+                forward, backward, sources[start : start + self.batch_size]
+            )
+
+        # Directed, normalized, scaled for sampling like nx.betweenness_centrality
+        scale = 1.0 / ((n - 1) * (n - 2))
+        if len(sources) < n:
+            scale *= n / len(sources)
+        return csr.to_dict(betweenness * scale)
+
+    @staticmethod
+    def _batch_dependencies(
+        forward: sparse.csr_array, backward: sparse.csr_array, sources: np.ndarray
+    ) -> np.ndarray:
+        """Sum of Brandes dependencies for a batch of BFS sources"""
+        # Matrices are (nodes x sources) so every step is sparse @ dense
+        columns = np.arange(len(sources))
+        n = forward.shape[0]
+
+        sigma = np.zeros((n, len(sources)))
+        sigma[sources, columns] = 1.0
+        depth = np.full((n, len(sources)), -1, dtype=np.int32)
+        depth[sources, columns] = 0
+
+        # Forward BFS, counting shortest paths level by level
+        frontier = sigma.copy()
+        level = 0
+        while True:
+            paths = backward @ frontier
+            paths[depth >= 0] = 0.0
+            reached = paths > 0
+            if not reached.any():
+                break
+            level += 1
+            sigma += paths
+            depth[reached] = level
+            frontier = paths
+
+        # Backward accumulation from the deepest level
+        delta = np.zeros_like(sigma)
+        for current in range(level, 0, -1):
+            weights = np.zeros_like(sigma)
+            at_level = depth == current
+            weights[at_level] = (1.0 + delta[at_level]) / sigma[at_level]
+            parents = depth == current - 1
+            delta[parents] += (forward @ weights)[parents] * sigma[parents]
+
+        delta[sources, columns] = 0.0
+        return delta.sum(axis=1)
+
+    def communities(self, csr: CSRGraph, seed: int = 42) -> List[Set]:
+        undirected = csr.adjacency + csr.adjacency.T
+
+        if IGRAPH_AVAILABLE:
+            upper = sparse.triu(undirected, k=1).tocoo()
+            ig_graph = igraph.Graph(
+                n=csr.num_nodes,
+                edges=list(zip(upper.row.tolist(), upper.col.tolist())),
+                directed=False,
+            )
+            ig_graph.es["weight"] = upper.data.tolist()
+            partition = ig_graph.community_leiden(
+                objective_function="modularity", weights="weight"
+            )
+            return [{csr.nodes[i] for i in members} for members in partition]
+
+        graph = nx.from_scipy_sparse_array(undirected)
+        communities = nx.community.louvain_communities(
+            graph, weight="weight", seed=seed
+        )
+        return [{csr.nodes[i] for i in members} for members in communities]
+
+
+def select_engine(graph: nx.Graph, engine: str = "auto"):
+    """
+    Pick a graph engine
+
+    ``auto`` keeps exact NetworkX algorithms up to Config.MAX_NETWORK_NODES
+    nodes and switches to the sparse engine above that.
+    """
+    if engine == "networkx":
+        return NetworkXEngine()
+    if engine == "sparse":
+        return SparseGraphEngine()
+    if engine != "auto":
+        raise ValueError(f"Unknown graph engine: {engine}")
+
+    if graph.number_of_nodes() > Config.MAX_NETWORK_NODES:
+        logger.info(
+            f"Graph has {graph.number_of_nodes()} nodes "
+            f"(> {Config.MAX_NETWORK_NODES}), using sparse engine"
+        )
+        return SparseGraphEngine()
+    return NetworkXEngine()
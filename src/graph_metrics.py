@@ -0,0 +1,109 @@
+"""
+Graph metrics cache for network analysis
+Computes each centrality measure once per graph version so metrics reports,
+visualizations and spreader rankings share the same results
+"""
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import networkx as nx
+from loguru import logger
+
+from src.graph_engine import select_engine
+
+
+class GraphMetricsCache:
+    """
+    Memoizes expensive graph measures for the current graph version
+
+    The cache key combines the caller's version counter with the node and
+    edge counts, so a stale entry is never served even if the graph was
+    mutated without bumping the version. Betweenness switches to ``k``-node
+    sampling on graphs larger than ``exact_betweenness_max_nodes``, and the
+    graph engine (exact NetworkX or sparse matrices) is chosen per graph.
+    """
+
+    def __init__(
+        self,
+        exact_betweenness_max_nodes: int = 1000,
+        betweenness_samples: int = 256,
+        seed: int = 42,
+        engine: str = "auto",
+    ):
+        self.exact_betweenness_max_nodes = exact_betweenness_max_nodes
+        self.betweenness_samples = betweenness_samples
+        self.seed = seed
+        self.engine = engine
+        self._key: Optional[Tuple] = None
+        self._values: Dict[Hashable, Any] = {}
+
+    def _get(
+        self, graph: nx.Graph, version: int, name: Hashable, compute: Callable
+    ) -> Any:
+        key = (version, graph.number_of_nodes(), graph.number_of_edges())
+        if key != self._key:
+            self._key = key
+            self._values = {}
+
+        if name not in self._values:
+            self._values[name] = compute()
+        return self._values[name]
+
+    def _engine(self, graph: nx.Graph, version: int):
+        """Graph engine and its prepared graph (e.g. CSR matrix), built once"""
+        engine = self._get(
+            graph, version, "engine", lambda: select_engine(graph, self.engine)
+        )
+        prepared = self._get(graph, version, "prepared", lambda: engine.prepare(graph))
+        return engine, prepared
+
+    def clear(self) -> None:
+        """Drop all cached measures"""
+        self._key = None
+        self._values = {}
+
+    def degree_centrality(self, graph: nx.Graph, version: int = 0) -> Dict:
+        """Degree centrality of every node"""
+        engine, prepared = self._engine(graph, version)
+        return self._get(
+            graph, version, "degree", lambda: engine.degree_centrality(prepared)
+        )
+
+    def betweenness_centrality(self, graph: nx.Graph, version: int = 0) -> Dict:
+        """Betweenness centrality, sampled from ``k`` sources on large graphs"""
+        engine, prepared = self._engine(graph, version)
+
+        def compute():
+            n = graph.number_of_nodes()
+            k = None
+            if n > self.exact_betweenness_max_nodes:
+                k = min(self.betweenness_samples, n)
+                logger.info(f"Approximating betweenness with {k} of {n} sources")
+            return engine.betweenness_centrality(prepared, k=k, seed=self.seed)
+
+        return self._get(graph, version, "betweenness", compute)
+
+    def eigenvector_centrality(self, graph: nx.Graph, version: int = 0) -> Dict:
+        """Eigenvector centrality of every node"""
+        engine, prepared = self._engine(graph, version)
+        return self._get(
+            graph,
+            version,
+            "eigenvector",
+            lambda: engine.eigenvector_centrality(prepared),
+        )
+
+    def pagerank(self, graph: nx.Graph, version: int = 0) -> Dict:
+        """PageRank of every node"""
+        engine, prepared = self._engine(graph, version)
+        return self._get(graph, version, "pagerank", lambda: engine.pagerank(prepared))
+
+    def communities(self, graph: nx.Graph, version: int = 0) -> list:
+        """Communities of the undirected graph (greedy modularity or Louvain)"""
+        engine, prepared = self._engine(graph, version)
+        return self._get(
+            graph,
+            version,
+            "communities",
+            lambda: engine.communities(prepared, seed=self.seed),
+        )
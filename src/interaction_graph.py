@@ -0,0 +1,555 @@
+"""
+Materialized user interaction graph
+Keeps aggregated commenter -> author edge weights in the database, folds in
+new posts and comments at ingest time and snapshots the full graph to a
+compact binary file so network views load without rebuilding from comments
+"""
+
+from collections import Counter
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+from loguru import logger
+from sqlalchemy import and_, func, select, union_all
+from sqlalchemy.orm import Session, aliased
+
+from src.data_persistence import (
+    DataPersistenceManager,
+    increment_rows,
+    surviving_max_ids,
+)
+from src.database_models import (
+    InteractionEdge,
+    InteractionGraphState,
+    InteractionPendingReply,
+    InteractionUserActivity,
+    RedditComment,
+    RedditPost,
+)
+
+# Day bucket for posts/comments without a timestamp (kept out of date filters)
+UNDATED = date(1970, 1, 1)
+
+
+def _day(value) -> date:
+    if value is None:
+        return UNDATED
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.date() if isinstance(value, datetime) else value
+
+
+class InteractionGraphStore:
+    """
+    User interaction graph aggregated per (source, target, subreddit, day)
+
+    Edges follow NetworkAnalyzer.build_user_network: commenter -> post author
+    and commenter -> parent comment author, excluding deleted users and
+    self-interactions. Rows newer than the stored watermarks are folded in by
+    ``update``; graphs for any subreddit and day range are read back with
+    one GROUP BY. Replies collected before their parent comment are kept
+    as pending and get their edge once the parent arrives. Posts removed by
+    cleanup_old_data are subtracted through ``remove_posts``.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        snapshot_path: str = "data/interaction_graph.npz",
+        batch_size: int = 10000,
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.snapshot_path = Path(snapshot_path)
+        self.batch_size = batch_size
+
+    @staticmethod
+    def covers(
+        start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+    ) -> bool:
+        """Whether a date filter falls on day boundaries the store can answer"""
+        for value in (start_date, end_date):
+            if isinstance(value, datetime) and (
+                value.tzinfo is not None or value.time() != time.min
+            ):
+                return False
+        return True
+
+    def _state(self, session: Session) -> InteractionGraphState:
+        state = session.query(InteractionGraphState).with_for_update().first()
+        if state is None:
+            state = InteractionGraphState(
+                post_watermark=0, comment_watermark=0, version=0
+            )
+            session.add(state)
+            session.flush()
+        return state
+
+    def version(self) -> int:
+        """Current graph version (0 before the first update)"""
+        with self.db_manager.get_session() as session:
+            return session.query(InteractionGraphState.version).scalar() or 0
+
+    def update(self) -> int:
+        """
+        Fold posts and comments added since the last update into the graph
+
+        Returns:
+            Number of new posts and comments processed
+        """
+        with self.db_manager.get_session() as session:
+            try:
+                state = self._state(session)
+                max_post = session.query(func.max(RedditPost.id)).scalar() or 0
+                max_comment = session.query(func.max(RedditComment.id)).scalar() or 0
+
+                new_posts = max_post - state.post_watermark
+                new_comments = max_comment - state.comment_watermark
+                if new_posts <= 0 and new_comments <= 0:
+                    session.rollback()
+                    return 0
+
+                edges, activity = self._aggregate(
+                    session,
+                    and_(
+                        RedditPost.id > state.post_watermark,
+                        RedditPost.id <= max_post,
+                    ),
+                    and_(
+                        RedditComment.id > state.comment_watermark,
+                        RedditComment.id <= max_comment,
+                    ),
+                    max_comment,
+                )
+                self._resolve_pending_replies(
+                    session, (state.comment_watermark, max_comment), edges
+                )
+                self._increment(
+                    session,
+                    InteractionEdge,
+                    ["source_author", "target_author", "subreddit", "interaction_date"],
+                    "weight",
+                    edges,
+                )
+                self._increment(
+                    session,
+                    InteractionUserActivity,
+                    ["author", "subreddit", "activity_date"],
+                    "activity_count",
+                    activity,
+                )
+
+                state.post_watermark = max_post
+                state.comment_watermark = max_comment
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+
+                logger.info(
+                    f"Interaction graph v{state.version}: folded in "
+                    f"{max(new_posts, 0)} posts, {max(new_comments, 0)} comments "
+                    f"({len(edges)} edge buckets)"
+                )
+                return max(new_posts, 0) + max(new_comments, 0)
+
+            except Exception:
+                session.rollback()
+                raise
+
+    def rebuild(self) -> int:
+        """Drop the materialized graph and rebuild it from all posts and comments"""
+        with self.db_manager.get_session() as session:
+            session.query(InteractionEdge).delete()
+            session.query(InteractionUserActivity).delete()
+            session.query(InteractionPendingReply).delete()
+            session.query(InteractionGraphState).delete()
+            session.commit()
+
+        self.snapshot_path.unlink(missing_ok=True)
+        return self.update()
+
+    def remove_posts(self, session: Session, posts) -> int:
+        """
+        Subtract posts about to be deleted, and their comments, from the graph
+
+        ``posts`` is a condition on RedditPost selecting the posts. Call this
+        in the deleting transaction, before the delete; only rows already
+        folded in (at or below the watermarks) are subtracted, and the
+        watermarks drop to the highest surviving ids. Replies are
+        always in the same post as their parent, so every edge of a removed
+        comment goes with it.
+
+        Returns:
+            Number of posts and comments subtracted
+        """
+        state = session.query(InteractionGraphState).with_for_update().first()
+        if state is None:
+            return 0
+
+        comment_watermark = state.comment_watermark
+        removed_posts = and_(posts, RedditPost.id <= state.post_watermark)
+        of_removed_posts = RedditComment.post_id.in_(
+            select(RedditPost.post_id).where(posts)
+        )
+        removed_comments = and_(
+            of_removed_posts, RedditComment.id <= state.comment_watermark
+        )
+        count = (
+            session.query(func.count(RedditPost.id)).filter(removed_posts).scalar()
+            + session.query(func.count(RedditComment.id))
+            .filter(removed_comments)
+            .scalar()
+        )
+        max_post, max_comment = surviving_max_ids(session, posts)
+        state.post_watermark = min(state.post_watermark, max_post)
+        state.comment_watermark = min(state.comment_watermark, max_comment)
+        if not count:
+            return 0
+
+        edges, activity = self._aggregate(
+            session, removed_posts, removed_comments, comment_watermark
+        )
+        self._increment(
+            session,
+            InteractionEdge,
+            ["source_author", "target_author", "subreddit", "interaction_date"],
+            "weight",
+            edges,
+            sign=-1,
+        )
+        self._increment(
+            session,
+            InteractionUserActivity,
+            ["author", "subreddit", "activity_date"],
+            "activity_count",
+            activity,
+            sign=-1,
+        )
+        session.query(InteractionEdge).filter(InteractionEdge.weight <= 0).delete(
+            synchronize_session=False
+        )
+        session.query(InteractionUserActivity).filter(
+            InteractionUserActivity.activity_count <= 0
+        ).delete(synchronize_session=False)
+        session.query(InteractionPendingReply).filter(
+            InteractionPendingReply.comment_row_id.in_(
+                select(RedditComment.id).where(of_removed_posts)
+            )
+        ).delete(synchronize_session=False)
+
+        state.version = (state.version or 0) + 1
+        state.updated_at = datetime.utcnow()
+        return count
+
+    def _aggregate(
+        self,
+        session: Session,
+        post_filter,
+        comment_filter,
+        parent_limit: int,
+    ) -> Tuple[Counter, Counter]:
+        """
+        Edge and activity counts of the posts matching ``post_filter`` and
+        the comments matching ``comment_filter``; reply edges count parents
+        with RedditComment.id <= ``parent_limit``
+        """
+        edges = Counter()
+        activity = Counter()
+
+        comment = RedditComment
+        parent = aliased(RedditComment)
+        post = aliased(RedditPost)
+        in_range = and_(comment_filter, comment.author.isnot(None))
+
+        post_edges = (
+            select(
+                comment.author.label("source"),
+                post.author.label("target"),
+                post.subreddit,
+                comment.created_utc,
+            )
+            .join(post, comment.post_id == post.post_id)
+            .where(in_range)
+        )
+        # parent_id is "t1_<comment_id>" for replies to comments
+        reply_edges = (
+            select(
+                comment.author.label("source"),
+                parent.author.label("target"),
+                post.subreddit,
+                comment.created_utc,
+            )
+            .join(
+                parent,
+                and_(
+                    parent.comment_id == func.substr(comment.parent_id, 4),
+                    parent.id <= parent_limit,
+                ),
+            )
+            .join(post, comment.post_id == post.post_id)
+            .where(comment.parent_id.like("t1_%"), in_range)
+        )
+        rows = session.execute(union_all(post_edges, reply_edges)).yield_per(
+            self.batch_size
+        )
+        for source, target, subreddit, created in rows:
+            if target is None or "[deleted]" in (source, target) or source == target:
+                continue
+            edges[(source, target, subreddit or "", _day(created))] += 1
+
+        # Node set: post authors and commenters, as in build_user_network
+        post_authors = session.execute(
+            select(
+                RedditPost.author, RedditPost.subreddit, RedditPost.created_utc
+            ).where(
+                post_filter,
+                RedditPost.author.isnot(None),
+                RedditPost.author != "[deleted]",
+            )
+        ).yield_per(self.batch_size)
+        commenters = session.execute(
+            select(comment.author, post.subreddit, comment.created_utc)
+            .join(post, comment.post_id == post.post_id)
+            .where(in_range, comment.author != "[deleted]")
+        ).yield_per(self.batch_size)
+        for rows in (post_authors, commenters):
+            for author, subreddit, created in rows:
+                activity[(author, subreddit or "", _day(created))] += 1
+
+        return edges, activity
+
+    def _resolve_pending_replies(
+        self, session: Session, comment_range: Tuple[int, int], edges: Counter
+    ) -> None:
+        """
+        Record new replies whose parent comment is not stored yet, and add
+        the edges of pending replies whose parent arrived in this range
+        """
+        comment = aliased(RedditComment)
+        parent = aliased(RedditComment)
+        post = aliased(RedditPost)
+
+        parent_id = func.substr(comment.parent_id, 4)
+        orphans = (
+            select(comment.id, parent_id)
+            .where(
+                comment.id > comment_range[0],
+                comment.id <= comment_range[1],
+                comment.parent_id.like("t1_%"),
+                comment.author.isnot(None),
+                comment.author != "[deleted]",
+                ~select(parent.id)
+                .where(parent.comment_id == parent_id, parent.id <= comment_range[1])
+                .exists(),
+            )
+            .execution_options(yield_per=self.batch_size)
+        )
+        session.execute(
+            InteractionPendingReply.__table__.insert().from_select(
+                ["comment_row_id", "parent_comment_id"], orphans
+            )
+        )
+
+        resolved = []
+        for pending_id, source, target, subreddit, created in session.execute(
+            select(
+                InteractionPendingReply.id,
+                comment.author,
+                parent.author,
+                post.subreddit,
+                comment.created_utc,
+            )
+            .join(comment, comment.id == InteractionPendingReply.comment_row_id)
+            .join(
+                parent,
+                and_(
+                    parent.comment_id == InteractionPendingReply.parent_comment_id,
+                    parent.id > comment_range[0],
+                    parent.id <= comment_range[1],
+                ),
+            )
+            .join(post, comment.post_id == post.post_id)
+        ):
+            resolved.append(pending_id)
+            if target is None or "[deleted]" in (source, target) or source == target:
+                continue
+            edges[(source, target, subreddit or "", _day(created))] += 1
+
+        for start in range(0, len(resolved), self.batch_size):
+            session.query(InteractionPendingReply).filter(
+                InteractionPendingReply.id.in_(
+                    resolved[start : start + self.batch_size]
+                )
+            ).delete(synchronize_session=False)
+
+    def _increment(
+        self,
+        session: Session,
+        model,
+        key_columns: Iterable[str],
+        count_column: str,
+        counts: Counter,
+        sign: int = 1,
+    ) -> None:
+        """
+        Add counts to existing rows, inserting rows for new keys; with
+        ``sign=-1`` subtract them from existing rows instead
+        """
+        key_columns = list(key_columns)
+        rows = [
+            {**dict(zip(key_columns, key)), count_column: sign * count}
+            for key, count in counts.items()
+        ]
+        increment_rows(
+            session,
+            model,
+            key_columns,
+            [count_column],
+            rows,
+            self.batch_size,
+            insert=sign > 0,
+        )
+
+    def load_graph(
+        self,
+        subreddit_filter: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> nx.DiGraph:
+        """
+        Interaction graph for a subreddit and day range
+
+        The unfiltered graph is served from the binary snapshot while its
+        version matches the store, and re-snapshotted otherwise.
+        """
+        if not self.covers(start_date, end_date):
+            raise ValueError("Interaction graph dates must fall on day boundaries")
+
+        unfiltered = not (subreddit_filter or start_date or end_date)
+        if unfiltered:
+            version = self.version()
+            snapshot = self.load_snapshot()
+            if snapshot is not None and snapshot[1] == version:
+                return snapshot[0]
+
+        edge_conditions = []
+        node_conditions = []
+        if subreddit_filter:
+            edge_conditions.append(InteractionEdge.subreddit == subreddit_filter)
+            node_conditions.append(
+                InteractionUserActivity.subreddit == subreddit_filter
+            )
+        if start_date:
+            edge_conditions.append(InteractionEdge.interaction_date >= _day(start_date))
+            node_conditions.append(
+                InteractionUserActivity.activity_date >= _day(start_date)
+            )
+        if end_date:
+            # Undated rows never match a date filter, as in SQL on created_utc
+            edge_conditions += [
+                InteractionEdge.interaction_date < _day(end_date),
+                InteractionEdge.interaction_date > UNDATED,
+            ]
+            node_conditions += [
+                InteractionUserActivity.activity_date < _day(end_date),
+                InteractionUserActivity.activity_date > UNDATED,
+            ]
+
+        graph = nx.DiGraph()
+        with self.db_manager.get_session() as session:
+            graph.add_nodes_from(
+                author
+                for (author,) in session.execute(
+                    select(InteractionUserActivity.author)
+                    .where(*node_conditions)
+                    .distinct()
+                ).yield_per(self.batch_size)
+            )
+            graph.add_weighted_edges_from(
+                (source, target, int(weight))
+                for source, target, weight in session.execute(
+                    select(
+                        InteractionEdge.source_author,
+                        InteractionEdge.target_author,
+                        func.sum(InteractionEdge.weight),
+                    )
+                    .where(*edge_conditions)
+                    .group_by(
+                        InteractionEdge.source_author, InteractionEdge.target_author
+                    )
+                ).yield_per(self.batch_size)
+            )
+
+        if unfiltered:
+            self.save_snapshot(graph, version)
+        return graph
+
+    def save_snapshot(self, graph: nx.DiGraph, version: int) -> None:
+        """Write a graph as node names plus int32 edge index arrays"""
+        nodes = list(graph.nodes())
+        index: Dict[str, int] = {node: i for i, node in enumerate(nodes)}
+        edges = list(graph.edges(data="weight", default=1))
+
+        # Reddit usernames never contain newlines, so one joined blob suffices
+        names = "\n".join(nodes).encode("utf-8")
+
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.snapshot_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                version=np.int64(version),
+                num_nodes=np.int64(len(nodes)),
+                names=np.frombuffer(names, dtype=np.uint8),
+                sources=np.array([index[s] for s, _, _ in edges], dtype=np.int32),
+                targets=np.array([index[t] for _, t, _ in edges], dtype=np.int32),
+                weights=np.array([w for _, _, w in edges], dtype=np.int64),
+            )
+        logger.info(
+            f"Saved interaction graph snapshot v{version} "
+            f"({len(nodes)} nodes, {len(edges)} edges) to {self.snapshot_path}"
+        )
+
+    def load_snapshot(self) -> Optional[Tuple[nx.DiGraph, int]]:
+        """Graph and version from the snapshot file, or None if there is none"""
+        if not self.snapshot_path.exists():
+            return None
+
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                nodes = (
+                    data["names"].tobytes().decode("utf-8").split("\n")
+                    if int(data["num_nodes"])
+                    else []
+                )
+                sources = data["sources"].tolist()
+                targets = data["targets"].tolist()
+                weights = data["weights"].tolist()
+                version = int(data["version"])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable interaction graph snapshot: {e}")
+            return None
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(nodes)
+        graph.add_weighted_edges_from(
+            (nodes[s], nodes[t], w) for s, t, w in zip(sources, targets, weights)
+        )
+        return graph, version
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Update the interaction graph")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild from scratch")
+    args = parser.parse_args()
+
+    store = InteractionGraphStore()
+    processed = store.rebuild() if args.rebuild else store.update()
+    graph = store.load_graph()
+    print(
+        f"Processed {processed} rows; graph has {graph.number_of_nodes()} nodes "
+        f"and {graph.number_of_edges()} edges"
+    )
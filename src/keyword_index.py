@@ -0,0 +1,455 @@
+"""
+Keyword inverted index
+Stores, per keyword, the posts and comments containing it with the character
+offsets of every occurrence, built at ingest from RedditPost/RedditComment.id
+watermarks, so keyword examples, counts and co-occurrences are read from
+postings instead of scanning the corpus
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from config.settings import ResearchConfig
+from src.data_persistence import DataPersistenceManager, surviving_max_ids
+from src.database_models import (
+    KeywordIndexState,
+    KeywordPosting,
+    KeywordTerm,
+    RedditComment,
+    RedditPost,
+)
+
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 100
+
+
+def find_offsets(text: str, term: str) -> List[int]:
+    """Start offsets of every (possibly overlapping) occurrence of ``term``"""
+    offsets = []
+    start = text.find(term)
+    while start != -1:
+        offsets.append(start)
+        start = text.find(term, start + 1)
+    return offsets
+
+
+def post_text(title: Optional[str], selftext: Optional[str]) -> str:
+    """Searchable text of a post, as matched by the dashboard keyword analyses"""
+    return f"{title or ''} {selftext or ''}"
+
+
+class KeywordIndex:
+    """
+    Case-insensitive substring index of the research keywords
+
+    The keywords are indexed as posts and comments arrive; a keyword new to
+    the configuration is indexed over the existing corpus once. Only
+    configured keywords have postings: every term in the vocabulary is
+    checked against every new document, so ad-hoc searches are answered by
+    the full-text index instead. Postings follow posts deleted by
+    cleanup_old_data and posts re-scraped in place.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        keywords: Optional[List[str]] = None,
+        batch_size: int = 5000,
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.batch_size = batch_size
+        if keywords is None:
+            keywords = ResearchConfig.PRIMARY_KEYWORDS + ResearchConfig.COLLOQUIAL_TERMS
+        self.keywords = list(dict.fromkeys(self.normalize(k) for k in keywords))
+
+    @staticmethod
+    def normalize(term: str) -> str:
+        return term.strip().lower()
+
+    @staticmethod
+    def indexable(term: str) -> bool:
+        return MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH
+
+    def _state(self, session: Session) -> KeywordIndexState:
+        state = session.query(KeywordIndexState).with_for_update().first()
+        if state is None:
+            state = KeywordIndexState(post_watermark=0, comment_watermark=0, version=0)
+            session.add(state)
+            session.flush()
+        return state
+
+    def _ensure_terms(
+        self, session: Session, terms: Iterable[str], source: str
+    ) -> Dict[str, int]:
+        """Add missing terms to the vocabulary; returns {term: id} of new ones"""
+        terms = [term for term in dict.fromkeys(terms) if self.indexable(term)]
+        existing = {
+            term
+            for (term,) in session.query(KeywordTerm.term).filter(
+                KeywordTerm.term.in_(terms)
+            )
+        }
+        added = [KeywordTerm(term=term, source=source) for term in terms]
+        added = [term for term in added if term.term not in existing]
+        session.add_all(added)
+        session.flush()
+        return {term.term: term.id for term in added}
+
+    def version(self) -> int:
+        """Current index version (0 before the first update)"""
+        with self.db_manager.get_session() as session:
+            return session.query(KeywordIndexState.version).scalar() or 0
+
+    def update(self) -> int:
+        """
+        Index posts and comments added since the last update
+
+        Research keywords new to the vocabulary are indexed over the whole
+        corpus first; terms no longer configured (or added by earlier
+        versions for Content Explorer searches) are dropped.
+
+        Returns:
+            Number of postings written
+        """
+        with self.db_manager.get_session() as session:
+            try:
+                state = self._state(session)
+                max_post = session.query(func.max(RedditPost.id)).scalar() or 0
+                max_comment = session.query(func.max(RedditComment.id)).scalar() or 0
+
+                dropped = self._drop_unconfigured(session)
+                postings = self._backfill(
+                    session,
+                    state,
+                    self._ensure_terms(session, self.keywords, "config"),
+                )
+                if max_post > state.post_watermark or (
+                    max_comment > state.comment_watermark
+                ):
+                    terms = dict(session.query(KeywordTerm.term, KeywordTerm.id))
+                    postings += self._index(
+                        session, terms, state.post_watermark, max_post, "post"
+                    )
+                    postings += self._index(
+                        session, terms, state.comment_watermark, max_comment, "comment"
+                    )
+                    state.post_watermark = max(max_post, state.post_watermark)
+                    state.comment_watermark = max(max_comment, state.comment_watermark)
+                elif not postings and not dropped:
+                    session.rollback()
+                    return 0
+
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+
+                logger.info(f"Keyword index v{state.version}: {postings} new postings")
+                return postings
+
+            except Exception:
+                session.rollback()
+                raise
+
+    def rebuild(self) -> int:
+        """Drop all postings and index the corpus again"""
+        with self.db_manager.get_session() as session:
+            for model in (KeywordPosting, KeywordTerm, KeywordIndexState):
+                session.query(model).delete()
+            session.commit()
+
+        return self.update()
+
+    def remove_posts(self, session: Session, posts) -> int:
+        """
+        Delete the postings of posts about to be deleted and of their comments
+
+        ``posts`` is a condition on RedditPost selecting the posts. Call this
+        in the deleting transaction, before the delete. The watermarks drop
+        to the highest surviving ids, as SQLite reuses deleted trailing ids.
+
+        Returns:
+            Number of postings deleted
+        """
+        removed = (
+            session.query(KeywordPosting)
+            .filter(
+                or_(
+                    and_(
+                        KeywordPosting.doc_type == "post",
+                        KeywordPosting.doc_id.in_(select(RedditPost.id).where(posts)),
+                    ),
+                    and_(
+                        KeywordPosting.doc_type == "comment",
+                        KeywordPosting.doc_id.in_(
+                            select(RedditComment.id).where(
+                                RedditComment.post_id.in_(
+                                    select(RedditPost.post_id).where(posts)
+                                )
+                            )
+                        ),
+                    ),
+                )
+            )
+            .delete(synchronize_session=False)
+        )
+        state = self._state(session)
+        max_post, max_comment = surviving_max_ids(session, posts)
+        state.post_watermark = min(state.post_watermark, max_post)
+        state.comment_watermark = min(state.comment_watermark, max_comment)
+        if removed:
+            state.version = (state.version or 0) + 1
+            state.updated_at = datetime.utcnow()
+        return removed
+
+    def prepare_post_updates(self, post_ids: List[str]) -> List[int]:
+        """Indexed RedditPost.ids of posts about to be updated in place (re-scraped)"""
+        with self.db_manager.get_session() as session:
+            watermark = session.query(KeywordIndexState.post_watermark).scalar()
+            if not watermark:
+                return []
+            return [
+                doc_id
+                for start in range(0, len(post_ids), self.batch_size)
+                for (doc_id,) in session.query(RedditPost.id).filter(
+                    RedditPost.post_id.in_(post_ids[start : start + self.batch_size]),
+                    RedditPost.id <= watermark,
+                )
+            ]
+
+    def apply_post_updates(self, doc_ids: List[int]) -> int:
+        """
+        Index updated posts (``prepare_post_updates`` ids) again; their
+        comments are not rewritten by a re-scrape
+
+        Returns:
+            Number of postings written
+        """
+        if not doc_ids:
+            return 0
+
+        with self.db_manager.get_session() as session:
+            try:
+                state = self._state(session)
+                terms = dict(session.query(KeywordTerm.term, KeywordTerm.id))
+                postings = 0
+                for start in range(0, len(doc_ids), self.batch_size):
+                    batch = doc_ids[start : start + self.batch_size]
+                    session.query(KeywordPosting).filter(
+                        KeywordPosting.doc_type == "post",
+                        KeywordPosting.doc_id.in_(batch),
+                    ).delete(synchronize_session=False)
+                    postings += self._index_rows(
+                        session, terms, "post", RedditPost.id.in_(batch)
+                    )
+
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+                return postings
+
+            except Exception:
+                session.rollback()
+                raise
+
+    def _drop_unconfigured(self, session: Session) -> int:
+        """Remove terms that are not configured keywords, with their postings"""
+        unconfigured = KeywordTerm.term.notin_(self.keywords)
+        session.query(KeywordPosting).filter(
+            KeywordPosting.term_id.in_(
+                session.query(KeywordTerm.id).filter(unconfigured)
+            )
+        ).delete(synchronize_session=False)
+        return (
+            session.query(KeywordTerm)
+            .filter(unconfigured)
+            .delete(synchronize_session=False)
+        )
+
+    def _backfill(
+        self, session: Session, state: KeywordIndexState, terms: Dict[str, int]
+    ) -> int:
+        """Index ``terms`` over everything below the current watermarks"""
+        if not terms:
+            return 0
+        return self._index(session, terms, 0, state.post_watermark, "post") + (
+            self._index(session, terms, 0, state.comment_watermark, "comment")
+        )
+
+    def _index(
+        self,
+        session: Session,
+        terms: Dict[str, int],
+        start: int,
+        end: int,
+        doc_type: str,
+    ) -> int:
+        """Write postings of ``terms`` for documents with start < id <= end"""
+        if not terms or end <= start:
+            return 0
+
+        model = RedditPost if doc_type == "post" else RedditComment
+        return sum(
+            self._index_rows(
+                session,
+                terms,
+                doc_type,
+                model.id > low,
+                model.id <= min(low + self.batch_size, end),
+            )
+            for low in range(start, end, self.batch_size)
+        )
+
+    def _index_rows(
+        self, session: Session, terms: Dict[str, int], doc_type: str, *conditions
+    ) -> int:
+        """
+        Write postings of ``terms`` for the documents matching ``conditions``
+
+        Matching is done here with str.lower() rather than in SQL, whose
+        lower() only folds ASCII on SQLite ("SANTÉ" would never match).
+        """
+        if doc_type == "post":
+            columns = (RedditPost.id, RedditPost.title, RedditPost.selftext)
+        else:
+            columns = (RedditComment.id, RedditComment.body)
+
+        postings = []
+        for doc_id, *fields in session.query(*columns).filter(*conditions):
+            text = (
+                post_text(*fields) if doc_type == "post" else fields[0] or ""
+            ).lower()
+            for term, term_id in terms.items():
+                if term in text:
+                    postings.append(
+                        {
+                            "term_id": term_id,
+                            "doc_type": doc_type,
+                            "doc_id": doc_id,
+                            "offsets": ",".join(map(str, find_offsets(text, term))),
+                        }
+                    )
+        if postings:
+            session.execute(KeywordPosting.__table__.insert(), postings)
+        return len(postings)
+
+    def _term_id(self, session: Session, term: str) -> Optional[int]:
+        return session.query(KeywordTerm.id).filter(KeywordTerm.term == term).scalar()
+
+    def examples(self, term: str, limit: int = 5) -> List[Dict]:
+        """
+        First posts, then comments containing ``term``, in ingest order
+
+        Each example carries the matched text and the offsets of the term in
+        its lower-cased form. Terms that are not configured keywords have no
+        postings and return no examples.
+        """
+        term = self.normalize(term)
+        with self.db_manager.get_session() as session:
+            term_id = self._term_id(session, term)
+            if term_id is None:
+                return []
+            posts = (
+                session.query(
+                    KeywordPosting.offsets,
+                    RedditPost.subreddit,
+                    RedditPost.title,
+                    RedditPost.selftext,
+                    RedditPost.author,
+                    RedditPost.created_utc,
+                    RedditPost.score,
+                )
+                .join(RedditPost, RedditPost.id == KeywordPosting.doc_id)
+                .filter(
+                    KeywordPosting.term_id == term_id,
+                    KeywordPosting.doc_type == "post",
+                )
+                .order_by(KeywordPosting.doc_id)
+                .limit(limit)
+                .all()
+            )
+            examples = [
+                {
+                    "type": "post",
+                    "subreddit": post.subreddit,
+                    "title": post.title,
+                    "text": post_text(post.title, post.selftext),
+                    "offsets": [int(o) for o in post.offsets.split(",")],
+                    "author": post.author,
+                    "created_utc": post.created_utc,
+                    "score": post.score,
+                }
+                for post in posts
+            ]
+            if len(examples) >= limit:
+                return examples
+
+            comments = (
+                session.query(
+                    KeywordPosting.offsets,
+                    RedditPost.subreddit,
+                    RedditComment.body,
+                    RedditComment.author,
+                    RedditComment.created_utc,
+                    RedditComment.score,
+                )
+                .join(RedditComment, RedditComment.id == KeywordPosting.doc_id)
+                .outerjoin(RedditPost, RedditPost.post_id == RedditComment.post_id)
+                .filter(
+                    KeywordPosting.term_id == term_id,
+                    KeywordPosting.doc_type == "comment",
+                )
+                .order_by(KeywordPosting.doc_id)
+                .limit(limit - len(examples))
+                .all()
+            )
+        return examples + [
+            {
+                "type": "comment",
+                "subreddit": comment.subreddit,
+                "text": comment.body or "",
+                "offsets": [int(o) for o in comment.offsets.split(",")],
+                "author": comment.author,
+                "created_utc": comment.created_utc,
+                "score": comment.score,
+            }
+            for comment in comments
+        ]
+
+    def post_hits(self, terms: List[str], *columns) -> List:
+        """
+        (RedditPost.id, term, *columns) for every post containing one of
+        ``terms``, ordered by post
+        """
+        terms = [self.normalize(term) for term in terms]
+        with self.db_manager.get_session() as session:
+            return (
+                session.query(KeywordPosting.doc_id, KeywordTerm.term, *columns)
+                .join(KeywordTerm, KeywordTerm.id == KeywordPosting.term_id)
+                .join(RedditPost, RedditPost.id == KeywordPosting.doc_id)
+                .filter(KeywordTerm.term.in_(terms), KeywordPosting.doc_type == "post")
+                .order_by(KeywordPosting.doc_id)
+                .all()
+            )
+
+    def document_counts(self, terms: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """{term: {"posts": n, "comments": n}} of indexed terms"""
+        with self.db_manager.get_session() as session:
+            query = session.query(
+                KeywordTerm.term, KeywordPosting.doc_type, func.count(KeywordPosting.id)
+            ).join(KeywordPosting, KeywordPosting.term_id == KeywordTerm.id)
+            if terms is not None:
+                query = query.filter(
+                    KeywordTerm.term.in_([self.normalize(term) for term in terms])
+                )
+            counts: Dict[str, Dict] = {}
+            for term, doc_type, count in query.group_by(
+                KeywordTerm.term, KeywordPosting.doc_type
+            ):
+                counts.setdefault(term, {"posts": 0, "comments": 0})[
+                    f"{doc_type}s"
+                ] = count
+        return counts
@@ -9,17 +9,14 @@ import pickle
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report, confusion_matrix
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
 
 from src.data_persistence import DataPersistenceManager
 from src.database_models import RedditComment, RedditPost
+from src.linear_text_scorer import LinearTextScorer
+from src.model_registry import ModelRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,6 +33,8 @@ class LGBTQContentClassifier:
         self.model = None
         self.vectorizer = None
         self.pipeline = None
+        self.scorer = None
+        self.training_results = None
 
         # LGBTQ+ keywords and identity terms
         self.lgbtq_keywords = self._get_lgbtq_keywords()
@@ -446,8 +445,25 @@ class LGBTQContentClassifier:
 
         return text.strip()
 
-    def train_model(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Train the LGBTQ+ content classification model"""
+    def train_model(
+        self,
+        df: pd.DataFrame,
+        tune: bool = False,
+        search_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Train the LGBTQ+ content classification model
+
+        Args:
+            df: Labelled training data
+            tune: Run a parallel hyperparameter search instead of the default config
+            search_kwargs: Options passed to search_hyperparameters()
+        """
+        from sklearn.metrics import classification_report, confusion_matrix
+        from sklearn.model_selection import train_test_split
+
+        from src.model_training import build_text_pipeline, search_hyperparameters
+
         logger.info("Training LGBTQ+ content classifier...")
 
         # Preprocess text
@@ -476,28 +492,15 @@ class LGBTQContentClassifier:
             X, y, test_size=0.2, random_state=42, stratify=y
         )
 
-        # Create ML pipeline
-        self.pipeline = Pipeline(
-            [
-                (
-                    "tfidf",
-                    TfidfVectorizer(
-                        max_features=5000,
-                        ngram_range=(1, 2),
-                        stop_words="english",
-                        min_df=2,
-                        max_df=0.8,
-                    ),
-                ),
-                (
-                    "classifier",
-                    LogisticRegression(random_state=42, class_weight="balanced"),
-                ),
-            ]
-        )
-
-        # Train the model
-        self.pipeline.fit(X_train, y_train)
+        # Train the model, optionally searching for a faster/more accurate config
+        search_summary = None
+        if tune:
+            self.pipeline, search_summary = search_hyperparameters(
+                X_train, y_train, **(search_kwargs or {})
+            )
+        else:
+            self.pipeline = build_text_pipeline()
+            self.pipeline.fit(X_train, y_train)
 
         # Evaluate
         train_score = self.pipeline.score(X_train, y_train)
@@ -524,6 +527,10 @@ class LGBTQContentClassifier:
             },
         }
 
+        if search_summary:
+            results["hyperparameter_search"] = search_summary
+        self.training_results = results
+
         logger.info(f"Training completed - Test Accuracy: {test_score:.3f}")
         logger.info(f"Classification Report:\n{classification_report(y_test, y_pred)}")
 
@@ -531,12 +538,13 @@ class LGBTQContentClassifier:
 
     def predict_lgbtq_content(self, texts: List[str]) -> List[Dict[str, Any]]:
         """Predict whether texts are LGBTQ+-related with context awareness"""
-        if not self.pipeline:
+        model = self.pipeline or self.scorer
+        if not model:
             raise ValueError("Model not trained yet. Call train_model() first.")
 
         processed_texts = [self.preprocess_text(text) for text in texts]
-        predictions = self.pipeline.predict(processed_texts)
-        probabilities = self.pipeline.predict_proba(processed_texts)
+        predictions = model.predict(processed_texts)
+        probabilities = model.predict_proba(processed_texts)
 
         results = []
         for i, (text, pred, prob) in enumerate(zip(texts, predictions, probabilities)):
@@ -570,12 +578,15 @@ class LGBTQContentClassifier:
 
     def get_top_lgbtq_features(self, n: int = 20) -> List[Tuple[str, float]]:
         """Get the most important features for LGBTQ+ classification"""
-        if not self.pipeline:
+        if self.pipeline:
+            feature_names = self.pipeline.named_steps["tfidf"].get_feature_names_out()
+            coefficients = self.pipeline.named_steps["classifier"].coef_[0]
+        elif self.scorer:
+            feature_names = self.scorer.feature_names
+            coefficients = self.scorer.coef
+        else:
             return []
 
-        feature_names = self.pipeline.named_steps["tfidf"].get_feature_names_out()
-        coefficients = self.pipeline.named_steps["classifier"].coef_[0]
-
         # Get top positive coefficients (LGBTQ+-related features)
         feature_importance = list(zip(feature_names, coefficients))
         feature_importance.sort(key=lambda x: x[1], reverse=True)
@@ -597,7 +608,44 @@ class LGBTQContentClassifier:
         with open(filepath, "wb") as f:
             pickle.dump(model_data, f)
 
-        logger.info(f"Model saved to {filepath}")
+        # Export a lightweight scorer so dashboards can skip sklearn entirely
+        scorer_path = Path(filepath).with_suffix(".npz")
+        LinearTextScorer.from_pipeline(
+            self.pipeline,
+            metadata={
+                "trained_at": model_data["trained_at"],
+                "lgbtq_keywords": self.lgbtq_keywords,
+                "identity_terms": self.identity_terms,
+                "context_indicators": self.context_indicators,
+            },
+        ).save(str(scorer_path))
+
+        if self.training_results:
+            self._register_metrics(filepath, model_data["trained_at"])
+
+        logger.info(f"Model saved to {filepath} (scorer: {scorer_path})")
+
+    def _register_metrics(self, filepath: str, trained_at: str):
+        """Record the latest training metrics in the model registry"""
+        results = self.training_results
+        report = results["classification_report"]
+        search = results.get("hyperparameter_search")
+
+        ModelRegistry(str(Path(filepath).parent / "registry.json")).record(
+            Path(filepath).stem,
+            {
+                "model_path": filepath,
+                "trained_at": trained_at,
+                "training_accuracy": float(results["train_accuracy"]),
+                "test_accuracy": float(results["test_accuracy"]),
+                "macro_f1": float(report["macro avg"]["f1-score"]),
+                "feature_count": int(results["feature_count"]),
+                "training_samples": int(results["training_samples"]),
+                "test_samples": int(results["test_samples"]),
+                "params": search["best_params"] if search else None,
+                "hyperparameter_search": search,
+            },
+        )
 
     def load_model(self, filepath: str = "models/lgbtq_classifier.pkl"):
         """Load a trained model"""
@@ -611,8 +659,22 @@ class LGBTQContentClassifier:
 
         logger.info(f"Model loaded from {filepath}")
 
+    def load_scorer(self, filepath: str = "models/lgbtq_classifier.npz"):
+        """Load the exported inference-only scorer (no sklearn import)"""
+        self.scorer = LinearTextScorer.load(filepath)
+        metadata = self.scorer.metadata
+        self.lgbtq_keywords = metadata.get("lgbtq_keywords", self.lgbtq_keywords)
+        self.identity_terms = metadata.get("identity_terms", self.identity_terms)
+        self.context_indicators = metadata.get(
+            "context_indicators", self.context_indicators
+        )
 
-def train_lgbtq_classifier():
+        logger.info(f"Scorer loaded from {filepath}")
+
+
+def train_lgbtq_classifier(
+    tune: bool = False, search_kwargs: Optional[Dict[str, Any]] = None
+):
     """Main function to train the LGBTQ+ content classifier"""
     logger.info("🏳️‍🌈 Starting LGBTQ+ Content Classifier Training")
     logger.info("=" * 50)
@@ -630,7 +692,7 @@ def train_lgbtq_classifier():
     df = classifier.create_lgbtq_labels(df)
 
     # Train model
-    results = classifier.train_model(df)
+    results = classifier.train_model(df, tune=tune, search_kwargs=search_kwargs)
 
     # Save model
     classifier.save_model()
@@ -643,6 +705,18 @@ def train_lgbtq_classifier():
     print(f"Test Samples: {results['test_samples']}")
     print(f"Features Used: {results['feature_count']}")
 
+    if "hyperparameter_search" in results:
+        search = results["hyperparameter_search"]
+        print(f"\n🔧 Selected Parameters: {search['best_params']}")
+        print(f"Candidates Evaluated: {search['candidates_evaluated']}")
+        for candidate in search["candidates"][:5]:
+            print(
+                f"  CV {candidate['mean_cv_score']:.3f} | "
+                f"fit {candidate['mean_fit_time']:.2f}s | "
+                f"score {candidate['score_ms_per_1k_docs']:.1f}ms/1k docs | "
+                f"{candidate['params']}"
+            )
+
     print("\nClass Distribution:")
     print(f"  LGBTQ+-related: {results['class_distribution']['lgbtq_related']}")
     print(f"  General: {results['class_distribution']['general']}")
@@ -677,4 +751,20 @@ def train_lgbtq_classifier():
 
 
 if __name__ == "__main__":
-    train_lgbtq_classifier()
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--tune", action="store_true", help="Run a hyperparameter search"
+    )
+    parser.add_argument(
+        "--search", choices=["grid", "random"], default="grid", help="Search strategy"
+    )
+    parser.add_argument(
+        "--n-jobs", type=int, default=-1, help="Parallel workers for the search"
+    )
+    args = parser.parse_args()
+
+    train_lgbtq_classifier(
+        tune=args.tune, search_kwargs={"search": args.search, "n_jobs": args.n_jobs}
+    )
@@ -0,0 +1,215 @@
+"""
+Inference-only scorer for the TF-IDF + logistic regression content classifiers
+Reproduces the sklearn pipeline with plain NumPy so dashboards can score text
+without importing scikit-learn
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class LinearTextScorer:
+    """
+    Scores text with an exported TF-IDF vocabulary, IDF weights and
+    logistic regression coefficients
+
+    Documents are vectorized into CSR-style (row, column, value) arrays and
+    every row operation (L2 norm, dot product) is a single ``np.bincount``
+    over those arrays, in the same order scipy uses for the sklearn pipeline.
+    """
+
+    def __init__(
+        self,
+        feature_names: np.ndarray,
+        idf: np.ndarray,
+        coef: np.ndarray,
+        intercept: float,
+        classes: np.ndarray,
+        token_pattern: str = r"(?u)\b\w\w+\b",
+        ngram_range: tuple = (1, 1),
+        stop_words: Optional[List[str]] = None,
+        lowercase: bool = True,
+        sublinear_tf: bool = False,
+        norm: Optional[str] = "l2",
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.feature_names = np.asarray(feature_names)
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.classes = np.asarray(classes)
+        self.token_pattern = token_pattern
+        self.ngram_range = (int(ngram_range[0]), int(ngram_range[1]))
+        self.stop_words = frozenset(stop_words or [])
+        self.lowercase = bool(lowercase)
+        self.sublinear_tf = bool(sublinear_tf)
+        self.norm = norm or None
+        self.metadata = metadata or {}
+
+        if norm not in (None, "", "l2"):
+            raise ValueError(f"Unsupported TF-IDF norm: {norm}")
+
+        self.vocabulary = {
+            term: index for index, term in enumerate(self.feature_names.tolist())
+        }
+        self._token_regex = re.compile(self.token_pattern)
+
+    @classmethod
+    def from_pipeline(
+        cls, pipeline, metadata: Optional[Dict[str, Any]] = None
+    ) -> "LinearTextScorer":
+        """Export the fitted parameters of a tfidf + classifier Pipeline"""
+        vectorizer = pipeline.named_steps["tfidf"]
+        classifier = pipeline.named_steps["classifier"]
+
+        if (
+            vectorizer.analyzer != "word"
+            or vectorizer.tokenizer is not None
+            or vectorizer.preprocessor is not None
+            or vectorizer.strip_accents is not None
+        ):
+            raise ValueError("Only default word analyzers can be exported")
+
+        if classifier.coef_.shape[0] != 1:
+            raise ValueError("Only binary classifiers can be exported")
+
+        stop_words = vectorizer.get_stop_words()
+
+        return cls(
+            feature_names=vectorizer.get_feature_names_out(),
+            idf=vectorizer.idf_,
+            coef=classifier.coef_[0],
+            intercept=classifier.intercept_[0],
+            classes=classifier.classes_,
+            token_pattern=vectorizer.token_pattern,
+            ngram_range=vectorizer.ngram_range,
+            stop_words=sorted(stop_words) if stop_words else None,
+            lowercase=vectorizer.lowercase,
+            sublinear_tf=vectorizer.sublinear_tf,
+            norm=vectorizer.norm,
+            metadata=metadata,
+        )
+
+    def save(self, filepath: str) -> None:
+        """Save the scorer parameters to a compressed .npz file"""
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+        np.savez_compressed(
+            filepath,
+            feature_names=self.feature_names.astype(str),
+            idf=self.idf,
+            coef=self.coef,
+            intercept=np.array(self.intercept),
+            classes=self.classes,
+            token_pattern=np.array(self.token_pattern),
+            ngram_range=np.array(self.ngram_range),
+            stop_words=np.array(sorted(self.stop_words), dtype=str),
+            lowercase=np.array(self.lowercase),
+            sublinear_tf=np.array(self.sublinear_tf),
+            norm=np.array(self.norm or ""),
+            metadata=np.array(json.dumps(self.metadata, default=str)),
+        )
+
+    @classmethod
+    def load(cls, filepath: str) -> "LinearTextScorer":
+        """Load scorer parameters saved with save()"""
+        with np.load(filepath, allow_pickle=False) as data:
+            return cls(
+                feature_names=data["feature_names"],
+                idf=data["idf"],
+                coef=data["coef"],
+                intercept=data["intercept"].item(),
+                classes=data["classes"],
+                token_pattern=data["token_pattern"].item(),
+                ngram_range=tuple(data["ngram_range"].tolist()),
+                stop_words=data["stop_words"].tolist(),
+                lowercase=data["lowercase"].item(),
+                sublinear_tf=data["sublinear_tf"].item(),
+                norm=data["norm"].item(),
+                metadata=json.loads(data["metadata"].item()),
+            )
+
+    def _analyze(self, text: str) -> List[str]:
+        """Tokenize text into word n-grams the way TfidfVectorizer does"""
+        if self.lowercase:
+            text = text.lower()
+
+        tokens = self._token_regex.findall(text)
+        if self.stop_words:
+            tokens = [token for token in tokens if token not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            terms.extend(
+                " ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)
+            )
+        return terms
+
+    def transform(self, texts: List[str]):
+        """
+        Vectorize texts into normalized TF-IDF weights
+
+        Returns:
+            Tuple of (rows, columns, values) sorted by row then column
+        """
+        n_features = len(self.feature_names)
+        vocabulary = self.vocabulary
+
+        row_ids = []
+        col_ids = []
+        for row, text in enumerate(texts):
+            columns = [
+                vocabulary[term]
+                for term in self._analyze(text or "")
+                if term in vocabulary
+            ]
+            row_ids.append(np.full(len(columns), row, dtype=np.int64))
+            col_ids.append(np.asarray(columns, dtype=np.int64))
+
+        if not row_ids:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float64)
+
+        # Count repeated terms per document with one sort over (row, column) keys
+        keys = np.concatenate(row_ids) * n_features + np.concatenate(col_ids)
+        keys, counts = np.unique(keys, return_counts=True)
+        rows = keys // n_features
+        cols = keys % n_features
+
+        values = counts.astype(np.float64)
+        if self.sublinear_tf:
+            values = np.log(values) + 1
+        values *= self.idf[cols]
+
+        if self.norm == "l2":
+            norms = np.sqrt(np.bincount(rows, weights=values * values))
+            row_norms = norms[rows]
+            nonzero = row_norms != 0
+            values[nonzero] /= row_norms[nonzero]
+
+        return rows, cols, values
+
+    def decision_function(self, texts: List[str]) -> np.ndarray:
+        """Logistic regression decision scores for each text"""
+        rows, cols, values = self.transform(texts)
+        scores = np.bincount(
+            rows, weights=values * self.coef[cols], minlength=len(texts)
+        )
+        return scores + self.intercept
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Class probabilities in the order of ``classes``"""
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        """Predicted class labels"""
+        return self.classes[(self.decision_function(texts) > 0).astype(int)]
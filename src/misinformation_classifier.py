@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Multi-output misinformation classifier
+Learns annotation category, severity level and health topic from the human
+annotations in PostAnnotation / MisinformationSeverity and triages posts
+"""
+
+import pickle
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from sqlalchemy import func
+
+from config.settings import Config
+from src.database_models import (
+    MisinformationPrediction,
+    MisinformationSeverity,
+    PostAnnotation,
+    RedditPost,
+)
+from src.model_registry import ModelRegistry
+
+# Category whose probability is written to RedditPost.misinformation_score
+MISINFORMATION_CATEGORY = "Misinformation"
+
+# Output heads and the annotation columns they learn from
+TARGETS = ["category", "severity_level", "health_topic"]
+
+# Severity levels at or above this are logged as urgent during triage
+HIGH_SEVERITY_LEVEL = 4
+
+
+def post_text(title: Optional[str], selftext: Optional[str], translation=None) -> str:
+    """Text used for features: original post plus its English translation"""
+    return f"{title or ''} {selftext or ''} {translation or ''}".strip()
+
+
+class MisinformationClassifier:
+    """
+    Category, severity and topic heads over one shared TF-IDF vectorizer
+
+    Each head is trained only on annotations that have its label, and posts
+    are vectorized once per batch and scored by every head.
+    """
+
+    def __init__(self, db_manager=None, min_class_samples: int = 2):
+        if db_manager is None:
+            from src.data_persistence import DataPersistenceManager
+
+            db_manager = DataPersistenceManager()
+
+        self.db_manager = db_manager
+        self.min_class_samples = min_class_samples
+        self.vectorizer = None
+        self.heads = {}
+        self.annotation_watermark = 0
+        self.trained_at = None
+        self.training_results = None
+
+    def load_annotations(self) -> pd.DataFrame:
+        """Annotated posts with their category, severity and topic labels"""
+        with self.db_manager.get_session() as session:
+            rows = (
+                session.query(
+                    PostAnnotation.id.label("annotation_id"),
+                    PostAnnotation.category,
+                    func.coalesce(
+                        PostAnnotation.severity_level,
+                        MisinformationSeverity.severity_level,
+                    ).label("severity_level"),
+                    MisinformationSeverity.health_topic,
+                    RedditPost.title,
+                    RedditPost.selftext,
+                    RedditPost.english_translation,
+                )
+                .join(RedditPost, RedditPost.post_id == PostAnnotation.post_id)
+                .outerjoin(
+                    MisinformationSeverity,
+                    MisinformationSeverity.annotation_id == PostAnnotation.id,
+                )
+                .all()
+            )
+
+        df = pd.DataFrame(
+            rows,
+            columns=[
+                "annotation_id",
+                "category",
+                "severity_level",
+                "health_topic",
+                "title",
+                "selftext",
+                "english_translation",
+            ],
+        )
+        df["text"] = [
+            post_text(title, selftext, translation)
+            for title, selftext, translation in zip(
+                df["title"], df["selftext"], df["english_translation"]
+            )
+        ]
+        df["health_topic"] = df["health_topic"].replace("", None)
+
+        logger.info(f"Loaded {len(df)} annotations for training")
+        return df
+
+    def train_model(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Fit the shared vectorizer and one classifier per annotated target"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.metrics import classification_report
+        from sklearn.model_selection import train_test_split
+
+        if df.empty:
+            raise ValueError("No annotations available for training")
+
+        logger.info("Training multi-output misinformation classifier...")
+
+        self.vectorizer = TfidfVectorizer(
+            max_features=20000, ngram_range=(1, 2), sublinear_tf=True
+        )
+        X = self.vectorizer.fit_transform(df["text"])
+
+        self.heads = {}
+        results = {"targets": {}, "training_samples": len(df)}
+        for target in TARGETS:
+            labels = df[target]
+            mask = labels.notna().to_numpy()
+            y = labels[mask].astype(int if target == "severity_level" else str)
+
+            counts = y.value_counts()
+            y_mask = y.isin(counts[counts >= self.min_class_samples].index)
+            if y_mask.sum() == 0 or y[y_mask].nunique() < 2:
+                logger.warning(f"Not enough labelled classes to train {target} head")
+                continue
+
+            X_target = X[np.flatnonzero(mask)[y_mask.to_numpy()]]
+            y = y[y_mask].to_numpy()
+
+            head = LogisticRegression(class_weight="balanced", max_iter=1000)
+            # Hold-out metrics need at least one test example per class
+            if len(y) * 0.2 >= len(np.unique(y)):
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X_target, y, test_size=0.2, random_state=42, stratify=y
+                )
+                head.fit(X_train, y_train)
+                report = classification_report(
+                    y_test, head.predict(X_test), output_dict=True, zero_division=0
+                )
+                results["targets"][target] = {
+                    "test_accuracy": report["accuracy"],
+                    "macro_f1": report["macro avg"]["f1-score"],
+                    "samples": len(y),
+                }
+
+            # Final head uses every labelled annotation
+            head.fit(X_target, y)
+            self.heads[target] = head
+            results["targets"].setdefault(target, {"samples": len(y)})
+
+        self.annotation_watermark = int(df["annotation_id"].max())
+        self.trained_at = datetime.now().isoformat()
+        self.training_results = results
+
+        logger.info(f"Trained heads: {', '.join(self.heads) or 'none'}")
+        return results
+
+    def predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Predict category, severity and topic for a batch of texts"""
+        if self.vectorizer is None:
+            raise ValueError("Model not trained yet. Call train_model() first.")
+
+        X = self.vectorizer.transform(texts)
+        predictions = [{} for _ in texts]
+
+        for target, head in self.heads.items():
+            probabilities = head.predict_proba(X)
+            best = probabilities.argmax(axis=1)
+            for prediction, index, row in zip(predictions, best, probabilities):
+                label = head.classes_[index]
+                prediction[target] = label.item() if hasattr(label, "item") else label
+                prediction[f"{target}_confidence"] = float(row[index])
+
+            if target == "category":
+                classes = list(head.classes_)
+                if MISINFORMATION_CATEGORY in classes:
+                    column = probabilities[:, classes.index(MISINFORMATION_CATEGORY)]
+                    for prediction, score in zip(predictions, column):
+                        prediction["misinformation_score"] = float(score)
+
+        # Severity and topic are only annotated for misinformation
+        if "category" in self.heads:
+            for prediction in predictions:
+                if prediction["category"] != MISINFORMATION_CATEGORY:
+                    for target in ("severity_level", "health_topic"):
+                        prediction.pop(target, None)
+                        prediction.pop(f"{target}_confidence", None)
+
+        return predictions
+
+    def score_posts(
+        self,
+        post_ids: Optional[List[str]] = None,
+        only_unscored: bool = False,
+        batch_size: int = 1000,
+    ) -> Dict[str, int]:
+        """
+        Score posts in batches and store the results
+
+        Writes RedditPost.misinformation_score, upserts the full prediction
+        into misinformation_predictions, re-ranks the rescored posts that
+        are in the annotation queue and bumps the data version.
+        """
+        from src.active_learning import AnnotationQueue
+
+        stats = {"scored": 0, "high_severity": 0}
+        queue = AnnotationQueue(db_manager=self.db_manager)
+
+        with self.db_manager.get_session() as session:
+            query = session.query(
+                RedditPost.id,
+                RedditPost.post_id,
+                RedditPost.title,
+                RedditPost.selftext,
+                RedditPost.english_translation,
+            )
+            if post_ids is not None:
+                query = query.filter(RedditPost.post_id.in_(post_ids))
+            if only_unscored:
+                query = query.filter(RedditPost.misinformation_score.is_(None))
+
+            # Keyset batches on the primary key so each commit stays small
+            last_id = 0
+            while True:
+                batch = (
+                    query.filter(RedditPost.id > last_id)
+                    .order_by(RedditPost.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not batch:
+                    break
+
+                batch_stats = self._store_batch(session, batch)
+                stats["scored"] += batch_stats["scored"]
+                stats["high_severity"] += batch_stats["high_severity"]
+                session.commit()
+                queue.refresh(post_ids=[row.post_id for row in batch])
+                last_id = batch[-1].id
+
+        # Scores feed cached analytics; computed results are now stale
+        if stats["scored"]:
+            self.db_manager.bump_data_version()
+
+        logger.info(
+            f"Scored {stats['scored']} posts "
+            f"({stats['high_severity']} at severity {HIGH_SEVERITY_LEVEL}+)"
+        )
+        return stats
+
+    def _store_batch(self, session, rows: List[Any]) -> Dict[str, int]:
+        """Predict one batch and write the results with bulk statements"""
+        predictions = self.predict(
+            [post_text(r.title, r.selftext, r.english_translation) for r in rows]
+        )
+
+        existing = dict(
+            session.query(
+                MisinformationPrediction.post_id, MisinformationPrediction.id
+            ).filter(MisinformationPrediction.post_id.in_([r.post_id for r in rows]))
+        )
+
+        now = datetime.utcnow()
+        post_updates, inserts, updates = [], [], []
+        high_severity = 0
+        for row, prediction in zip(rows, predictions):
+            score = prediction.get("misinformation_score")
+            post_updates.append({"id": row.id, "misinformation_score": score})
+
+            severity = prediction.get("severity_level")
+            if severity is not None and severity >= HIGH_SEVERITY_LEVEL:
+                high_severity += 1
+
+            values = {
+                "post_id": row.post_id,
+                "category": prediction.get("category"),
+                "category_confidence": prediction.get("category_confidence"),
+                "severity_level": severity,
+                "severity_confidence": prediction.get("severity_level_confidence"),
+                "health_topic": prediction.get("health_topic"),
+                "misinformation_score": score,
+                "model_version": self.trained_at,
+                "scored_at": now,
+            }
+
+            if row.post_id in existing:
+                updates.append({"id": existing[row.post_id], **values})
+            else:
+                inserts.append(values)
+
+        session.bulk_update_mappings(RedditPost, post_updates)
+        if inserts:
+            session.bulk_insert_mappings(MisinformationPrediction, inserts)
+        if updates:
+            session.bulk_update_mappings(MisinformationPrediction, updates)
+
+        return {"scored": len(rows), "high_severity": high_severity}
+
+    def new_annotation_count(self) -> int:
+        """Annotations added since the current model was trained"""
+        with self.db_manager.get_session() as session:
+            return (
+                session.query(func.count(PostAnnotation.id))
+                .filter(PostAnnotation.id > self.annotation_watermark)
+                .scalar()
+            )
+
+    def retrain_if_needed(
+        self,
+        min_new_annotations: Optional[int] = None,
+        filepath: Optional[str] = None,
+    ) -> bool:
+        """
+        Retrain, save and rescore all posts once enough new annotations exist
+
+        Returns:
+            True if the model was retrained
+        """
+        min_new_annotations = (
+            Config.RETRAIN_MIN_NEW_ANNOTATIONS
+            if min_new_annotations is None
+            else min_new_annotations
+        )
+
+        new_annotations = self.new_annotation_count()
+        if self.vectorizer is not None and new_annotations < min_new_annotations:
+            logger.info(
+                f"{new_annotations} new annotations, waiting for "
+                f"{min_new_annotations} before retraining"
+            )
+            return False
+
+        annotations = self.load_annotations()
+        categories = annotations["category"].value_counts()
+        if (categories >= self.min_class_samples).sum() < 2:
+            logger.info(
+                f"{len(annotations)} annotations, need at least "
+                f"{self.min_class_samples} in each of two categories to train"
+            )
+            return False
+
+        self.train_model(annotations)
+        self.save_model(filepath)
+        self.score_posts()
+        return True
+
+    def save_model(self, filepath: Optional[str] = None):
+        """Save the trained model"""
+        filepath = filepath or Config.TRIAGE_MODEL_PATH
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+        model_data = {
+            "vectorizer": self.vectorizer,
+            "heads": self.heads,
+            "annotation_watermark": self.annotation_watermark,
+            "trained_at": self.trained_at,
+            "training_results": self.training_results,
+        }
+
+        with open(filepath, "wb") as f:
+            pickle.dump(model_data, f)
+
+        if self.training_results:
+            ModelRegistry(str(Path(filepath).parent / "registry.json")).record(
+                Path(filepath).stem,
+                {
+                    "model_path": filepath,
+                    "trained_at": self.trained_at,
+                    "feature_count": len(self.vectorizer.vocabulary_),
+                    "training_samples": self.training_results["training_samples"],
+                    "annotation_watermark": self.annotation_watermark,
+                    "targets": self.training_results["targets"],
+                },
+            )
+
+        logger.info(f"Misinformation classifier saved to {filepath}")
+
+    def load_model(self, filepath: Optional[str] = None):
+        """Load a trained model"""
+        filepath = filepath or Config.TRIAGE_MODEL_PATH
+        with open(filepath, "rb") as f:
+            model_data = pickle.load(f)
+
+        self.vectorizer = model_data["vectorizer"]
+        self.heads = model_data["heads"]
+        self.annotation_watermark = model_data["annotation_watermark"]
+        self.trained_at = model_data["trained_at"]
+        self.training_results = model_data.get("training_results")
+
+        logger.info(f"Misinformation classifier loaded from {filepath}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force", action="store_true", help="Retrain even without new annotations"
+    )
+    args = parser.parse_args()
+
+    classifier = MisinformationClassifier()
+    if Path(Config.TRIAGE_MODEL_PATH).exists():
+        classifier.load_model()
+
+    retrained = classifier.retrain_if_needed(
+        min_new_annotations=0 if args.force else None
+    )
+    if retrained:
+        for target, metrics in classifier.training_results["targets"].items():
+            accuracy = metrics.get("test_accuracy")
+            summary = f"{accuracy:.3f}" if accuracy is not None else "n/a"
+            print(f"🎯 {target}: {metrics['samples']} samples, test accuracy {summary}")
@@ -0,0 +1,60 @@
+"""
+Model registry for trained content classifiers
+Records training metrics in a JSON file next to the saved models so that
+dashboards can report real numbers without loading sklearn
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+
+class ModelRegistry:
+    """JSON-backed history of training runs, keyed by model name"""
+
+    def __init__(self, registry_path: str = "models/registry.json"):
+        self.registry_path = Path(registry_path)
+
+    def _read(self) -> Dict[str, List[Dict[str, Any]]]:
+        if not self.registry_path.exists():
+            return {}
+
+        try:
+            with open(self.registry_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read model registry {self.registry_path}: {e}")
+            return {}
+
+    def record(self, model_name: str, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Append a training run for a model and return the stored entry"""
+        entry = {"registered_at": datetime.now().isoformat(), **metrics}
+
+        registry = self._read()
+        registry.setdefault(model_name, []).append(entry)
+
+        # Write to a temp file and swap it in so readers never see partial JSON
+        self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.registry_path.parent, suffix=".json.tmp"
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(registry, f, indent=2, default=str)
+        os.replace(tmp_path, self.registry_path)
+
+        logger.info(f"Registered {model_name} metrics in {self.registry_path}")
+        return entry
+
+    def get(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """Most recent training run for a model, or None if never registered"""
+        runs = self._read().get(model_name)
+        return runs[-1] if runs else None
+
+    def history(self, model_name: str) -> List[Dict[str, Any]]:
+        """All recorded training runs for a model, oldest first"""
+        return self._read().get(model_name, [])
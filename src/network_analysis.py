@@ -3,13 +3,20 @@ Network analysis module for health misinformation research
 """
 
 import networkx as nx
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
 from datetime import datetime
 import plotly.graph_objects as go
 from loguru import logger
+from config.settings import Config
+from sqlalchemy import func, select, union, union_all
+from sqlalchemy.orm import aliased
 from src.data_persistence import DataPersistenceManager
+from src.graph_layout import GraphLayoutService
+from src.graph_metrics import GraphMetricsCache
+from src.interaction_graph import InteractionGraphStore
 from src.database_models import RedditPost, RedditComment
 
 
@@ -58,121 +65,252 @@ class MisinformationNetwork:
         logger.info(f"Loaded {len(posts)} posts and {len(comments)} comments")
 
 
+# Edge count above which network plots switch to WebGL (Scattergl) traces
+WEBGL_EDGE_THRESHOLD = 5000
+
+
+def edge_segments(
+    coordinates: np.ndarray, sources: np.ndarray, targets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Line-segment arrays for a plotly edge trace
+
+    Each edge becomes (x0, x1, NaN) / (y0, y1, NaN), the NaN breaking the
+    line between consecutive edges.
+    """
+    gap = np.full(len(sources), np.nan)
+    edge_x = np.column_stack([coordinates[sources, 0], coordinates[targets, 0], gap])
+    edge_y = np.column_stack([coordinates[sources, 1], coordinates[targets, 1], gap])
+    return edge_x.ravel(), edge_y.ravel()
+
+
 class NetworkAnalyzer:
     """Enhanced network analyzer for research-grade analysis"""
 
-    def __init__(self):
-        self.db_manager = DataPersistenceManager()
+    def __init__(self, db_manager: Optional[DataPersistenceManager] = None):
+        self.db_manager = db_manager or DataPersistenceManager()
         self.graph = nx.DiGraph()
+        self.posts_df = None
+        self.comments_df = None
 
-    def build_user_network(self, subreddit_filter: Optional[str] = None) -> Dict:
-        """Build user interaction network from database"""
-        with self.db_manager.get_session() as session:
-            # Load posts and comments
-            posts_query = session.query(RedditPost)
-            if subreddit_filter:
-                posts_query = posts_query.filter(
-                    RedditPost.subreddit == subreddit_filter
+        # Bumped whenever self.graph is rebuilt; keys the metrics cache
+        self.graph_version = 0
+        self.metrics = GraphMetricsCache(engine=Config.GRAPH_ENGINE)
+        self.interaction_graph = InteractionGraphStore(db_manager=self.db_manager)
+        self.layout = GraphLayoutService(max_nodes=Config.MAX_DISPLAY_NODES)
+
+        # (store version, filters) self.graph was loaded from, if any
+        self._graph_source = None
+
+    def build_user_network(
+        self,
+        subreddit_filter: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        display: bool = True,
+    ) -> Dict:
+        """
+        Build user interaction network from database
+
+        The graph is read from the materialized interaction graph, which
+        ingest and the interaction-graph command keep up to date. Filters
+        apply to the post's subreddit and the comment's timestamp. Date
+        filters that are not whole days, or a graph that was never built,
+        fall back to aggregating edges (commenter -> post author and
+        commenter -> parent comment author) directly from the comments in SQL.
+
+        With ``display`` the result is capped to the top MAX_DISPLAY_NODES
+        nodes for rendering; pass ``display=False`` for the full network.
+        """
+        version = self.interaction_graph.version()
+        if version and self.interaction_graph.covers(start_date, end_date):
+            source = (
+                version,
+                subreddit_filter,
+                start_date,
+                end_date,
+            )
+            # Unchanged data keeps the graph version, so cached metrics and
+            # layouts are reused
+            if source != self._graph_source:
+                self.graph = self.interaction_graph.load_graph(
+                    subreddit_filter, start_date, end_date
                 )
-            posts = posts_query.all()
-
-            comments_query = session.query(RedditComment)
-            if subreddit_filter:
-                # Join with posts to filter comments by subreddit
-                comments_query = comments_query.join(
-                    RedditPost, RedditComment.post_id == RedditPost.post_id
-                ).filter(RedditPost.subreddit == subreddit_filter)
-            comments = comments_query.all()
-
-            if not posts and not comments:
-                return {"nodes": [], "edges": []}
-
-            # Build graph
-            self.graph.clear()
-
-            # Add nodes for users
-            users = set()
-            post_authors = {post.post_id: post.author for post in posts if post.author}
-
-            for post in posts:
-                if post.author and post.author != "[deleted]":
-                    users.add(post.author)
-
-            for comment in comments:
-                if comment.author and comment.author != "[deleted]":
-                    users.add(comment.author)
-
-            self.graph.add_nodes_from(users)
-
-            # Add edges for interactions
-            for comment in comments:
-                if not comment.author or comment.author == "[deleted]":
-                    continue
-
-                post_author = post_authors.get(comment.post_id)
-                if (
-                    post_author
-                    and post_author != "[deleted]"
-                    and post_author != comment.author
-                ):
-                    if self.graph.has_edge(comment.author, post_author):
-                        self.graph[comment.author][post_author]["weight"] += 1
-                    else:
-                        self.graph.add_edge(comment.author, post_author, weight=1)
-
-            # Convert to visualization format
-            return self._graph_to_vis_data()
-
-    def _graph_to_vis_data(self) -> Dict:
-        """Convert NetworkX graph to visualization data"""
+                self.graph_version += 1
+                self._graph_source = source
+        else:
+            self._build_user_network_from_comments(
+                subreddit_filter, start_date, end_date
+            )
+            self.graph_version += 1
+            self._graph_source = None
+
         if not self.graph.nodes():
             return {"nodes": [], "edges": []}
 
-        # Calculate layout using spring algorithm
-        pos = nx.spring_layout(self.graph, k=1, iterations=50)
+        # Convert to visualization format
+        return self._graph_to_vis_data(display)
+
+    def _build_user_network_from_comments(
+        self,
+        subreddit_filter: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        language_filter: Optional[str] = None,
+    ) -> None:
+        """Rebuild self.graph by aggregating interaction edges in SQL"""
+        with self.db_manager.get_session() as session:
+            edge_rows, user_rows = self._interaction_edge_queries(
+                subreddit_filter, start_date, end_date, language_filter
+            )
+
+            self.graph = nx.DiGraph()
+            self.graph.add_nodes_from(
+                author for (author,) in session.execute(user_rows).yield_per(10000)
+            )
+            self.graph.add_weighted_edges_from(
+                (source, target, int(weight))
+                for source, target, weight in session.execute(edge_rows).yield_per(
+                    10000
+                )
+            )
+
+    def _interaction_edge_queries(
+        self,
+        subreddit_filter: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        language_filter: Optional[str] = None,
+    ):
+        """
+        SQL for aggregated interaction edges and the matching user set
+
+        ``language_filter`` keeps comments (and posts, for the user set)
+        detected in that language.
+        """
+        comment = aliased(RedditComment)
+        parent = aliased(RedditComment)
+        post = aliased(RedditPost)
+
+        conditions = [comment.author.isnot(None)]
+        if subreddit_filter:
+            conditions.append(post.subreddit == subreddit_filter)
+        if start_date:
+            conditions.append(comment.created_utc >= start_date)
+        if end_date:
+            conditions.append(comment.created_utc < end_date)
+        if language_filter:
+            conditions.append(comment.language == language_filter)
+
+        post_edges = (
+            select(comment.author.label("source"), post.author.label("target"))
+            .join(post, comment.post_id == post.post_id)
+            .where(*conditions)
+        )
+
+        # parent_id is "t1_<comment_id>" for replies to comments
+        reply_edges = (
+            select(comment.author.label("source"), parent.author.label("target"))
+            .join(parent, parent.comment_id == func.substr(comment.parent_id, 4))
+            .join(post, comment.post_id == post.post_id)
+            .where(comment.parent_id.like("t1_%"), *conditions)
+        )
+
+        interactions = union_all(post_edges, reply_edges).subquery()
+        edge_rows = (
+            select(
+                interactions.c.source,
+                interactions.c.target,
+                func.count().label("weight"),
+            )
+            .where(
+                interactions.c.target.isnot(None),
+                interactions.c.source != "[deleted]",
+                interactions.c.target != "[deleted]",
+                interactions.c.source != interactions.c.target,
+            )
+            .group_by(interactions.c.source, interactions.c.target)
+        )
+
+        # Users appear even without interactions, as in the full-load version
+        post_conditions = [post.author.isnot(None), post.author != "[deleted]"]
+        if subreddit_filter:
+            post_conditions.append(post.subreddit == subreddit_filter)
+        if start_date:
+            post_conditions.append(post.created_utc >= start_date)
+        if end_date:
+            post_conditions.append(post.created_utc < end_date)
+        if language_filter:
+            post_conditions.append(post.language == language_filter)
+
+        user_rows = union(
+            select(post.author).where(*post_conditions),
+            select(comment.author)
+            .join(post, comment.post_id == post.post_id)
+            .where(comment.author != "[deleted]", *conditions),
+        )
+
+        return edge_rows, user_rows
+
+    def _graph_to_vis_data(self, display: bool = True) -> Dict:
+        """
+        Convert NetworkX graph to visualization data
+
+        Only the laid-out top nodes are included when ``display`` is set;
+        otherwise every node and edge is, with positions (x, y) left None for
+        nodes outside the display cap.
+        """
+        if not self.graph.nodes():
+            return {"nodes": [], "edges": []}
 
         # Calculate centrality measures
         try:
-            centrality = nx.degree_centrality(self.graph)
-            betweenness = nx.betweenness_centrality(self.graph)
+            centrality = self.metrics.degree_centrality(self.graph, self.graph_version)
+            betweenness = self.metrics.betweenness_centrality(
+                self.graph, self.graph_version
+            )
         except:
             centrality = {node: 0 for node in self.graph.nodes()}
             betweenness = {node: 0 for node in self.graph.nodes()}
 
+        # Cached layout of the most central nodes
+        pos = self.layout.layout(self.graph, self.graph_version, scores=centrality)
+
         # Create nodes data
         nodes = []
-        for node in self.graph.nodes():
-            x, y = pos[node]
+        for node in pos if display else self.graph.nodes():
+            x, y = pos.get(node, (None, None))
             size = max(10, centrality.get(node, 0) * 100)
 
             nodes.append(
                 {
                     "id": node,
-                    "x": float(x),
-                    "y": float(y),
+                    "x": x,
+                    "y": y,
                     "size": float(size),
                     "centrality": float(centrality.get(node, 0)),
                     "betweenness": float(betweenness.get(node, 0)),
                 }
             )
 
-        # Create edges data
-        edges = []
-        for edge in self.graph.edges(data=True):
-            source, target, data = edge
-            if source in pos and target in pos:
-                edges.append(
-                    {
-                        "source": source,
-                        "target": target,
-                        "weight": data.get("weight", 1),
-                    }
-                )
+        # Create edges data (between displayed nodes only, if displaying)
+        graph = self.graph.subgraph(pos) if display else self.graph
+        edges = [
+            {"source": source, "target": target, "weight": weight}
+            for source, target, weight in graph.edges(data="weight", default=1)
+        ]
 
         return {"nodes": nodes, "edges": edges}
 
-    def visualize_network(self, network_data: Dict) -> go.Figure:
-        """Create interactive network visualization"""
+    def visualize_network(
+        self, network_data: Dict, webgl: Optional[bool] = None
+    ) -> go.Figure:
+        """
+        Create interactive network visualization
+
+        ``webgl`` renders with Scattergl; by default it is used once the
+        network has more than WEBGL_EDGE_THRESHOLD edges.
+        """
         nodes = network_data.get("nodes", [])
         edges = network_data.get("edges", [])
 
@@ -187,23 +325,23 @@ class NetworkAnalyzer:
             )
             return fig
 
-        # Create edge traces
-        edge_x = []
-        edge_y = []
-        edge_info = []
-
-        for edge in edges:
-            source_node = next((n for n in nodes if n["id"] == edge["source"]), None)
-            target_node = next((n for n in nodes if n["id"] == edge["target"]), None)
-
-            if source_node and target_node:
-                edge_x.extend([source_node["x"], target_node["x"], None])
-                edge_y.extend([source_node["y"], target_node["y"], None])
-                edge_info.append(
-                    f"{edge['source']} → {edge['target']} (weight: {edge['weight']})"
-                )
+        if webgl is None:
+            webgl = len(edges) > WEBGL_EDGE_THRESHOLD
+        scatter = go.Scattergl if webgl else go.Scatter
 
-        edge_trace = go.Scatter(
+        # Create edge traces from node index lookups
+        index = {node["id"]: i for i, node in enumerate(nodes)}
+        coordinates = np.array([(node["x"], node["y"]) for node in nodes], dtype=float)
+        sources = np.fromiter(
+            (index.get(edge["source"], -1) for edge in edges), dtype=np.int64
+        )
+        targets = np.fromiter(
+            (index.get(edge["target"], -1) for edge in edges), dtype=np.int64
+        )
+        drawn = (sources >= 0) & (targets >= 0)
+        edge_x, edge_y = edge_segments(coordinates, sources[drawn], targets[drawn])
+
+        edge_trace = scatter(
             x=edge_x,
             y=edge_y,
             line=dict(width=0.5, color="#888"),
@@ -212,14 +350,12 @@ class NetworkAnalyzer:
         )
 
         # Create node trace
-        node_x = [node["x"] for node in nodes]
-        node_y = [node["y"] for node in nodes]
         node_text = [node["id"] for node in nodes]
         node_sizes = [max(5, node["size"]) for node in nodes]
 
-        node_trace = go.Scatter(
-            x=node_x,
-            y=node_y,
+        node_trace = scatter(
+            x=coordinates[:, 0],
+            y=coordinates[:, 1],
             mode="markers+text",
             hoverinfo="text",
             text=node_text,
@@ -248,8 +384,10 @@ class NetworkAnalyzer:
         fig = go.Figure(
             data=[edge_trace, node_trace],
             layout=go.Layout(
-                title=f"User Interaction Network ({len(nodes)} users, {len(edges)} interactions)",
-                titlefont_size=16,
+                title=dict(
+                    text=f"User Interaction Network ({len(nodes)} users, {len(edges)} interactions)",
+                    font=dict(size=16),
+                ),
                 showlegend=False,
                 hovermode="closest",
                 margin=dict(b=20, l=5, r=5, t=40),
@@ -277,61 +415,73 @@ class NetworkAnalyzer:
         """Build network graph from user interactions"""
 
         # Add nodes for all users
-        all_users = set()
-        all_users.update(self.posts_df["author"].unique())
-        all_users.update(self.comments_df["author"].unique())
+        all_users = set(self.posts_df["author"].dropna().unique())
+        all_users.update(self.comments_df["author"].dropna().unique())
         all_users.discard("[deleted]")  # Remove deleted users
 
         self.graph.add_nodes_from(all_users)
 
-        # Add edges for post-comment relationships
-        for _, comment in self.comments_df.iterrows():
-            if comment["author"] == "[deleted]":
-                continue
-
-            # Find the post author
-            post_author = self.posts_df[self.posts_df["post_id"] == comment["post_id"]][
-                "author"
-            ].iloc[0]
-
-            if post_author != "[deleted]" and post_author != comment["author"]:
-                # Add edge from commenter to post author
-                if self.graph.has_edge(comment["author"], post_author):
-                    self.graph[comment["author"]][post_author]["weight"] += 1
-                else:
-                    self.graph.add_edge(
-                        comment["author"],
-                        post_author,
-                        weight=1,
-                        interaction_type="comment_to_post",
-                    )
+        comments = self.comments_df[
+            self.comments_df["author"].notna()
+            & (self.comments_df["author"] != "[deleted]")
+        ]
+
+        # Comment -> post author edges
+        post_authors = self.posts_df[["post_id", "author"]].drop_duplicates("post_id")
+        post_edges = comments[["author", "post_id"]].merge(
+            post_authors, on="post_id", suffixes=("", "_target")
+        )
+        post_edges = post_edges.assign(interaction_type="comment_to_post")
+
+        # Comment -> parent comment author edges ("t1_" parents are comments)
+        if "parent_id" in comments:
+            parent_ids = comments["parent_id"].fillna("").astype(str)
+            replies = comments.loc[parent_ids.str.startswith("t1_"), ["author"]]
+            replies["comment_id"] = parent_ids[replies.index].str[3:]
+        else:
+            replies = pd.DataFrame(columns=["author", "comment_id"])
+
+        parent_authors = self.comments_df[["comment_id", "author"]].drop_duplicates(
+            "comment_id"
+        )
+        reply_edges = replies.merge(
+            parent_authors, on="comment_id", suffixes=("", "_target")
+        )
+        reply_edges = reply_edges.assign(interaction_type="reply")
+
+        # Aggregate interaction counts per (source, target) pair
+        edges = pd.concat(
+            [
+                post_edges[["author", "author_target", "interaction_type"]],
+                reply_edges[["author", "author_target", "interaction_type"]],
+            ],
+            ignore_index=True,
+        )
+        edges = edges[
+            edges["author_target"].notna()
+            & (edges["author_target"] != "[deleted]")
+            & (edges["author_target"] != edges["author"])
+        ]
+        edges = edges.groupby(["author", "author_target"], sort=False).agg(
+            weight=("interaction_type", "size"),
+            interaction_type=("interaction_type", "first"),
+        )
 
-        # Add edges for comment-reply relationships
-        for _, comment in self.comments_df.iterrows():
-            parent_id = comment.get("parent_id", "")
-            if parent_id.startswith("t1_"):  # Comment reply
-                parent_comment_id = parent_id[3:]  # Remove 't1_' prefix
+        edges = edges.reset_index()
 
-                parent_comment = self.comments_df[
-                    self.comments_df["comment_id"] == parent_comment_id
-                ]
+        # Bulk-load weighted edges from plain lists (no per-row pandas access)
+        self.graph.add_edges_from(
+            (source, target, {"weight": weight, "interaction_type": kind})
+            for source, target, weight, kind in zip(
+                edges["author"].tolist(),
+                edges["author_target"].tolist(),
+                edges["weight"].astype(int).tolist(),
+                edges["interaction_type"].tolist(),
+            )
+        )
 
-                if not parent_comment.empty:
-                    parent_author = parent_comment["author"].iloc[0]
-                    if (
-                        parent_author != "[deleted]"
-                        and parent_author != comment["author"]
-                    ):
-
-                        if self.graph.has_edge(comment["author"], parent_author):
-                            self.graph[comment["author"]][parent_author]["weight"] += 1
-                        else:
-                            self.graph.add_edge(
-                                comment["author"],
-                                parent_author,
-                                weight=1,
-                                interaction_type="reply",
-                            )
+        self.graph_version += 1
+        self._graph_source = None
 
         logger.info(
             f"Built network with {self.graph.number_of_nodes()} nodes and {self.graph.number_of_edges()} edges"
@@ -346,10 +496,13 @@ class NetworkAnalyzer:
         metrics["num_edges"] = self.graph.number_of_edges()
         metrics["density"] = nx.density(self.graph)
 
-        # Centrality measures
-        degree_centrality = nx.degree_centrality(self.graph)
-        betweenness_centrality = nx.betweenness_centrality(self.graph)
-        eigenvector_centrality = nx.eigenvector_centrality(self.graph, max_iter=1000)
+        # Centrality measures (shared with visualization and spreader ranking)
+        degree_centrality = self.metrics.degree_centrality(
+            self.graph, self.graph_version
+        )
+        betweenness_centrality = self.metrics.betweenness_centrality(
+            self.graph, self.graph_version
+        )
 
         # Top influential users
         metrics["top_degree_users"] = sorted(
@@ -361,9 +514,7 @@ class NetworkAnalyzer:
         )[:10]
 
         # Community detection
-        communities = nx.community.greedy_modularity_communities(
-            self.graph.to_undirected()
-        )
+        communities = self.metrics.communities(self.graph, self.graph_version)
         metrics["num_communities"] = len(communities)
         metrics["largest_community_size"] = (
             max(len(c) for c in communities) if communities else 0
@@ -381,11 +532,19 @@ class NetworkAnalyzer:
             self.posts_df["post_id"].isin(misinformation_posts)
         ]["author"].value_counts()
 
+        # One centrality computation for all spreaders
+        degree_centrality = self.metrics.degree_centrality(
+            self.graph, self.graph_version
+        )
+        betweenness_centrality = self.metrics.betweenness_centrality(
+            self.graph, self.graph_version
+        )
+
         spreaders = []
         for author, count in misinfo_authors.items():
             if author in self.graph.nodes:
-                degree_cent = nx.degree_centrality(self.graph)[author]
-                betweenness_cent = nx.betweenness_centrality(self.graph)[author]
+                degree_cent = degree_centrality[author]
+                betweenness_cent = betweenness_centrality[author]
 
                 spreaders.append(
                     {
@@ -401,33 +560,41 @@ class NetworkAnalyzer:
 
         return sorted(spreaders, key=lambda x: x["influence_score"], reverse=True)
 
-    def visualize_network(self, highlight_users: List[str] = None) -> go.Figure:
-        """Create interactive network visualization"""
+    def visualize_graph(self, highlight_users: List[str] = None) -> go.Figure:
+        """Create interactive visualization of self.graph"""
 
-        # Calculate layout
-        pos = nx.spring_layout(self.graph, k=1, iterations=50)
+        # Cached layout of the most central nodes, keeping highlighted users
+        pos = self.layout.layout(
+            self.graph,
+            self.graph_version,
+            scores=self.metrics.degree_centrality(self.graph, self.graph_version),
+            include=highlight_users,
+        )
 
         # Extract node and edge information
-        node_x = [pos[node][0] for node in self.graph.nodes()]
-        node_y = [pos[node][1] for node in self.graph.nodes()]
-        node_text = list(self.graph.nodes())
+        node_x = [x for x, _ in pos.values()]
+        node_y = [y for _, y in pos.values()]
+        node_text = list(pos)
 
         # Color nodes based on whether they're highlighted
         node_colors = []
-        for node in self.graph.nodes():
+        for node in pos:
             if highlight_users and node in highlight_users:
                 node_colors.append("red")  # Highlight misinformation spreaders
             else:
                 node_colors.append("lightblue")
 
         # Create edge traces
-        edge_x = []
-        edge_y = []
-        for edge in self.graph.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
+        index = {node: i for i, node in enumerate(pos)}
+        edge_index = np.array(
+            [(index[u], index[v]) for u, v in self.graph.subgraph(pos).edges()],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        edge_x, edge_y = edge_segments(
+            np.array(list(pos.values()), dtype=float).reshape(-1, 2),
+            edge_index[:, 0],
+            edge_index[:, 1],
+        )
 
         # Create the plot
         fig = go.Figure()
@@ -0,0 +1,321 @@
+"""
+Batch network metrics job
+Computes network metrics per subreddit and per language partition in a
+process pool, plus a cross-subreddit bridge analysis on the graph of
+subreddits contracted through shared users, and stores the results in
+the network_metrics table
+"""
+
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+from loguru import logger
+from sqlalchemy import func, select
+
+from config.settings import Config, ResearchConfig
+from src.data_persistence import DataPersistenceManager
+from src.database_models import (
+    InteractionEdge,
+    InteractionUserActivity,
+    NetworkMetrics,
+    RedditComment,
+    RedditPost,
+)
+from src.interaction_graph import InteractionGraphStore
+from src.network_analysis import NetworkAnalyzer
+from src.temporal_network import check_network_metrics_columns
+
+BRIDGE_SCOPE = "cross-subreddit"
+
+
+def partition_scope(kind: str, name: str) -> str:
+    """NetworkMetrics.scope of a partition: the subreddit or lang:<code>"""
+    return name if kind == "subreddit" else f"lang:{name}"
+
+
+def partition_metrics(database_url: str, kind: str, name: str) -> Dict:
+    """
+    Network metrics of one subreddit or language partition
+
+    Runs in a worker process, so it opens its own database connection.
+    """
+    analyzer = NetworkAnalyzer(db_manager=DataPersistenceManager(database_url))
+    if kind == "subreddit":
+        analyzer.graph = analyzer.interaction_graph.load_graph(subreddit_filter=name)
+    else:
+        analyzer._build_user_network_from_comments(language_filter=name)
+    analyzer.graph_version += 1
+
+    if not analyzer.graph.number_of_nodes():
+        return {"num_nodes": 0, "num_edges": 0, "density": 0.0}
+
+    metrics = analyzer.calculate_network_metrics()
+    try:
+        eigenvector = analyzer.metrics.eigenvector_centrality(
+            analyzer.graph, analyzer.graph_version
+        )
+        metrics["top_eigenvector_users"] = sorted(
+            eigenvector.items(), key=lambda x: x[1], reverse=True
+        )[:10]
+    except nx.PowerIterationFailedConvergence:
+        metrics["top_eigenvector_users"] = []
+    return metrics
+
+
+class NetworkBatchJob:
+    """
+    Nightly network report over subreddit and language partitions
+
+    Partitions whose input data is unchanged since their last stored row
+    (same edge/activity fingerprint) are skipped, and the rest run in
+    parallel, so runtime grows with the partitions that changed rather than
+    with the number of subreddits tracked.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        max_workers: Optional[int] = None,
+        languages: Optional[List[str]] = None,
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.max_workers = max_workers or Config.NETWORK_WORKERS or os.cpu_count()
+        self.languages = (
+            ResearchConfig.TARGET_LANGUAGES if languages is None else languages
+        )
+        check_network_metrics_columns(self.db_manager.engine)
+
+    def partitions(self) -> List[Tuple[str, str, List]]:
+        """(kind, name, fingerprint) for every subreddit and language partition"""
+        with self.db_manager.get_session() as session:
+            edges = {
+                subreddit: (count, int(weight or 0))
+                for subreddit, count, weight in session.query(
+                    InteractionEdge.subreddit,
+                    func.count(InteractionEdge.id),
+                    func.sum(InteractionEdge.weight),
+                ).group_by(InteractionEdge.subreddit)
+            }
+            activity = dict(
+                session.query(
+                    InteractionUserActivity.subreddit,
+                    func.sum(InteractionUserActivity.activity_count),
+                ).group_by(InteractionUserActivity.subreddit)
+            )
+            comments = {
+                language: (count, max_id)
+                for language, count, max_id in session.query(
+                    RedditComment.language,
+                    func.count(RedditComment.id),
+                    func.max(RedditComment.id),
+                )
+                .filter(RedditComment.language.in_(self.languages))
+                .group_by(RedditComment.language)
+            }
+            posts = dict(
+                session.query(RedditPost.language, func.count(RedditPost.id))
+                .filter(RedditPost.language.in_(self.languages))
+                .group_by(RedditPost.language)
+            )
+
+        partitions = [
+            ("subreddit", subreddit, [*edges.get(subreddit, (0, 0)), int(count)])
+            for subreddit, count in activity.items()
+            if subreddit
+        ]
+        partitions += [
+            (
+                "language",
+                language,
+                [*comments.get(language, (0, 0)), posts.get(language, 0)],
+            )
+            for language in sorted(set(comments) | set(posts))
+        ]
+        return partitions
+
+    def _latest_fingerprints(self) -> Dict[str, List]:
+        """Fingerprint stored with the newest snapshot row of every scope"""
+        with self.db_manager.get_session() as session:
+            rows = (
+                session.query(NetworkMetrics.scope, NetworkMetrics.metrics_json)
+                .filter(
+                    NetworkMetrics.scope.isnot(None),
+                    NetworkMetrics.window_start.is_(None),
+                )
+                .order_by(NetworkMetrics.id)
+                .all()
+            )
+        return {
+            scope: json.loads(metrics_json or "{}").get("fingerprint")
+            for scope, metrics_json in rows
+        }
+
+    def run(self, force: bool = False) -> Dict:
+        """
+        Compute and store metrics for changed partitions and the bridge graph
+
+        Returns:
+            {"partitions": {scope: metrics}, "skipped": [scopes],
+             "bridges": bridge metrics}
+        """
+        InteractionGraphStore(db_manager=self.db_manager).update()
+
+        latest = {} if force else self._latest_fingerprints()
+        pending = []
+        skipped = []
+        for kind, name, fingerprint in self.partitions():
+            scope = partition_scope(kind, name)
+            if latest.get(scope) == fingerprint:
+                skipped.append(scope)
+            else:
+                pending.append((kind, name, fingerprint))
+
+        logger.info(
+            f"Network batch: {len(pending)} partitions to compute, "
+            f"{len(skipped)} unchanged"
+        )
+        results = {}
+        for (kind, name, fingerprint), metrics in self._compute(pending):
+            metrics["fingerprint"] = fingerprint
+            scope = partition_scope(kind, name)
+            self._save(scope, metrics)
+            results[scope] = metrics
+
+        bridges = self.bridge_analysis()
+        self._save(BRIDGE_SCOPE, bridges)
+
+        return {"partitions": results, "skipped": skipped, "bridges": bridges}
+
+    def _compute(self, pending: List[Tuple]):
+        """Yield (partition, metrics), in worker processes when there are several"""
+        url = self.db_manager.database_url
+        if self.max_workers <= 1 or len(pending) <= 1:
+            for kind, name, fingerprint in pending:
+                yield (kind, name, fingerprint), partition_metrics(url, kind, name)
+            return
+
+        # Forked workers must not share the parent's pooled connections
+        self.db_manager.engine.dispose()
+        with ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(pending))
+        ) as pool:
+            futures = {
+                pool.submit(partition_metrics, url, kind, name): (
+                    kind,
+                    name,
+                    fingerprint,
+                )
+                for kind, name, fingerprint in pending
+            }
+            for future in as_completed(futures):
+                partition = futures[future]
+                try:
+                    yield partition, future.result()
+                except Exception as e:
+                    logger.error(f"Network metrics failed for {partition[:2]}: {e}")
+
+    def bridge_analysis(self, top_k: int = 20) -> Dict:
+        """
+        Cross-subreddit structure on the graph contracted to subreddits
+
+        Two subreddits are linked by the users active in both; bridges and
+        articulation points show which communities hold the wider network
+        together, and bridge users are those spanning the most subreddits.
+        """
+        with self.db_manager.get_session() as session:
+            subreddit_users = dict(
+                session.query(
+                    InteractionUserActivity.subreddit,
+                    func.count(func.distinct(InteractionUserActivity.author)),
+                ).group_by(InteractionUserActivity.subreddit)
+            )
+            multi = (
+                select(InteractionUserActivity.author)
+                .group_by(InteractionUserActivity.author)
+                .having(
+                    func.count(func.distinct(InteractionUserActivity.subreddit)) > 1
+                )
+            )
+            rows = (
+                session.query(
+                    InteractionUserActivity.author, InteractionUserActivity.subreddit
+                )
+                .filter(InteractionUserActivity.author.in_(multi))
+                .distinct()
+                .all()
+            )
+
+        user_subreddits = defaultdict(set)
+        for author, subreddit in rows:
+            user_subreddits[author].add(subreddit)
+
+        shared = Counter()
+        for subreddits in user_subreddits.values():
+            shared.update(combinations(sorted(subreddits), 2))
+
+        contracted = nx.Graph()
+        contracted.add_nodes_from(
+            (subreddit, {"users": users})
+            for subreddit, users in subreddit_users.items()
+        )
+        contracted.add_weighted_edges_from(
+            (a, b, count) for (a, b), count in shared.items()
+        )
+
+        metrics = {
+            "num_nodes": contracted.number_of_nodes(),
+            "num_edges": contracted.number_of_edges(),
+            "density": (
+                nx.density(contracted) if contracted.number_of_nodes() > 1 else 0.0
+            ),
+            "num_communities": 0,
+            "largest_community_size": 0,
+            "bridges": [],
+            "articulation_subreddits": [],
+            "top_broker_subreddits": [],
+            "top_bridge_users": [],
+        }
+        if not contracted.number_of_edges():
+            return metrics
+
+        communities = nx.community.greedy_modularity_communities(
+            contracted, weight="weight"
+        )
+        metrics["num_communities"] = len(communities)
+        metrics["largest_community_size"] = max(len(c) for c in communities)
+        metrics["bridges"] = [list(edge) for edge in nx.bridges(contracted)]
+        metrics["articulation_subreddits"] = sorted(nx.articulation_points(contracted))
+        metrics["top_broker_subreddits"] = sorted(
+            nx.betweenness_centrality(contracted).items(),
+            key=lambda x: x[1],
+            reverse=True,
+        )[:top_k]
+        metrics["top_bridge_users"] = [
+            {"author": author, "subreddits": sorted(subreddits)}
+            for author, subreddits in sorted(
+                user_subreddits.items(), key=lambda x: len(x[1]), reverse=True
+            )[:top_k]
+        ]
+        return metrics
+
+    def _save(self, scope: str, metrics: Dict) -> None:
+        with self.db_manager.get_session() as session:
+            session.add(
+                NetworkMetrics(
+                    analysis_date=datetime.utcnow(),
+                    scope=scope,
+                    num_nodes=metrics.get("num_nodes"),
+                    num_edges=metrics.get("num_edges"),
+                    density=metrics.get("density"),
+                    num_communities=metrics.get("num_communities"),
+                    largest_community_size=metrics.get("largest_community_size"),
+                    metrics_json=json.dumps(metrics, default=str),
+                )
+            )
+            session.commit()
@@ -9,6 +9,7 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 import json
+import os
 import sqlite3
 from datetime import datetime
 from typing import Dict, Optional
@@ -39,11 +40,34 @@ class ResearchVisualizations:
         }
 
     def load_data(self) -> None:
-        """Load Reddit data from JSON file"""
+        """Load Reddit data from a JSON file or an analytics snapshot directory"""
         if self.data_path and self.data_path.endswith(".json"):
             with open(self.data_path, "r") as f:
                 self.data = json.load(f)
             logger.info(f"Loaded {len(self.data)} posts for visualization")
+        elif self.data_path and os.path.isdir(self.data_path):
+            self.data = self._load_snapshot(self.data_path)
+            logger.info(f"Loaded {len(self.data)} posts for visualization")
+
+    @staticmethod
+    def _load_snapshot(path: str) -> list:
+        """Posts with their commenters, in the JSON layout, from a snapshot"""
+        from src.analytics_snapshot import AnalyticsSnapshot
+
+        return AnalyticsSnapshot(path).threads(
+            [
+                "subreddit",
+                "title",
+                "selftext",
+                "author",
+                "created_utc",
+                "score",
+                "num_comments",
+                "language",
+                "is_newcomer_related",
+            ],
+            ["author"],
+        )
 
     def create_data_overview_dashboard(self) -> go.Figure:
         """Create comprehensive data overview dashboard"""
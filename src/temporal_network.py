@@ -0,0 +1,463 @@
+"""
+Temporal network analysis
+Slides a fixed-length window over the materialized interaction graph,
+updating one rolling graph day by day, and stores per-window metrics as a
+time series in the network_metrics table
+"""
+
+import json
+from collections import Counter, OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+import networkx as nx
+import numpy as np
+from loguru import logger
+from sqlalchemy import func, inspect
+from sqlalchemy.orm import Session
+
+from config.settings import Config
+from src.data_persistence import DataPersistenceManager
+from src.database_models import (
+    InteractionEdge,
+    InteractionUserActivity,
+    NetworkMetrics,
+    RedditComment,
+    RedditPost,
+)
+from src.graph_metrics import GraphMetricsCache
+from src.interaction_graph import UNDATED, InteractionGraphStore
+
+# Members kept per cluster to match communities across windows
+CLUSTER_CORE_SIZE = 50
+
+
+def check_network_metrics_columns(engine) -> None:
+    """
+    Fail early when network_metrics predates the time-series columns
+
+    The columns are added by alembic migration 3b7e2c91d4a0; this only
+    inspects the table and never changes the schema.
+    """
+    existing = {c["name"] for c in inspect(engine).get_columns("network_metrics")}
+    missing = [
+        c.name for c in NetworkMetrics.__table__.columns if c.name not in existing
+    ]
+    if missing:
+        raise RuntimeError(
+            f"network_metrics is missing {missing}; run `alembic upgrade head` "
+            "to migrate the database"
+        )
+
+
+class RollingInteractionGraph:
+    """
+    Interaction graph over a range of days, updated by adding and dropping days
+
+    Edge weights and node reference counts are adjusted in place, so moving a
+    window by one step touches only the days entering and leaving it.
+    """
+
+    def __init__(self):
+        self.graph = nx.DiGraph()
+        self.days: "OrderedDict[date, Tuple[List, List]]" = OrderedDict()
+        self._node_refs = Counter()
+
+    def _ref(self, node: str, delta: int) -> None:
+        self._node_refs[node] += delta
+        if delta > 0:
+            self.graph.add_node(node)
+        elif self._node_refs[node] <= 0:
+            del self._node_refs[node]
+            self.graph.remove_node(node)
+
+    def add_day(self, day: date, edges: List[Tuple], authors: List[str]) -> None:
+        """Add one day of (source, target, weight) edges and active authors"""
+        self.days[day] = (edges, authors)
+        for author in authors:
+            self._ref(author, 1)
+        for source, target, weight in edges:
+            self._ref(source, 1)
+            self._ref(target, 1)
+            if self.graph.has_edge(source, target):
+                self.graph[source][target]["weight"] += weight
+            else:
+                self.graph.add_edge(source, target, weight=weight)
+
+    def drop_before(self, day: date) -> None:
+        """Remove all days earlier than ``day``"""
+        while self.days and next(iter(self.days)) < day:
+            _, (edges, authors) = self.days.popitem(last=False)
+            for source, target, weight in edges:
+                data = self.graph[source][target]
+                data["weight"] -= weight
+                if data["weight"] <= 0:
+                    self.graph.remove_edge(source, target)
+                self._ref(source, -1)
+                self._ref(target, -1)
+            for author in authors:
+                self._ref(author, -1)
+
+
+class TemporalNetworkAnalyzer:
+    """
+    Sliding-window interaction network metrics
+
+    Windows of ``window_days`` start every ``step_days`` from the Monday of
+    the first interaction. ``run`` resumes after the last stored window of
+    the same scope and length and only computes complete windows, so the
+    weekly job never revisits history. Misinformation clusters (communities
+    containing authors of posts scored at or above the threshold) keep their
+    ids across windows by matching their core members.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        window_days: int = 7,
+        step_days: int = 7,
+        misinformation_threshold: float = 0.5,
+        top_k: int = 10,
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.store = InteractionGraphStore(db_manager=self.db_manager)
+        self.metrics = GraphMetricsCache(engine=Config.GRAPH_ENGINE)
+        self.window = timedelta(days=window_days)
+        self.step = timedelta(days=step_days)
+        self.misinformation_threshold = misinformation_threshold
+        self.top_k = top_k
+        check_network_metrics_columns(self.db_manager.engine)
+
+    def _series(self, session: Session, scope: str) -> List[NetworkMetrics]:
+        """Stored windows of this scope and window length, oldest first"""
+        rows = (
+            session.query(NetworkMetrics)
+            .filter(
+                NetworkMetrics.scope == scope, NetworkMetrics.window_start.isnot(None)
+            )
+            .order_by(NetworkMetrics.window_start)
+            .all()
+        )
+        return [
+            row
+            for row in rows
+            if row.window_end - row.window_start == self.window
+            and json.loads(row.metrics_json or "{}").get("step_days") == self.step.days
+        ]
+
+    def _scope_filter(self, column, subreddit: Optional[str]) -> List:
+        return [column == subreddit] if subreddit else []
+
+    def run(
+        self,
+        subreddit: Optional[str] = None,
+        full: bool = False,
+        until: Optional[date] = None,
+    ) -> List[Dict]:
+        """
+        Compute and store metrics for every new complete window
+
+        Args:
+            subreddit: Restrict the network to one subreddit (default: all)
+            full: Delete this scope's stored windows and recompute them
+            until: Last day (exclusive) windows may cover, default today;
+                never later than the newest ingested interaction
+
+        Returns:
+            Metrics of the windows computed in this run
+        """
+        self.store.update()
+        scope = subreddit or "all"
+        until = until or date.today()
+
+        with self.db_manager.get_session() as session:
+            series = self._series(session, scope)
+            if full:
+                for row in series:
+                    session.delete(row)
+                session.commit()
+                series = []
+
+            last = series[-1] if series else None
+            first_day, last_day = (
+                session.query(
+                    func.min(InteractionUserActivity.activity_date),
+                    func.max(InteractionUserActivity.activity_date),
+                )
+                .filter(
+                    InteractionUserActivity.activity_date > UNDATED,
+                    *self._scope_filter(InteractionUserActivity.subreddit, subreddit),
+                )
+                .one()
+            )
+
+        if first_day is None:
+            logger.info(f"No dated interactions for scope {scope}")
+            return []
+
+        if last is not None:
+            start = last.window_start.date() + self.step
+            previous_clusters = json.loads(last.metrics_json or "{}").get(
+                "misinformation_clusters", []
+            )
+        else:
+            start = first_day - timedelta(days=first_day.weekday())
+            previous_clusters = []
+
+        # Windows past the newest ingested day would be stored incomplete
+        until = min(until, last_day + timedelta(days=1))
+
+        rolling = RollingInteractionGraph()
+        loaded_until = start
+        results = []
+        while start + self.window <= until:
+            end = start + self.window
+            rolling.drop_before(start)
+            self._load_days(rolling, max(loaded_until, start), end, subreddit)
+            loaded_until = end
+
+            window_metrics = self._window_metrics(
+                rolling.graph, start, end, subreddit, previous_clusters
+            )
+            self._save(window_metrics, scope, start, end)
+            previous_clusters = window_metrics["misinformation_clusters"]
+            results.append(window_metrics)
+            start += self.step
+
+        logger.info(f"Computed {len(results)} new {scope} network windows")
+        return results
+
+    def _load_days(
+        self,
+        rolling: RollingInteractionGraph,
+        first: date,
+        end: date,
+        subreddit: Optional[str],
+    ) -> None:
+        """Add the stored edges and active authors of days [first, end)"""
+        if first >= end:
+            return
+
+        days = {first + timedelta(days=i): ([], []) for i in range((end - first).days)}
+        with self.db_manager.get_session() as session:
+            edge_rows = (
+                session.query(
+                    InteractionEdge.interaction_date,
+                    InteractionEdge.source_author,
+                    InteractionEdge.target_author,
+                    func.sum(InteractionEdge.weight),
+                )
+                .filter(
+                    InteractionEdge.interaction_date >= first,
+                    InteractionEdge.interaction_date < end,
+                    *self._scope_filter(InteractionEdge.subreddit, subreddit),
+                )
+                .group_by(
+                    InteractionEdge.interaction_date,
+                    InteractionEdge.source_author,
+                    InteractionEdge.target_author,
+                )
+                .yield_per(10000)
+            )
+            for day, source, target, weight in edge_rows:
+                days[day][0].append((source, target, int(weight)))
+
+            author_rows = (
+                session.query(
+                    InteractionUserActivity.activity_date,
+                    InteractionUserActivity.author,
+                )
+                .filter(
+                    InteractionUserActivity.activity_date >= first,
+                    InteractionUserActivity.activity_date < end,
+                    *self._scope_filter(InteractionUserActivity.subreddit, subreddit),
+                )
+                .distinct()
+                .yield_per(10000)
+            )
+            for day, author in author_rows:
+                days[day][1].append(author)
+
+        for day, (edges, authors) in days.items():
+            rolling.add_day(day, edges, authors)
+
+    def _window_metrics(
+        self,
+        graph: nx.DiGraph,
+        start: date,
+        end: date,
+        subreddit: Optional[str],
+        previous_clusters: List[Dict],
+    ) -> Dict:
+        """Network, spreader and cluster metrics for one window's graph"""
+        self.metrics.clear()
+        window_start = datetime.combine(start, datetime.min.time())
+        window_end = datetime.combine(end, datetime.min.time())
+
+        metrics = {
+            "window_start": start.isoformat(),
+            "window_end": end.isoformat(),
+            "step_days": self.step.days,
+            "num_nodes": graph.number_of_nodes(),
+            "num_edges": graph.number_of_edges(),
+            "density": nx.density(graph) if graph.number_of_nodes() > 1 else 0.0,
+            "num_communities": 0,
+            "largest_community_size": 0,
+            "top_spreaders": [],
+            "misinformation_clusters": [],
+            "information_flow_speed": self._information_flow_speed(
+                window_start, window_end, subreddit
+            ),
+        }
+        if not graph.number_of_nodes():
+            return metrics
+
+        degree = self.metrics.degree_centrality(graph)
+        communities = self.metrics.communities(graph)
+        metrics["num_communities"] = len(communities)
+        metrics["largest_community_size"] = max(len(c) for c in communities)
+
+        # Spreaders: authors of high-scoring posts, ranked like
+        # NetworkAnalyzer.identify_misinformation_spreaders
+        spreader_posts = self._misinformation_authors(
+            window_start, window_end, subreddit
+        )
+        spreaders = [
+            {
+                "author": author,
+                "misinformation_posts": count,
+                "degree_centrality": degree[author],
+                "influence_score": count * degree[author] * 10,
+            }
+            for author, count in spreader_posts.items()
+            if author in degree
+        ]
+        spreaders.sort(key=lambda s: s["influence_score"], reverse=True)
+        metrics["top_spreaders"] = spreaders[: self.top_k]
+
+        metrics["misinformation_clusters"] = self._track_clusters(
+            communities, set(spreader_posts), degree, previous_clusters
+        )
+        return metrics
+
+    def _misinformation_authors(
+        self, start: datetime, end: datetime, subreddit: Optional[str]
+    ) -> Dict[str, int]:
+        """Posts per author scored as misinformation in the window"""
+        with self.db_manager.get_session() as session:
+            rows = (
+                session.query(RedditPost.author, func.count(RedditPost.id))
+                .filter(
+                    RedditPost.created_utc >= start,
+                    RedditPost.created_utc < end,
+                    RedditPost.misinformation_score >= self.misinformation_threshold,
+                    RedditPost.author.isnot(None),
+                    RedditPost.author != "[deleted]",
+                    *self._scope_filter(RedditPost.subreddit, subreddit),
+                )
+                .group_by(RedditPost.author)
+                .all()
+            )
+        return dict(rows)
+
+    def _information_flow_speed(
+        self, start: datetime, end: datetime, subreddit: Optional[str]
+    ) -> Optional[float]:
+        """First replies per hour: 1 / median hours from post to first comment"""
+        with self.db_manager.get_session() as session:
+            rows = (
+                session.query(
+                    RedditPost.created_utc, func.min(RedditComment.created_utc)
+                )
+                .join(RedditComment, RedditComment.post_id == RedditPost.post_id)
+                .filter(
+                    RedditPost.created_utc >= start,
+                    RedditPost.created_utc < end,
+                    RedditComment.created_utc.isnot(None),
+                    *self._scope_filter(RedditPost.subreddit, subreddit),
+                )
+                .group_by(RedditPost.id, RedditPost.created_utc)
+                .all()
+            )
+
+        delays = [
+            (first_reply - created).total_seconds() / 3600
+            for created, first_reply in rows
+            if isinstance(first_reply, datetime) and first_reply >= created
+        ]
+        if not delays:
+            return None
+        median = float(np.median(delays))
+        return 1.0 / median if median > 0 else None
+
+    def _track_clusters(
+        self,
+        communities: List[Set],
+        spreaders: Set[str],
+        degree: Dict,
+        previous_clusters: List[Dict],
+    ) -> List[Dict]:
+        """
+        Communities containing spreaders, with ids carried over from the
+        previous window when their core members overlap (Jaccard >= 0.3)
+        """
+        next_id = max((c["cluster_id"] for c in previous_clusters), default=0) + 1
+        unmatched = {c["cluster_id"]: set(c["core"]) for c in previous_clusters}
+
+        clusters = []
+        for members in sorted(communities, key=len, reverse=True):
+            authors = spreaders & members
+            if not authors:
+                continue
+
+            core = sorted(members, key=lambda m: degree.get(m, 0), reverse=True)[
+                :CLUSTER_CORE_SIZE
+            ]
+            best_id, best_overlap = None, 0.3
+            for cluster_id, previous_core in unmatched.items():
+                union = len(previous_core | set(core))
+                overlap = len(previous_core & set(core)) / union if union else 0.0
+                if overlap >= best_overlap:
+                    best_id, best_overlap = cluster_id, overlap
+
+            if best_id is None:
+                best_id, next_id = next_id, next_id + 1
+            else:
+                del unmatched[best_id]
+
+            clusters.append(
+                {
+                    "cluster_id": best_id,
+                    "size": len(members),
+                    "misinformation_authors": sorted(authors),
+                    "core": core,
+                }
+            )
+        return clusters
+
+    def _save(self, metrics: Dict, scope: str, start: date, end: date) -> None:
+        with self.db_manager.get_session() as session:
+            session.add(
+                NetworkMetrics(
+                    analysis_date=datetime.utcnow(),
+                    num_nodes=metrics["num_nodes"],
+                    num_edges=metrics["num_edges"],
+                    density=metrics["density"],
+                    num_communities=metrics["num_communities"],
+                    largest_community_size=metrics["largest_community_size"],
+                    information_flow_speed=metrics["information_flow_speed"],
+                    scope=scope,
+                    window_start=datetime.combine(start, datetime.min.time()),
+                    window_end=datetime.combine(end, datetime.min.time()),
+                    metrics_json=json.dumps(metrics, default=str),
+                )
+            )
+            session.commit()
+
+    def time_series(self, subreddit: Optional[str] = None) -> List[Dict]:
+        """Stored window metrics for a scope, oldest first"""
+        with self.db_manager.get_session() as session:
+            return [
+                json.loads(row.metrics_json)
+                for row in self._series(session, subreddit or "all")
+            ]
@@ -0,0 +1,375 @@
+"""
+Streaming word frequencies
+Tokenizes posts and comments in id-range chunks and adds their term counts
+to the word_frequencies rollup at ingest, so the word cloud is drawn from
+stored frequencies instead of one string holding the whole corpus
+"""
+
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.data_persistence import (
+    DataPersistenceManager,
+    increment_rows,
+    surviving_max_ids,
+)
+from src.database_models import (
+    RedditComment,
+    RedditPost,
+    WordFrequency,
+    WordFrequencyState,
+)
+
+# Same token pattern as WordCloud.process_text
+TOKEN_PATTERN = re.compile(r"\w[\w']+")
+MAX_TERM_LENGTH = 100
+
+# Common words and Reddit-specific terms left out of the word cloud
+STOPWORDS = {
+    "the",
+    "and",
+    "or",
+    "but",
+    "in",
+    "on",
+    "at",
+    "to",
+    "for",
+    "of",
+    "with",
+    "by",
+    "from",
+    "as",
+    "is",
+    "was",
+    "are",
+    "were",
+    "be",
+    "been",
+    "have",
+    "has",
+    "had",
+    "do",
+    "does",
+    "did",
+    "will",
+    "would",
+    "could",
+    "should",
+    "may",
+    "might",
+    "must",
+    "can",
+    "this",
+    "that",
+    "these",
+    "those",
+    "i",
+    "you",
+    "he",
+    "she",
+    "it",
+    "we",
+    "they",
+    "me",
+    "him",
+    "her",
+    "us",
+    "them",
+    "my",
+    "your",
+    "his",
+    "its",
+    "our",
+    "their",
+    "a",
+    "an",
+    "reddit",
+    "post",
+    "comment",
+    "thread",
+    "sub",
+    "subreddit",
+    "user",
+    "edit",
+    "deleted",
+    "removed",
+    "amp",
+    "quot",
+    "gt",
+    "lt",
+}
+
+
+def tokenize(text: str) -> Iterable[str]:
+    """Lower-cased word tokens, without possessive 's and bare numbers"""
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token.endswith("'s"):
+            token = token[:-2]
+        if token and not token.isdigit() and len(token) <= MAX_TERM_LENGTH:
+            yield token
+
+
+class WordFrequencyStore:
+    """
+    Term and document frequencies of all posts and comments, maintained from
+    RedditPost/RedditComment.id watermarks
+
+    Stopwords are applied when frequencies are read, so changing them does
+    not require recounting. Posts deleted by cleanup_old_data and posts
+    re-scraped in place are subtracted and recounted.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DataPersistenceManager] = None,
+        batch_size: int = 5000,
+    ):
+        self.db_manager = db_manager or DataPersistenceManager()
+        self.batch_size = batch_size
+
+    def _state(self, session: Session) -> WordFrequencyState:
+        state = session.query(WordFrequencyState).with_for_update().first()
+        if state is None:
+            state = WordFrequencyState(post_watermark=0, comment_watermark=0, version=0)
+            session.add(state)
+            session.flush()
+        return state
+
+    def version(self) -> int:
+        """Current frequency version (0 before the first update)"""
+        with self.db_manager.get_session() as session:
+            return session.query(WordFrequencyState.version).scalar() or 0
+
+    def update(self) -> int:
+        """
+        Count terms of posts and comments added since the last update
+
+        Returns:
+            Number of new posts and comments counted
+        """
+        with self.db_manager.get_session() as session:
+            try:
+                state = self._state(session)
+                max_post = session.query(func.max(RedditPost.id)).scalar() or 0
+                max_comment = session.query(func.max(RedditComment.id)).scalar() or 0
+
+                new_posts = max(max_post - state.post_watermark, 0)
+                new_comments = max(max_comment - state.comment_watermark, 0)
+                if not new_posts and not new_comments:
+                    session.rollback()
+                    return 0
+
+                for start in range(state.post_watermark, max_post, self.batch_size):
+                    end = min(start + self.batch_size, max_post)
+                    posts = session.query(RedditPost.title, RedditPost.selftext).filter(
+                        RedditPost.id > start, RedditPost.id <= end
+                    )
+                    self._count(session, self._post_texts(posts))
+                for start in range(
+                    state.comment_watermark, max_comment, self.batch_size
+                ):
+                    end = min(start + self.batch_size, max_comment)
+                    comments = session.query(RedditComment.body).filter(
+                        RedditComment.id > start, RedditComment.id <= end
+                    )
+                    self._count(session, (body or "" for (body,) in comments))
+
+                state.post_watermark = max(max_post, state.post_watermark)
+                state.comment_watermark = max(max_comment, state.comment_watermark)
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+
+                logger.info(
+                    f"Word frequencies v{state.version}: counted {new_posts} "
+                    f"posts, {new_comments} comments"
+                )
+                return new_posts + new_comments
+
+            except Exception:
+                session.rollback()
+                raise
+
+    def rebuild(self) -> int:
+        """Drop the frequencies and count all posts and comments again"""
+        with self.db_manager.get_session() as session:
+            session.query(WordFrequency).delete()
+            session.query(WordFrequencyState).delete()
+            session.commit()
+
+        return self.update()
+
+    def remove_posts(self, session: Session, posts) -> int:
+        """
+        Subtract posts about to be deleted, and their comments, from the
+        frequencies
+
+        ``posts`` is a condition on RedditPost selecting the posts. Call this
+        in the deleting transaction, before the delete; only rows already
+        counted (at or below the watermarks) are subtracted, and the
+        watermarks drop to the highest surviving ids.
+
+        Returns:
+            Number of posts and comments subtracted
+        """
+        state = session.query(WordFrequencyState).with_for_update().first()
+        if state is None:
+            return 0
+
+        post_rows = (
+            session.query(RedditPost.title, RedditPost.selftext)
+            .filter(posts, RedditPost.id <= state.post_watermark)
+            .all()
+        )
+        comment_rows = (
+            session.query(RedditComment.body)
+            .filter(
+                RedditComment.post_id.in_(select(RedditPost.post_id).where(posts)),
+                RedditComment.id <= state.comment_watermark,
+            )
+            .all()
+        )
+        max_post, max_comment = surviving_max_ids(session, posts)
+        state.post_watermark = min(state.post_watermark, max_post)
+        state.comment_watermark = min(state.comment_watermark, max_comment)
+        if not post_rows and not comment_rows:
+            return 0
+
+        self._count(session, self._post_texts(post_rows), sign=-1)
+        self._count(session, (body or "" for (body,) in comment_rows), sign=-1)
+        self._prune(session)
+
+        state.version = (state.version or 0) + 1
+        state.updated_at = datetime.utcnow()
+        return len(post_rows) + len(comment_rows)
+
+    def prepare_post_updates(self, post_ids: List[str]) -> List:
+        """Counted (id, title, selftext) of posts about to be re-scraped"""
+        with self.db_manager.get_session() as session:
+            watermark = session.query(WordFrequencyState.post_watermark).scalar()
+            if not watermark:
+                return []
+            return [
+                row
+                for start in range(0, len(post_ids), self.batch_size)
+                for row in session.query(
+                    RedditPost.id, RedditPost.title, RedditPost.selftext
+                ).filter(
+                    RedditPost.post_id.in_(post_ids[start : start + self.batch_size]),
+                    RedditPost.id <= watermark,
+                )
+            ]
+
+    def apply_post_updates(self, previous_rows: List) -> int:
+        """
+        Swap the counted text of updated posts (``prepare_post_updates``
+        rows) for their current text; a re-scrape never rewrites comments
+
+        Returns:
+            Number of posts recounted
+        """
+        if not previous_rows:
+            return 0
+
+        with self.db_manager.get_session() as session:
+            try:
+                state = self._state(session)
+                for start in range(0, len(previous_rows), self.batch_size):
+                    batch = previous_rows[start : start + self.batch_size]
+                    current = session.query(
+                        RedditPost.title, RedditPost.selftext
+                    ).filter(RedditPost.id.in_([row.id for row in batch]))
+                    self._count(
+                        session,
+                        self._post_texts((row.title, row.selftext) for row in batch),
+                        sign=-1,
+                    )
+                    self._count(session, self._post_texts(current))
+                self._prune(session)
+
+                state.version = (state.version or 0) + 1
+                state.updated_at = datetime.utcnow()
+                session.commit()
+                return len(previous_rows)
+
+            except Exception:
+                session.rollback()
+                raise
+
+    @staticmethod
+    def _post_texts(rows) -> Iterable[str]:
+        return (f"{title or ''} {selftext or ''}" for title, selftext in rows)
+
+    @staticmethod
+    def _prune(session: Session) -> None:
+        """Delete terms no longer occurring anywhere"""
+        session.query(WordFrequency).filter(WordFrequency.count <= 0).delete(
+            synchronize_session=False
+        )
+
+    def _count(self, session: Session, texts: Iterable[str], sign: int = 1) -> None:
+        """
+        Add the term and document counts of one chunk of texts; with
+        ``sign=-1`` subtract them from existing terms instead
+        """
+        counts = Counter()
+        documents = Counter()
+        for text in texts:
+            tokens = list(tokenize(text))
+            counts.update(tokens)
+            documents.update(set(tokens))
+
+        increment_rows(
+            session,
+            WordFrequency,
+            ["term"],
+            ["count", "doc_count"],
+            [
+                {
+                    "term": term,
+                    "count": sign * count,
+                    "doc_count": sign * documents[term],
+                }
+                for term, count in counts.items()
+            ],
+            insert=sign > 0,
+        )
+
+    def top_terms(
+        self, limit: int = 100, stopwords: Optional[set] = None
+    ) -> Dict[str, int]:
+        """
+        Most frequent terms, excluding stopwords, with plurals folded into
+        their singular where both are among the candidates (as WordCloud does)
+        """
+        stopwords = STOPWORDS if stopwords is None else stopwords
+        with self.db_manager.get_session() as session:
+            candidates = (
+                session.query(WordFrequency.term, WordFrequency.count)
+                .order_by(WordFrequency.count.desc(), WordFrequency.term)
+                .limit(limit * 2 + len(stopwords))
+                .all()
+            )
+
+        frequencies = {
+            term: count for term, count in candidates if term not in stopwords
+        }
+        for term in list(frequencies):
+            singular = term[:-1]
+            if (
+                term.endswith("s")
+                and not term.endswith("ss")
+                and singular in frequencies
+            ):
+                frequencies[singular] += frequencies.pop(term)
+
+        return dict(
+            sorted(frequencies.items(), key=lambda x: x[1], reverse=True)[:limit]
+        )
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Check the incrementally maintained analytics rollups against a live recount
+(rollups rebuilt from the rows left in the database) after ingest,
+re-scrapes and data-retention cleanup
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from config.settings import Config
+from src.analytics_rollup import AnalyticsRollupStore
+from src.data_persistence import DataPersistenceManager
+from src.database_models import RedditComment, RedditPost
+
+SUBREDDITS = ["askgaybros", "toronto", "NewToCanada"]
+LANGUAGES = ["en", "fr", "es", None]
+TITLES = [
+    "Question about PrEP and HIV testing",
+    "Santé: où trouver la PEP à Toronto",
+    "Weekend plans",
+    "New to Canada, how does healthcare work?",
+]
+
+
+class KeywordScorer:
+    """Deterministic stand-in for the exported health and LGBTQ+ scorers"""
+
+    def predict_health_content(self, texts):
+        return [{"is_health_related": "hiv" in text.lower()} for text in texts]
+
+    def predict_lgbtq_content(self, texts):
+        return [{"is_lgbtq_related": "gay" in text.lower()} for text in texts]
+
+
+def make_posts(count, start=0, now=None):
+    now = now or datetime.now()
+    posts = []
+    for i in range(start, start + count):
+        posts.append(
+            {
+                "post_id": f"p{i}",
+                "subreddit": SUBREDDITS[i % len(SUBREDDITS)],
+                "title": TITLES[i % len(TITLES)],
+                "selftext": "gay clinic" if i % 5 == 0 else "",
+                "author": f"author{i % 17}",
+                "created_utc": (
+                    None if i % 23 == 0 else now - timedelta(days=i, hours=i)
+                ),
+                "score": i % 11,
+                "language": LANGUAGES[i % len(LANGUAGES)],
+                "english_translation": "translated" if i % 6 == 0 else None,
+                "is_newcomer_related": i % 4 == 3,
+                "contains_health_keywords": i % 4 < 2,
+                "comments": [
+                    {
+                        "comment_id": f"c{i}_{j}",
+                        "post_id": f"p{i}",
+                        "author": f"commenter{(i + j) % 13}",
+                        "body": "HIV test at the clinic" if j % 2 else "thanks!",
+                        "created_utc": now - timedelta(days=i, hours=j),
+                        "score": j,
+                        "language": LANGUAGES[(i + j) % len(LANGUAGES)],
+                    }
+                    for j in range(i % 4)
+                ],
+            }
+        )
+    return posts
+
+
+def rollup_reads(store):
+    return {
+        "summary": store.summary(),
+        "languages": store.language_distribution(),
+        "keywords": store.health_keywords(),
+        "subreddits": store.subreddit_patterns(),
+        "temporal": store.temporal_patterns(),
+        "newcomer": store.newcomer_content(),
+        "classification": store.classification_counts(),
+    }
+
+
+def live_recount(db):
+    store = AnalyticsRollupStore(db_manager=db)
+    store.rebuild()
+    return rollup_reads(store)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    for flag in (
+        "AUTO_TRIAGE",
+        "AUTO_UPDATE_INTERACTION_GRAPH",
+        "AUTO_UPDATE_KEYWORD_INDEX",
+        "AUTO_UPDATE_SEARCH_INDEX",
+        "AUTO_UPDATE_WORD_FREQUENCIES",
+    ):
+        monkeypatch.setattr(Config, flag, False)
+    monkeypatch.setattr(Config, "AUTO_UPDATE_ANALYTICS_ROLLUPS", True)
+
+    def load_scorers(store):
+        store._classifiers_loaded = True
+        store.health_classifier = store.lgbtq_classifier = KeywordScorer()
+
+    monkeypatch.setattr(AnalyticsRollupStore, "_load_classifiers", load_scorers)
+    return DataPersistenceManager(f"sqlite:///{tmp_path / 'rollups.db'}")
+
+
+def test_incremental_ingest_matches_recount(db):
+    for start in (0, 70, 140):
+        db.bulk_save_posts(make_posts(70, start))
+
+    incremental = rollup_reads(AnalyticsRollupStore(db_manager=db))
+    assert incremental["summary"]["total_posts"] == 210
+    assert incremental == live_recount(db)
+
+
+def test_cleanup_subtracts_deleted_posts(db):
+    posts = make_posts(202)
+    cutoff = datetime.now() - timedelta(days=100)
+    expired = sum(1 for p in posts if p["created_utc"] and p["created_utc"] < cutoff)
+    db.bulk_save_posts(posts)
+    deleted = db.cleanup_old_data(days_to_keep=100)
+
+    with db.get_session() as session:
+        live_posts = session.query(RedditPost).count()
+        live_comments = session.query(RedditComment).count()
+
+    incremental = rollup_reads(AnalyticsRollupStore(db_manager=db))
+    assert deleted == expired > 0
+    assert incremental["summary"]["total_posts"] == live_posts == 202 - expired
+    assert incremental["summary"]["total_comments"] == live_comments
+    assert incremental == live_recount(db)
+
+
+def test_rescraped_posts_replace_rolled_up_values(db):
+    db.bulk_save_posts(make_posts(60))
+
+    rescraped = make_posts(20)
+    for post in rescraped:
+        post["score"] += 100
+        post["language"] = "tl"
+        post["is_newcomer_related"] = not post["is_newcomer_related"]
+    stats = db.bulk_save_posts(rescraped)
+
+    incremental = rollup_reads(AnalyticsRollupStore(db_manager=db))
+    assert stats["updated"] == 20
+    assert incremental["languages"]["post_languages"]["tl"] == 20
+    assert incremental == live_recount(db)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))